@@ -28,6 +28,7 @@ from django.core.management.base import BaseCommand
 
 from freppledb import __version__
 from freppledb.archive.models import ArchiveManager
+from freppledb.common.models import Parameter
 from freppledb.common.report import getCurrentDate
 
 
@@ -102,9 +103,7 @@ class Command(BaseCommand):
                     for s in snapshots:
                         if verbosity > 0:
                             print("Deleting archive", s)
-                        cursor.execute(
-                            "delete from ax_manager where snapshot_date = %s", (s,)
-                        )
+                        ArchiveManager.deleteSnapshot(cursor, s)
                 else:
                     # We already have a snapshot for this period
                     if verbosity > 0:
@@ -113,8 +112,22 @@ class Command(BaseCommand):
                         )
                     return
 
+            # In the delta-encoded mode we only store the records that changed
+            # since the previous snapshot
+            previous = None
+            if (Parameter.getValue("archive.delta", database) or "").lower() == "true":
+                cursor.execute(
+                    "select max(snapshot_date) from ax_manager where snapshot_date < %s",
+                    (now,),
+                )
+                previous = cursor.fetchone()[0]
+
             if verbosity > 0:
-                print("Creating history archive snapshot", now)
+                print(
+                    "Creating history archive snapshot",
+                    now,
+                    "with changes since %s" % previous if previous else "",
+                )
             mgr = ArchiveManager(
                 snapshot_date=now,
                 total_records=0,
@@ -123,12 +136,15 @@ class Command(BaseCommand):
                 operationplan_records=0,
             )
             mgr.save(using=database)
+            ArchiveManager.createPartitions(cursor, now)
 
             # Archiving buffer table
-            cursor.execute(
+            buffer_records = self.archive(
+                cursor,
+                "ax_buffer",
+                ["item", "location", "batch", "onhand", "cost", "safetystock"],
                 """
-                insert into ax_buffer (item, location, batch, onhand, cost, safetystock, snapshot_date_id)
-                select item_id, location_id, batch, onhand, cost, safetystock, '%s'
+                select item_id, location_id, batch, onhand, cost, safetystock
                 from (
                   select operationplanmaterial.item_id,
                   operationplanmaterial.location_id,
@@ -178,42 +194,70 @@ class Command(BaseCommand):
                 ) recs
                 where rownumber = 1
                 """
-                % ((now,) * 6)
+                % ((now,) * 5),
+                now,
+                previous,
             )
-            buffer_records = cursor.rowcount
 
             # Archiving demand table
-            cursor.execute(
+            demand_records = self.archive(
+                cursor,
+                "ax_demand",
+                [
+                    "name",
+                    "item",
+                    "location",
+                    "customer",
+                    "cost",
+                    "due",
+                    "status",
+                    "priority",
+                    "quantity",
+                    "deliverydate",
+                    "quantityplanned",
+                ],
                 """
-                insert into ax_demand (name, item, location, customer, cost, due, status, priority, quantity,
-                                      deliverydate, quantityplanned, snapshot_date_id)
                 select demand.name, demand.item_id, demand.location_id, demand.customer_id, item.cost,
-                demand.due, demand.status, demand.priority, demand.quantity, operationplan.enddate, operationplan.quantity, '%s'
+                demand.due, demand.status, demand.priority, demand.quantity, operationplan.enddate, operationplan.quantity
                 from demand
                 inner join item on demand.item_id = item.name
                 left outer join operationplan on operationplan.demand_id = demand.name
                 where demand.status in ('open', 'quote')
-                """
-                % (now,)
+                """,
+                now,
+                previous,
             )
-            demand_records = cursor.rowcount
 
             # Archiving POs
-            cursor.execute(
+            operationplan_records = self.archive(
+                cursor,
+                "ax_operationplan",
+                [
+                    "reference",
+                    "status",
+                    "type",
+                    "quantity",
+                    "startdate",
+                    "enddate",
+                    "item",
+                    "operation",
+                    "supplier",
+                    "location",
+                    "item_cost",
+                    "itemsupplier_cost",
+                ],
                 """
-                insert into ax_operationplan
-                (reference, status, type, quantity, startdate, enddate, item, operation, supplier, location, item_cost, itemsupplier_cost, snapshot_date_id)
                 select op.reference, op.status, op.type, op.quantity, op.startdate, op.enddate, op.item_id, op.operation_id, op.supplier_id, op.location_id,
-                item.cost, itemsupplier.cost, '%s'
+                item.cost, itemsupplier.cost
                 from operationplan op
                 inner join item on op.item_id = item.name
                 left outer join itemsupplier on itemsupplier.item_id = op.item_id and itemsupplier.supplier_id = op.supplier_id
                 where
                 op.type <> 'STCK' and op.status in ('confirmed','approved','completed')
-                """
-                % (now,)
+                """,
+                now,
+                previous,
             )
-            operationplan_records = cursor.rowcount
 
             mgr.buffer_records = buffer_records
             mgr.demand_records = demand_records
@@ -222,3 +266,82 @@ class Command(BaseCommand):
             mgr.save(using=database)
 
             # TODO Deleted archived data we don't need to any longer
+
+    @staticmethod
+    def archive(cursor, table, fields, query, snapshot_date, previous=None):
+        """
+        Stores the records returned by the query in a snapshot, and returns
+        the number of records in the snapshot.
+
+        When a previous snapshot is passed, only the new and changed records
+        are inserted. The records identical to a record of the previous
+        snapshot are marked as valid till this snapshot instead.
+        """
+        fields = ", ".join(fields)
+        if not previous:
+            cursor.execute(
+                """
+                insert into %s (%s, snapshot_date_id, valid_until)
+                select recs.*, %%s, %%s from (%s) recs
+                """
+                % (table, fields, query),
+                (snapshot_date, snapshot_date),
+            )
+            return cursor.rowcount
+
+        # Collect the records of the new snapshot, with the data types of the archive table
+        cursor.execute(
+            "create temporary table ax_snapshot as select %s from %s limit 0"
+            % (fields, table)
+        )
+        cursor.execute("insert into ax_snapshot (%s) %s" % (fields, query))
+
+        # Extend the validity of the unchanged records
+        cursor.execute(
+            """
+            update {table} set valid_until = %s
+            from (
+              select prev.id
+              from (
+                select
+                  id,
+                  md5(row({fields})::text) as key,
+                  row_number() over (partition by md5(row({fields})::text) order by id) as nr
+                from {table}
+                where valid_until = %s
+                ) prev
+              inner join (
+                select
+                  md5(row({fields})::text) as key,
+                  row_number() over (partition by md5(row({fields})::text)) as nr
+                from ax_snapshot
+                ) snapshot
+              on prev.key = snapshot.key and prev.nr = snapshot.nr
+              ) unchanged
+            where {table}.id = unchanged.id and {table}.valid_until = %s
+            """.format(
+                table=table, fields=fields
+            ),
+            (snapshot_date, previous, previous),
+        )
+        unchanged = cursor.rowcount
+
+        # Insert the new and changed records
+        cursor.execute(
+            """
+            insert into {table} ({fields}, snapshot_date_id, valid_until)
+            select recs.*, %s, %s
+            from (
+              select {fields} from ax_snapshot
+              except all
+              select {fields} from {table}
+              where valid_until = %s and snapshot_date_id < %s
+              ) recs
+            """.format(
+                table=table, fields=fields
+            ),
+            (snapshot_date, snapshot_date, snapshot_date, snapshot_date),
+        )
+        changed = cursor.rowcount
+        cursor.execute("drop table ax_snapshot")
+        return unchanged + changed
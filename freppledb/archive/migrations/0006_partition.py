@@ -0,0 +1,177 @@
+#
+# Copyright (C) 2024 by frePPLe bv
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+import re
+
+from django.conf import settings
+from django.db import migrations, models, connections
+
+
+def partition_tables(apps, schema_editor):
+    """
+    Recreates the archive tables as tables partitioned by snapshot date,
+    with a partition for every existing snapshot and a default partition.
+    """
+    db = schema_editor.connection.alias
+    with connections[db].cursor() as cursor:
+        cursor.execute("select snapshot_date from ax_manager")
+        snapshots = [i[0] for i in cursor.fetchall()]
+        for table in ("ax_buffer", "ax_demand", "ax_operationplan"):
+            cursor.execute("alter table %s rename to %s_old" % (table, table))
+            cursor.execute(
+                """
+                select attidentity, pg_get_serial_sequence('%s_old', 'id')
+                from pg_attribute
+                where attrelid = '%s_old'::regclass and attname = 'id'
+                """
+                % (table, table)
+            )
+            identity, sequence = cursor.fetchone()
+            cursor.execute(
+                """
+                select pg_get_indexdef(indexrelid)
+                from pg_index
+                where indrelid = '%s_old'::regclass and not indisprimary
+                """
+                % table
+            )
+            indexes = [i[0] for i in cursor.fetchall()]
+
+            cursor.execute(
+                """
+                create table %s (like %s_old including defaults%s)
+                partition by list (snapshot_date_id)
+                """
+                % (table, table, " including identity" if identity else "")
+            )
+            cursor.execute(
+                "alter table %s add primary key (id, snapshot_date_id)" % table
+            )
+            cursor.execute(
+                """
+                alter table %s
+                add foreign key (snapshot_date_id)
+                references ax_manager (snapshot_date) match simple
+                on update no action
+                on delete cascade
+                deferrable initially deferred
+                """
+                % table
+            )
+            cursor.execute(
+                "create table %s_default partition of %s default" % (table, table)
+            )
+            for s in snapshots:
+                cursor.execute(
+                    "create table %s_%s partition of %s for values in ('%s')"
+                    % (table, s.strftime("%Y%m%d%H%M%S"), table, s)
+                )
+            cursor.execute("insert into %s select * from %s_old" % (table, table))
+
+            if identity:
+                cursor.execute(
+                    """
+                    select setval(pg_get_serial_sequence('%s', 'id'), coalesce(max(id), 0) + 1, false)
+                    from %s
+                    """
+                    % (table, table)
+                )
+            elif sequence:
+                cursor.execute("alter sequence %s owned by %s.id" % (sequence, table))
+            cursor.execute("drop table %s_old" % table)
+            for idx in indexes:
+                cursor.execute(
+                    re.sub(
+                        r" ON (ONLY )?(public\.)?%s_old " % table,
+                        " ON %s " % table,
+                        idx,
+                    )
+                )
+
+
+def grant_read_access(apps, schema_editor):
+    db = schema_editor.connection.alias
+    role = settings.DATABASES[db].get("SQL_ROLE", "report_role")
+    if role:
+        with connections[db].cursor() as cursor:
+            cursor.execute("select count(*) from pg_roles where rolname = %s", (role,))
+            if not cursor.fetchone()[0]:
+                cursor.execute(
+                    "create role %s with nologin noinherit role current_user" % (role,)
+                )
+            for table in ["ax_demand", "ax_buffer", "ax_operationplan"]:
+                cursor.execute("grant select on table %s to %s" % (table, role))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("archive", "0005_grant_read"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="archivedbuffer",
+            name="valid_until",
+            field=models.DateTimeField(
+                db_index=True, null=True, verbose_name="valid until"
+            ),
+        ),
+        migrations.AddField(
+            model_name="archiveddemand",
+            name="valid_until",
+            field=models.DateTimeField(
+                db_index=True, null=True, verbose_name="valid until"
+            ),
+        ),
+        migrations.AddField(
+            model_name="archivedoperationplan",
+            name="valid_until",
+            field=models.DateTimeField(
+                db_index=True, null=True, verbose_name="valid until"
+            ),
+        ),
+        migrations.RunSQL(
+            """
+            update ax_buffer set valid_until = snapshot_date_id;
+            update ax_demand set valid_until = snapshot_date_id;
+            update ax_operationplan set valid_until = snapshot_date_id;
+            """,
+            migrations.RunSQL.noop,
+        ),
+        migrations.RunPython(
+            code=partition_tables, reverse_code=migrations.RunPython.noop
+        ),
+        migrations.RunPython(
+            code=grant_read_access, reverse_code=migrations.RunPython.noop
+        ),
+        migrations.RunSQL(
+            """
+            insert into common_parameter
+            (name, value, description, lastmodified)
+            values
+            ('archive.delta','false','Only store the records that changed since the previous history snapshot. Values: true, false', now())
+            on conflict(name) do nothing
+            """,
+            "delete from common_parameter where name = 'archive.delta'",
+        ),
+    ]
@@ -47,6 +47,125 @@ class ArchiveManager(models.Model):
         ordering = ["snapshot_date"]
         default_permissions = ()
 
+    # The archive tables are partitioned by snapshot date.
+    # Each snapshot gets its own partition. Rows of snapshots without a
+    # partition are stored in a default partition.
+    archived_tables = ("ax_buffer", "ax_demand", "ax_operationplan")
+
+    @staticmethod
+    def getPartitionName(table, snapshot_date):
+        return "%s_%s" % (table, snapshot_date.strftime("%Y%m%d%H%M%S"))
+
+    @classmethod
+    def createPartitions(cls, cursor, snapshot_date):
+        """
+        Creates the partitions of a snapshot, and moves any rows of the
+        snapshot from the default partition into them.
+        """
+        for table in cls.archived_tables:
+            partition = cls.getPartitionName(table, snapshot_date)
+            cursor.execute("select to_regclass(%s)", (partition,))
+            if cursor.fetchone()[0]:
+                continue
+            cursor.execute(
+                "select exists (select 1 from %s_default where snapshot_date_id = %%s)"
+                % table,
+                (snapshot_date,),
+            )
+            moving = cursor.fetchone()[0]
+            if moving:
+                cursor.execute(
+                    """
+                    create temporary table ax_moving as
+                    select * from %s_default where snapshot_date_id = %%s
+                    """
+                    % table,
+                    (snapshot_date,),
+                )
+                cursor.execute(
+                    "delete from %s_default where snapshot_date_id = %%s" % table,
+                    (snapshot_date,),
+                )
+            cursor.execute(
+                "create table %s partition of %s for values in ('%s')"
+                % (partition, table, snapshot_date)
+            )
+            if moving:
+                cursor.execute("insert into %s select * from ax_moving" % table)
+                cursor.execute("drop table ax_moving")
+
+    @classmethod
+    def deleteSnapshot(cls, cursor, snapshot_date):
+        """
+        Deletes a snapshot by dropping its partitions.
+
+        Rows of the snapshot that remain valid in the next snapshot are first
+        moved to the partition of the next snapshot, and the rows of earlier
+        snapshots that remained valid up to this snapshot now end at the
+        previous snapshot.
+        """
+        cursor.execute(
+            """
+            select
+              (select max(snapshot_date) from ax_manager where snapshot_date < %s),
+              (select min(snapshot_date) from ax_manager where snapshot_date > %s)
+            """,
+            (snapshot_date, snapshot_date),
+        )
+        previous, following = cursor.fetchone()
+        for table in cls.archived_tables:
+            if following:
+                cursor.execute(
+                    """
+                    update %s set snapshot_date_id = %%s
+                    where snapshot_date_id = %%s and valid_until >= %%s
+                    """
+                    % table,
+                    (following, snapshot_date, following),
+                )
+            if previous:
+                cursor.execute(
+                    """
+                    update %s set valid_until = %%s
+                    where valid_until = %%s and snapshot_date_id < %%s
+                    """
+                    % table,
+                    (previous, snapshot_date, snapshot_date),
+                )
+            cursor.execute(
+                "drop table if exists %s" % cls.getPartitionName(table, snapshot_date)
+            )
+        cursor.execute(
+            "delete from ax_manager where snapshot_date = %s", (snapshot_date,)
+        )
+
+    @classmethod
+    def syncPartitions(cls, cursor):
+        """
+        Aligns the partitions with the snapshots, after the snapshot dates
+        have been updated.
+        """
+        cursor.execute("select snapshot_date from ax_manager")
+        snapshots = [i[0] for i in cursor.fetchall()]
+        for table in cls.archived_tables:
+            expected = {cls.getPartitionName(table, s) for s in snapshots}
+            expected.add("%s_default" % table)
+            cursor.execute(
+                """
+                select pg_class.relname
+                from pg_inherits
+                inner join pg_class on pg_class.oid = pg_inherits.inhrelid
+                where pg_inherits.inhparent = %s::regclass
+                """,
+                (table,),
+            )
+            for partition in [i[0] for i in cursor.fetchall()]:
+                if partition not in expected:
+                    # Only contains rows of snapshots that no longer exist
+                    cursor.execute("drop table %s" % partition)
+        for s in snapshots:
+            cls.createPartitions(cursor, s)
+
 
 class ArchivedModel(models.Model):
     """
@@ -63,6 +182,10 @@ class ArchivedModel(models.Model):
         null=False,
         on_delete=models.CASCADE,
     )
+    # Last snapshot in which the record is still valid.
+    # It is later than the snapshot date in the delta-encoded archive mode, where
+    # unchanged records aren't copied again in the next snapshots.
+    valid_until = models.DateTimeField("valid until", null=True, db_index=True)
 
     objects = MultiDBManager()  # The default manager.
 
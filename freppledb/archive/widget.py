@@ -144,18 +144,19 @@ class ArchivedBufferWidget(Widget):
         ]
         cursor.execute(
             """
-            select * from (
             select
               snapshot_date,
               coalesce(sum(onhand), 0),
               coalesce(sum(onhand * cost), 0)
-            from ax_manager
+            from (
+              select snapshot_date from ax_manager
+              order by snapshot_date desc
+              limit %s
+              ) ax_manager
             left outer join ax_buffer
-              on snapshot_date = snapshot_date_id
+              on valid_until >= snapshot_date
+              and snapshot_date_id <= snapshot_date
             group by snapshot_date
-            order by snapshot_date desc
-            limit %s
-            ) d
             order by snapshot_date asc
             """,
             (history,),
@@ -305,20 +306,21 @@ class ArchivedDemandWidget(Widget):
         ]
         cursor.execute(
             """
-            select * from (
             select
               snapshot_date,
               coalesce(sum(quantity), 0),
               coalesce(sum(quantity*cost), 0),
-              coalesce(sum(case when due < snapshot_date_id then quantity end), 0),
-              coalesce(sum(case when due < snapshot_date_id then quantity * cost end), 0)
-            from ax_manager
+              coalesce(sum(case when due < snapshot_date then quantity end), 0),
+              coalesce(sum(case when due < snapshot_date then quantity * cost end), 0)
+            from (
+              select snapshot_date from ax_manager
+              order by snapshot_date desc
+              limit %s
+              ) ax_manager
             left outer join ax_demand
-              on snapshot_date = snapshot_date_id
+              on valid_until >= snapshot_date
+              and snapshot_date_id <= snapshot_date
             group by snapshot_date
-            order by snapshot_date desc
-            limit %s
-            ) d
             order by snapshot_date asc
             """,
             (history,),
@@ -470,21 +472,22 @@ class ArchivedPurchaseOrderWidget(Widget):
         ]
         cursor.execute(
             """
-            select * from (
             select
               snapshot_date,
               coalesce(sum(quantity), 0),
               coalesce(sum(quantity * item_cost), 0),
-              coalesce(sum(case when enddate < snapshot_date_id then quantity end), 0),
-              coalesce(sum(case when enddate < snapshot_date_id then quantity * item_cost end), 0)
-            from ax_manager
+              coalesce(sum(case when enddate < snapshot_date then quantity end), 0),
+              coalesce(sum(case when enddate < snapshot_date then quantity * item_cost end), 0)
+            from (
+              select snapshot_date from ax_manager
+              order by snapshot_date desc
+              limit %s
+              ) ax_manager
             left outer join ax_operationplan
-              on snapshot_date = snapshot_date_id
+              on valid_until >= snapshot_date
+              and snapshot_date_id <= snapshot_date
               and type = 'PO'
             group by snapshot_date
-            order by snapshot_date desc
-            limit %s
-            ) d
             order by snapshot_date
             """,
             (history,),
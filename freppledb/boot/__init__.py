@@ -30,6 +30,8 @@ This app is very closely inspired on http://mezzanine.jupo.org/
 and its handling of injected extra fields.
 """
 import copy
+import hashlib
+import json
 import os
 from importlib import import_module
 from itertools import chain
@@ -288,6 +290,21 @@ def getAttributeFields(
     return result
 
 
+# Custom attribute columns of a database as (table, column, type) rows
+_customColumnsSQL = """
+    select
+      tbl.relname, col.attname, pg_type.typname
+    from pg_catalog.pg_description pgd
+    inner join pg_catalog.pg_attribute col
+      on col.attrelid = pgd.objoid and col.attnum = pgd.objsubid
+    inner join pg_catalog.pg_statio_all_tables tbl
+      on pgd.objoid = tbl.relid
+    inner join pg_type
+      on col.atttypid = pg_type.oid
+    where pgd.description = 'Custom attribute'
+    """
+
+
 def addAttributesFromDatabase():
     # Read attributes defined in the default database
     from django.conf import settings
@@ -310,15 +327,43 @@ def addAttributesFromDatabase():
 
     try:
         with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+            # A single query reads the attributes, the scenarios in use, the
+            # custom attribute columns of the default database and the checksum
+            # stored by the last reconciliation of the schemas
             cursor.execute(
                 """
                 select
-                  model, name, label, type, editable, initially_hidden
-                from common_attribute
+                  (
+                  select json_agg(
+                    json_build_array(model, name, label, type, editable, initially_hidden)
+                    order by model, name
+                    )
+                  from common_attribute
+                  ),
+                  (
+                  select json_agg(
+                    json_build_array(name, status, lastrefresh)
+                    order by name
+                    )
+                  from common_scenario
+                  where status='In use' or name = %%s
+                  ),
+                  (
+                  select json_agg(json_build_array(relname, attname, typname) order by relname, attname)
+                  from (%s) columns
+                  ),
+                  (
+                  select value
+                  from common_parameter
+                  where name = 'attributes.checksum'
+                  )
                 """
+                % _customColumnsSQL,
+                (DEFAULT_DB_ALIAS,),
             )
+            rows, scenarios, defaultcolumns, checksum = cursor.fetchone()
             attributes = {}
-            for x in cursor.fetchall():
+            for x in rows or []:
                 table = x[0]
                 if table in attributes:
                     attributes[table].append((x[1], x[2], x[3], x[4], x[5]))
@@ -330,39 +375,38 @@ def addAttributesFromDatabase():
                 # Shortcut for performance reasons
                 return
 
-            # Loop over all scenarios
-            cursor.execute(
-                """
-                select name
-                from common_scenario
-                where status='In use' or name = %s
-                """,
-                (DEFAULT_DB_ALIAS,),
-            )
-            scenariolist = [i[0] for i in cursor.fetchall()]
+            scenariolist = [i[0] for i in scenarios or []]
             if not scenariolist:
                 scenariolist = [
                     DEFAULT_DB_ALIAS,
                 ]
+
+            # Shortcut when the schemas of all scenarios are already in sync
+            # with the attribute definitions. Copying, restoring or releasing
+            # a scenario changes its status or last refresh, and triggers a
+            # full reconciliation. Only the default database is queried here.
+            newchecksum = hashlib.sha1(
+                json.dumps([rows, scenarios, defaultcolumns]).encode("utf-8")
+            ).hexdigest()
+            if checksum == newchecksum:
+                # Only attributes stored in a custom column are registered.
+                # Attributes matching a regular column of the model are not.
+                custom = set((i[0], i[1]) for i in defaultcolumns or [])
+                for model, cols in attributes.items():
+                    for col in cols:
+                        if (model, col[0]) in custom:
+                            if model not in _register:
+                                _register[model] = []
+                            _register[model].append(col)
+                return
+
+            # Loop over all scenarios
             for scenario in scenariolist:
                 with connections[scenario].cursor() as cursor2:
                     attr_list = copy.deepcopy(attributes)
 
                     # Pick up all existing attribute fields
-                    cursor2.execute(
-                        """
-                        select
-                          tbl.relname, col.attname, pg_type.typname
-                        from pg_catalog.pg_description pgd
-                        inner join pg_catalog.pg_attribute col
-                          on col.attrelid = pgd.objoid and col.attnum = pgd.objsubid
-                        inner join pg_catalog.pg_statio_all_tables tbl
-                          on pgd.objoid = tbl.relid
-                        inner join pg_type
-                          on col.atttypid = pg_type.oid
-                        where pgd.description = 'Custom attribute'
-                        """
-                    )
+                    cursor2.execute(_customColumnsSQL)
                     attr_existing = {}
                     for m, c, t in cursor2.fetchall():
                         if m not in attr_existing:
@@ -442,6 +486,29 @@ def addAttributesFromDatabase():
                                         col[0],
                                     )
                                 )
+
+            # Remember that all scenarios are now in sync
+            cursor.execute(
+                """
+                select json_agg(json_build_array(relname, attname, typname) order by relname, attname)
+                from (%s) columns
+                """
+                % _customColumnsSQL
+            )
+            newchecksum = hashlib.sha1(
+                json.dumps([rows, scenarios, cursor.fetchone()[0]]).encode("utf-8")
+            ).hexdigest()
+            cursor.execute(
+                """
+                insert into common_parameter
+                (name, value, description, lastmodified)
+                values
+                ('attributes.checksum', %s, 'This parameter is automatically populated. It is used to detect changes to the attributes', now())
+                on conflict(name)
+                do update set value = excluded.value, lastmodified = excluded.lastmodified
+                """,
+                (newchecksum,),
+            )
     except Exception:
         # Database or attribute table may not exist yet.
         pass
@@ -97,6 +97,7 @@ from django.conf import settings
 from django.db import DEFAULT_DB_ALIAS, connections
 from django.utils.encoding import force_str
 
+from freppledb.common.models import Parameter, bumpPlanVersion
 from freppledb.execute.models import Task
 
 logger = logging.getLogger(__name__)
@@ -115,11 +116,39 @@ def clean_value(value):
         return value
 
 
+def copy_line(values, sep="\v"):
+    """
+    Formats a list of values as a line for a PostgreSQL COPY command.
+    None values are exported as null. Strings are cleaned with the
+    clean_value function. Other values are converted with str().
+    """
+    return (
+        sep.join(
+            [
+                (
+                    "\\N"
+                    if v is None
+                    else clean_value(v)
+                    if isinstance(v, str)
+                    else str(v)
+                )
+                for v in values
+            ]
+        )
+        + "\n"
+    )
+
+
 class CopyFromGenerator(io.TextIOBase):
     """
     File-like object to handle exporting data to PostgreSQL over
     a copy command.
 
+    The generated lines are collected in chunks of the size requested by
+    the copy command, which avoids many small write calls and repeated
+    slicing of the buffer.
+    Use the setting COPY_BUFFER_SIZE as size argument of the copy command.
+
     Inspired on and copied from:
       https://hakibenita.com/fast-load-data-python-postgresql
     """
@@ -131,32 +160,26 @@ class CopyFromGenerator(io.TextIOBase):
     def readable(self):
         return True
 
-    def _read1(self, n=None):
-        while not self._buff:
+    def read(self, n=None):
+        if n is None or n < 0:
+            data = self._buff + "".join(self._iter)
+            self._buff = ""
+            return data
+        chunks = [self._buff]
+        length = len(self._buff)
+        while length < n:
             try:
-                self._buff = next(self._iter)
+                line = next(self._iter)
             except StopIteration:
                 break
-        ret = self._buff[:n]
-        self._buff = self._buff[len(ret) :]
-        return ret
-
-    def read(self, n=None):
-        line = []
-        if n is None or n < 0:
-            while True:
-                m = self._read1()
-                if not m:
-                    break
-                line.append(m)
-        else:
-            while n > 0:
-                m = self._read1(n)
-                if not m:
-                    break
-                n -= len(m)
-                line.append(m)
-        return "".join(line)
+            chunks.append(line)
+            length += len(line)
+        data = "".join(chunks)
+        if length <= n:
+            self._buff = ""
+            return data
+        self._buff = data[n:]
+        return data[:n]
 
 
 class PlanTask:
@@ -553,7 +576,13 @@ class PlanTaskRegistry:
         cls.arguments = {"database": database, "export": export, "cluster": cluster}
         cls.arguments.update(kwargs)
         cls.reg.timestamp = datetime.now().replace(microsecond=0)
-        cls.reg.run(**cls.arguments)
+        # All tasks of the run see the same parameter values
+        Parameter.freezeCache(database)
+        try:
+            cls.reg.run(**cls.arguments)
+        finally:
+            Parameter.freezeCache(database, False)
+        bumpPlanVersion(database)
         if export:
             logger.info("Finished export at %s" % datetime.now().strftime("%H:%M:%S"))
         else:
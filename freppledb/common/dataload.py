@@ -32,7 +32,8 @@ from django import forms
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.core.validators import EMPTY_VALUES
-from django.db import DEFAULT_DB_ALIAS
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Model
 from django.db.models.fields import (
     IntegerField,
     AutoField,
@@ -55,7 +56,7 @@ from django.utils.encoding import force_str
 from django.utils.formats import get_format
 from django.utils.text import get_text_list
 
-from .models import Comment
+from .models import AuditModel, Comment, HierarchyModel, bumpPlanVersion
 from .localization import parseLocalizedDateTime
 
 
@@ -420,6 +421,228 @@ def _parseData(
     has_pk_field = False
     processed_header = False
     rowWrapper = rowmapper()
+    batchsize = settings.UPLOAD_BATCH_SIZE
+    batched = False
+    batch = []
+    batchKeys = set()
+
+    def processRow(rownumber, rowWrapper):
+        nonlocal changed, added, errors
+        try:
+            # Step 1: Fill the form with data, either updating an existing
+            # instance or creating a new one.
+            if has_pk_field:
+                # A primary key is part of the input fields
+                try:
+                    # Try to find an existing record with the same primary key
+                    it = (
+                        model.objects.using(database)
+                        .only(*fields)
+                        .get(pk=rowWrapper[model._meta.pk.name])
+                    )
+                    form = UploadForm(rowWrapper, instance=it)
+                except model.DoesNotExist:
+                    form = UploadForm(rowWrapper)
+                    it = None
+            elif natural_key:
+                # A natural key exists for this model
+                try:
+                    # Build the natural key
+                    key = []
+                    for x in natural_key:
+                        key.append(rowWrapper.get(x, None))
+                    # Try to find an existing record using the natural key
+                    it = model.objects.get_by_natural_key(*key)
+                    form = UploadForm(rowWrapper, instance=it)
+                except model.DoesNotExist:
+                    form = UploadForm(rowWrapper)
+                    it = None
+                except model.MultipleObjectsReturned:
+                    yield (
+                        ERROR,
+                        rownumber,
+                        None,
+                        None,
+                        force_str(_("Key fields not unique")),
+                    )
+                    return
+            else:
+                # No primary key required for this model
+                form = UploadForm(rowWrapper)
+                it = None
+
+            # Step 2: Validate the form and model, and save to the database
+            if form.has_changed():
+                if form.is_valid():
+                    # Save the form
+                    obj = form.save(commit=False)
+                    if it:
+                        changed += 1
+                        obj.save(using=database, force_update=True)
+                    else:
+                        added += 1
+                        obj.save(using=database, force_insert=True)
+                        # Add the new object in the cache of available keys
+                        for x in selfReferencing:
+                            x.add(obj)
+                    if user:
+                        getComment(obj, it, form).save(using=database)
+                else:
+                    # Validation fails
+                    for error in form.non_field_errors():
+                        errors += 1
+                        yield (ERROR, rownumber, None, None, error)
+                    for field in form:
+                        for error in field.errors:
+                            errors += 1
+                            yield (
+                                ERROR,
+                                rownumber,
+                                field.name,
+                                rowWrapper[field.name],
+                                error,
+                            )
+
+        except Exception as e:
+            errors += 1
+            yield (ERROR, None, None, None, "Exception during upload: %s" % e)
+
+    def processBatch():
+        """
+        Validates a block of rows, and saves it with bulk statements.
+        The existing records for the block are retrieved with a single query.
+        When saving fails, the valid rows are processed again one by one to
+        report the errors on the offending rows.
+        """
+        nonlocal changed, added, errors
+
+        # Step 1: Retrieve all existing records
+        existing = {}
+        if has_pk_field:
+            keys = set()
+            for rownumber, rowData in batch:
+                try:
+                    keys.add(model._meta.pk.to_python(rowData[model._meta.pk.name]))
+                except Exception:
+                    pass
+            existing = {
+                obj.pk: obj
+                for obj in model.objects.using(database)
+                .only(*fields)
+                .filter(pk__in=keys)
+            }
+
+        # Step 2: Validate all rows
+        for name, fld in BatchUploadForm.base_fields.items():
+            if isinstance(fld, BulkForeignKeyFormField):
+                fld.prefetch(rowData[name] for rownumber, rowData in batch)
+        valid = []
+        for rownumber, rowData in batch:
+            try:
+                if has_pk_field:
+                    try:
+                        it = existing.get(
+                            model._meta.pk.to_python(rowData[model._meta.pk.name])
+                        )
+                    except Exception:
+                        it = None
+                elif natural_key:
+                    try:
+                        it = model.objects.get_by_natural_key(
+                            *[rowData.get(x, None) for x in natural_key]
+                        )
+                    except model.DoesNotExist:
+                        it = None
+                    except model.MultipleObjectsReturned:
+                        yield (
+                            ERROR,
+                            rownumber,
+                            None,
+                            None,
+                            force_str(_("Key fields not unique")),
+                        )
+                        continue
+                else:
+                    it = None
+                form = (
+                    BatchUploadForm(rowData, instance=it)
+                    if it
+                    else BatchUploadForm(rowData)
+                )
+                if form.has_changed():
+                    if form.is_valid():
+                        valid.append((rownumber, rowData, it, form))
+                    else:
+                        # Validation fails
+                        for error in form.non_field_errors():
+                            errors += 1
+                            yield (ERROR, rownumber, None, None, error)
+                        for field in form:
+                            for error in field.errors:
+                                errors += 1
+                                yield (
+                                    ERROR,
+                                    rownumber,
+                                    field.name,
+                                    rowData[field.name],
+                                    error,
+                                )
+            except Exception as e:
+                errors += 1
+                yield (ERROR, None, None, None, "Exception during upload: %s" % e)
+        batch.clear()
+        batchKeys.clear()
+
+        # Step 3: Save the valid rows
+        if not valid:
+            return
+        new = []
+        updated = []
+        comments = []
+        now = datetime.now()
+        try:
+            with transaction.atomic(using=database):
+                for rownumber, rowData, it, form in valid:
+                    obj = form.save(commit=False)
+                    _prepareBulkSave(obj, now)
+                    if it:
+                        updated.append(obj)
+                    else:
+                        new.append(obj)
+                if new:
+                    model.objects.using(database).bulk_create(new)
+                if updated and updateFields:
+                    model.objects.using(database).bulk_update(updated, updateFields)
+                if user:
+                    for rownumber, rowData, it, form in valid:
+                        comments.append(getComment(form.instance, it, form))
+                    Comment.createBulk(comments, using=database)
+        except Exception:
+            for rownumber, rowData, it, form in valid:
+                yield from processRow(rownumber, rowData)
+            return
+        changed += len(updated)
+        added += len(new)
+
+    def getComment(obj, it, form):
+        if it:
+            return Comment(
+                user_id=user.id,
+                content_type_id=content_type_id,
+                object_pk=obj.pk,
+                object_repr=force_str(obj)[:200],
+                type="change",
+                comment="Changed %s." % get_text_list(form.changed_data, "and"),
+            )
+        else:
+            return Comment(
+                user_id=user.id,
+                content_type_id=content_type_id,
+                object_pk=obj.pk,
+                object_repr=force_str(obj)[:200],
+                type="add",
+                comment="Added",
+            )
 
     # Detect excel autofilter data tables
     if isinstance(data, Worksheet) and data.auto_filter.ref:
@@ -558,110 +781,60 @@ def _parseData(
                 ):
                     natural_key = model.natural_key
 
+            # Rows are processed in blocks when the model doesn't have special
+            # saving logic and doesn't refer to itself.
+            batched = (
+                batchsize > 1
+                and not hasattr(model, "getModelForm")
+                and not selfReferencing
+                and not model._meta.parents
+                and _supportsBulkSave(model)
+            )
+            if batched:
+                BatchUploadForm = type(
+                    "Batch%s" % UploadForm.__name__,
+                    (UploadForm,),
+                    {"validate_unique": _skipValidateUnique},
+                )
+                updateFields = [
+                    f for f in fields if f != model._meta.pk.name
+                ] + _bulkSaveFields(model)
+
         # Case 3: Process a data row
         else:
-            try:
-                # Step 1: Send a ping-alive message to make the upload interruptable
-                if ping:
-                    if rownumber % 50 == 0:
-                        yield (DEBUG, rownumber, None, None, None)
+            # Send a ping-alive message to make the upload interruptable
+            if ping:
+                if rownumber % 50 == 0:
+                    yield (DEBUG, rownumber, None, None, None)
 
-                # Step 2: Fill the form with data, either updating an existing
-                # instance or creating a new one.
-                if has_pk_field:
-                    # A primary key is part of the input fields
-                    try:
-                        # Try to find an existing record with the same primary key
-                        it = (
-                            model.objects.using(database)
-                            .only(*fields)
-                            .get(pk=rowWrapper[model._meta.pk.name])
-                        )
-                        form = UploadForm(rowWrapper, instance=it)
-                    except model.DoesNotExist:
-                        form = UploadForm(rowWrapper)
-                        it = None
-                elif natural_key:
-                    # A natural key exists for this model
-                    try:
-                        # Build the natural key
-                        key = []
-                        for x in natural_key:
-                            key.append(rowWrapper.get(x, None))
-                        # Try to find an existing record using the natural key
-                        it = model.objects.get_by_natural_key(*key)
-                        form = UploadForm(rowWrapper, instance=it)
-                    except model.DoesNotExist:
-                        form = UploadForm(rowWrapper)
-                        it = None
-                    except model.MultipleObjectsReturned:
-                        yield (
-                            ERROR,
-                            rownumber,
-                            None,
-                            None,
-                            force_str(_("Key fields not unique")),
-                        )
-                        continue
-                else:
-                    # No primary key required for this model
-                    form = UploadForm(rowWrapper)
-                    it = None
-
-                # Step 3: Validate the form and model, and save to the database
-                if form.has_changed():
-                    if form.is_valid():
-                        # Save the form
-                        obj = form.save(commit=False)
-                        if it:
-                            changed += 1
-                            obj.save(using=database, force_update=True)
-                        else:
-                            added += 1
-                            obj.save(using=database, force_insert=True)
-                            # Add the new object in the cache of available keys
-                            for x in selfReferencing:
-                                if x.cache is not None and obj.pk not in x.cache:
-                                    x.cache[obj.pk] = obj
-                        if user:
-                            if it:
-                                Comment(
-                                    user_id=user.id,
-                                    content_type_id=content_type_id,
-                                    object_pk=obj.pk,
-                                    object_repr=force_str(obj)[:200],
-                                    type="change",
-                                    comment="Changed %s."
-                                    % get_text_list(form.changed_data, "and"),
-                                ).save(using=database)
-                            else:
-                                Comment(
-                                    user_id=user.id,
-                                    content_type_id=content_type_id,
-                                    object_pk=obj.pk,
-                                    object_repr=force_str(obj)[:200],
-                                    type="add",
-                                    comment="Added",
-                                ).save(using=database)
-                    else:
-                        # Validation fails
-                        for error in form.non_field_errors():
-                            errors += 1
-                            yield (ERROR, rownumber, None, None, error)
-                        for field in form:
-                            for error in field.errors:
-                                errors += 1
-                                yield (
-                                    ERROR,
-                                    rownumber,
-                                    field.name,
-                                    rowWrapper[field.name],
-                                    error,
-                                )
+            if not batched:
+                yield from processRow(rownumber, rowWrapper)
+                continue
 
-            except Exception as e:
-                errors += 1
-                yield (ERROR, None, None, None, "Exception during upload: %s" % e)
+            # Collect the row in the current block.
+            # A block doesn't contain the same key twice, since the second row
+            # needs to find the record created or updated by the first one.
+            rowData = rowmapper(headers)
+            rowData.setData(rowWrapper.data)
+            if has_pk_field:
+                key = rowData[model._meta.pk.name]
+            elif natural_key:
+                key = tuple(rowData.get(x, None) for x in natural_key)
+            else:
+                key = None
+            if key is not None:
+                if key in batchKeys:
+                    yield from processBatch()
+                batchKeys.add(key)
+            batch.append((rownumber, rowData))
+            if len(batch) >= batchsize:
+                yield from processBatch()
+
+    if batch:
+        yield from processBatch()
+    if batched and (changed or added):
+        # Bulk statements don't send the signals that mark the data as edited
+        bumpPlanVersion(database)
 
     yield (
         INFO,
@@ -681,7 +854,56 @@ def _parseData(
     )
 
 
+def _supportsBulkSave(model):
+    """
+    Verifies the model can be saved with bulk statements: the only save
+    methods it inherits are those we can mimic in _prepareBulkSave.
+    """
+    return all(
+        c in (Model, AuditModel, HierarchyModel)
+        for c in model.__mro__
+        if "save" in c.__dict__
+    )
+
+
+def _prepareBulkSave(obj, now):
+    """
+    Does what the save methods of the abstract base models do.
+    """
+    if isinstance(obj, HierarchyModel):
+        obj.lft = None
+        obj.rght = None
+        obj.lvl = None
+    if isinstance(obj, AuditModel):
+        obj.lastmodified = now
+
+
+def _bulkSaveFields(model):
+    fields = []
+    if issubclass(model, HierarchyModel):
+        fields.extend(["lft", "rght", "lvl"])
+    if issubclass(model, AuditModel):
+        fields.append("lastmodified")
+    return fields
+
+
+def _skipValidateUnique(form):
+    # Uniqueness of the key is verified while processing a block of rows.
+    # Other unique constraints are checked by the database when saving.
+    pass
+
+
 class BulkForeignKeyFormField(forms.fields.Field):
+    """
+    Form field for a foreign key, which avoids a database query per value.
+
+    When the referenced table is small, all its records are cached.
+    Records of bigger tables are retrieved in blocks with the prefetch method,
+    which runs a single query for all keys of a block of uploaded rows.
+    The cache of a bigger table is limited to the same number of records as
+    the complete cache of a small table.
+    """
+
     def __init__(
         self,
         using=DEFAULT_DB_ALIAS,
@@ -690,7 +912,7 @@ class BulkForeignKeyFormField(forms.fields.Field):
         label=None,
         help_text="",
         *args,
-        **kwargs
+        **kwargs,
     ):
         forms.fields.Field.__init__(
             self,
@@ -698,45 +920,83 @@ class BulkForeignKeyFormField(forms.fields.Field):
             required=required if required is not None else not field.null,
             label=label,
             help_text=help_text,
-            **kwargs
+            **kwargs,
         )
 
         # Build a cache with the list of values - as long as it reasonable fits in memory
         self.model = field.remote_field.model
+        self.using = using
         field.remote_field.parent_link = (
             True  # A trick to disable the model validation on foreign keys!
         )
-        if field.remote_field.model._default_manager.all().using(using).count() > 30000:
-            self.queryset = field.remote_field.model._default_manager.all().using(using)
-            self.cache = None
+        self.queryset = field.remote_field.model._default_manager.all().using(using)
+        self.complete = self.queryset.count() <= settings.UPLOAD_CACHE_OBJECTS
+        if self.complete:
+            self.cache = {obj.pk: obj for obj in self.queryset}
+            self.unknown = None
         else:
-            self.queryset = None
-            self.cache = {
-                obj.pk: obj
-                for obj in field.remote_field.model._default_manager.all().using(using)
-            }
+            self.cache = {}
+            self.unknown = set()
+
+    def _key(self, value):
+        try:
+            return self.model._meta.pk.to_python(value)
+        except forms.ValidationError:
+            return None
+
+    def prefetch(self, values):
+        """
+        Retrieves the records not known yet with a single query.
+        """
+        if self.complete:
+            return
+        missing = set()
+        for value in values:
+            if value in EMPTY_VALUES:
+                continue
+            value = self._key(value)
+            if value is not None and value not in self.cache:
+                missing.add(value)
+        missing -= self.unknown
+        if not missing:
+            return
+        if (
+            len(self.cache) + len(self.unknown) + len(missing)
+            > settings.UPLOAD_CACHE_OBJECTS
+        ):
+            self.cache.clear()
+            self.unknown.clear()
+        for obj in self.queryset.filter(pk__in=missing):
+            self.cache[obj.pk] = obj
+            missing.discard(obj.pk)
+        self.unknown.update(missing)
+
+    def add(self, obj):
+        """
+        Adds a newly created object in the cache.
+        """
+        if obj.pk not in self.cache:
+            self.cache[obj.pk] = obj
+        if self.unknown:
+            self.unknown.discard(obj.pk)
 
     def to_python(self, value):
         if value in EMPTY_VALUES:
             return None
-        if self.cache is not None:
-            try:
-                return self.cache[value]
-            except KeyError:
-                raise forms.ValidationError(
-                    _(
-                        "Select a valid choice. That choice is not one of the available choices."
-                    )
-                )
+        if self.complete:
+            key = value
         else:
-            try:
-                return self.queryset.get(pk=value)
-            except self.model.DoesNotExist:
-                raise forms.ValidationError(
-                    _(
-                        "Select a valid choice. That choice is not one of the available choices."
-                    )
+            key = self._key(value)
+            if key is not None and key not in self.cache:
+                self.prefetch([key])
+        try:
+            return self.cache[key]
+        except KeyError:
+            raise forms.ValidationError(
+                _(
+                    "Select a valid choice. That choice is not one of the available choices."
                 )
+            )
 
     def has_changed(self, initial, data):
         return initial != data
@@ -48,7 +48,7 @@ from django.utils.translation import get_supported_language_variant
 from django.utils.translation import gettext_lazy as _
 
 from freppledb.common.auth import MultiDBBackend
-from freppledb.common.models import Scenario, User
+from freppledb.common.models import Scenario, User, flushPlanVersion
 
 import logging
 
@@ -201,6 +201,10 @@ def resetRequest(**kwargs):
     """
     Used as a request_finished signal handler.
     """
+    request = getattr(_thread_locals, "request", None)
+    if request is not None:
+        # Changes saved while streaming the response
+        flushPlanVersion(request)
     setattr(_thread_locals, "request", None)
 
 
@@ -229,6 +233,12 @@ class MultiDBMiddleware:
         # One-time initialisation
         self.get_response = get_response
 
+    def respond(self, request):
+        try:
+            return self.get_response(request)
+        finally:
+            flushPlanVersion(request)
+
     def __call__(self, request):
         # Make request information available throughout the application
         setattr(_thread_locals, "request", request)
@@ -293,7 +303,7 @@ class MultiDBMiddleware:
                         request.database = i
                         if hasattr(request.user, "_state"):
                             request.user._state.db = i.name
-                        response = self.get_response(request)
+                        response = self.respond(request)
                         if not response.streaming:
                             # Note: Streaming response get the request field cleared in the
                             # request_finished signal handler
@@ -308,7 +318,7 @@ class MultiDBMiddleware:
         else:
             # A list of scenarios is already available
             if request.user.is_anonymous:
-                return self.get_response(request)
+                return self.respond(request)
             default_scenario = None
             for i in request.user.scenarios:
                 if i.name == DEFAULT_DB_ALIAS:
@@ -330,7 +340,7 @@ class MultiDBMiddleware:
                         request.user.horizonstart = i.horizonstart
                         request.user.horizonend = i.horizonend
                         request.user.horizonunit = i.horizonunit
-                        response = self.get_response(request)
+                        response = self.respond(request)
                         if not response.streaming:
                             # Note: Streaming response get the request field cleared in the
                             # request_finished signal handler
@@ -346,7 +356,7 @@ class MultiDBMiddleware:
                 request.scenario = default_scenario
             else:
                 request.scenario = Scenario(name=DEFAULT_DB_ALIAS)
-        response = self.get_response(request)
+        response = self.respond(request)
         if not response.streaming:
             # Note: Streaming response get the request field cleared in the
             # request_finished signal handler
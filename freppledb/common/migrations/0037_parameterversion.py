@@ -0,0 +1,89 @@
+#
+# Copyright (C) 2024 by frePPLe bv
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("common", "0036_planversion"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+            -- The version is kept in a table rather than a sequence: a new
+            -- value of a sequence is visible before the change is committed.
+            create table if not exists common_parameterversion (
+              version bigint not null
+            );
+            insert into common_parameterversion (version)
+            select (extract(epoch from now()) * 1000)::bigint
+            where not exists (select 1 from common_parameterversion);
+
+            create or replace function common_parameter_changed() returns trigger as $$
+            begin
+              update common_parameterversion set version = version + 1;
+              return null;
+            end;
+            $$ language plpgsql;
+
+            -- The triggers fire at the end of the transaction, such that the
+            -- row lock on the version is only held while committing.
+            -- The heartbeat of the worker is updated every few seconds and
+            -- doesn't change the version.
+            create constraint trigger common_parameter_inserted
+            after insert on common_parameter
+            deferrable initially deferred
+            for each row
+            when (new.name <> 'Worker alive')
+            execute procedure common_parameter_changed();
+
+            create constraint trigger common_parameter_changed
+            after update on common_parameter
+            deferrable initially deferred
+            for each row
+            when (new.name <> 'Worker alive' or old.name <> 'Worker alive')
+            execute procedure common_parameter_changed();
+
+            create constraint trigger common_parameter_deleted
+            after delete on common_parameter
+            deferrable initially deferred
+            for each row
+            when (old.name <> 'Worker alive')
+            execute procedure common_parameter_changed();
+
+            create trigger common_parameter_truncated
+            after truncate on common_parameter
+            for each statement execute procedure common_parameter_changed();
+            """,
+            reverse_sql="""
+            drop trigger if exists common_parameter_truncated on common_parameter;
+            drop trigger if exists common_parameter_deleted on common_parameter;
+            drop trigger if exists common_parameter_changed on common_parameter;
+            drop trigger if exists common_parameter_inserted on common_parameter;
+            drop function if exists common_parameter_changed();
+            drop table if exists common_parameterversion;
+            """,
+        ),
+    ]
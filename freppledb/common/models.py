@@ -21,6 +21,7 @@
 # WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 #
 from datetime import datetime
+from functools import partial
 from importlib import import_module
 from importlib.util import find_spec
 import inspect
@@ -43,7 +44,7 @@ from django.core import mail
 from django.core.validators import FileExtensionValidator
 from django.db import models, DEFAULT_DB_ALIAS, connections, transaction
 from django.db.models import Q
-from django.db.models.signals import pre_delete
+from django.db.models.signals import pre_delete, post_save, post_delete
 from django.dispatch.dispatcher import receiver
 from django import forms
 from django.forms.models import modelform_factory
@@ -312,13 +313,180 @@ class Parameter(AuditModel):
         verbose_name = _("parameter")
         verbose_name_plural = _("parameters")
 
+    # Process-level cache with the parameters of each database.
+    # The value is a tuple (version, {name: value})
+    _cache = {}
+
+    # Databases for which the cached parameters are used without version check
+    _frozen = set()
+
+    # Databases that have the parameter version table
+    _versioned = set()
+
     @staticmethod
     def getValue(key, database=DEFAULT_DB_ALIAS, default=None):
         try:
-            return Parameter.objects.using(database).only("value").get(pk=key).value
+            return Parameter.getAll(database).get(key, default)
         except Exception:
             return default
 
+    @staticmethod
+    def getAll(database=DEFAULT_DB_ALIAS):
+        """
+        Returns a dictionary with all parameters of a database.
+
+        All parameters are read with a single query and cached in the process.
+        The database keeps a version number that changes with every committed
+        change to the parameter table, except for the heartbeat of the worker.
+        It is checked once per web request, so a request sees a consistent set
+        of parameters.
+        During a plan run the cache is frozen, and the version isn't checked
+        at all.
+        """
+        cached = Parameter._cache.get(database, None)
+        if cached and database in Parameter._frozen:
+            return cached[1]
+        from freppledb.common.middleware import _thread_locals
+
+        request = getattr(_thread_locals, "request", None)
+        checked = getattr(request, "parameterversion", None)
+        if cached and checked and checked.get(database, None) == cached[0]:
+            return cached[1]
+        with connections[database].cursor() as cursor:
+            if database not in Parameter._versioned:
+                # Note: the version table doesn't exist yet while migrating
+                cursor.execute(
+                    "select to_regclass('common_parameterversion') is not null"
+                )
+                if not cursor.fetchone()[0]:
+                    cursor.execute("select name, value from common_parameter")
+                    return {i[0]: i[1] for i in cursor.fetchall()}
+                Parameter._versioned.add(database)
+            cursor.execute("select version from common_parameterversion")
+            version = cursor.fetchone()[0]
+            if not cached or cached[0] != version:
+                # The version and the values are read in the same snapshot
+                cursor.execute(
+                    """
+                    select common_parameterversion.version, name, value
+                    from common_parameterversion
+                    left outer join common_parameter on true
+                    """
+                )
+                values = {}
+                for version, name, value in cursor.fetchall():
+                    if name is not None:
+                        values[name] = value
+                cached = (version, values)
+                if connections[database].in_atomic_block:
+                    # Uncommitted changes aren't cached: they can be rolled back
+                    return values
+                Parameter._cache[database] = cached
+        if request is not None:
+            if checked is None:
+                checked = {}
+                request.parameterversion = checked
+            checked[database] = version
+        return cached[1]
+
+    @staticmethod
+    def freezeCache(database=DEFAULT_DB_ALIAS, frozen=True):
+        """
+        Freezes or unfreezes the parameters used by this process.
+        Freezing starts from a fresh copy of the parameters.
+        """
+        if frozen:
+            Parameter.clearCache(database)
+            Parameter._frozen.add(database)
+        else:
+            Parameter._frozen.discard(database)
+
+    @staticmethod
+    def clearCache(database=DEFAULT_DB_ALIAS):
+        """
+        Needs to be called after updating parameters with raw SQL statements.
+        """
+        Parameter._cache.pop(database, None)
+
+
+def getPlanVersion(database=DEFAULT_DB_ALIAS, bumped=False):
+    """
+    Returns a stamp that changes whenever the plan or the data is edited.
+    With the bumped argument the stamp after the next bump is returned.
+    """
+    with connections[database].cursor() as cursor:
+        cursor.execute("select last_value, is_called from common_planversion")
+        last_value, is_called = cursor.fetchone()
+        if bumped:
+            return last_value + 1 if is_called else last_value
+        return last_value if is_called else 0
+
+
+def bumpPlanVersion(database=DEFAULT_DB_ALIAS):
+    """
+    Marks all results computed from the plan or the data as outdated.
+    """
+    with connections[database].cursor() as cursor:
+        cursor.execute("select nextval('common_planversion')")
+
+
+def _bumpPlanVersionOnCommit(database):
+    connections[database].planversion_callback = None
+    bumpPlanVersion(database)
+
+
+def flushPlanVersion(request):
+    """
+    Bumps the plan version for the changes saved outside a transaction
+    while processing a web request.
+    """
+    for database in getattr(request, "planversion_pending", ()):
+        bumpPlanVersion(database)
+    request.planversion_pending = set()
+
+
+def planChanged(using=DEFAULT_DB_ALIAS):
+    """
+    Bumps the plan version after the data was edited.
+    Needs to be called after updates that don't send a post_save signal,
+    such as QuerySet.update and raw SQL statements.
+
+    The version is bumped only once per transaction, or once per web request
+    for the changes saved outside a transaction.
+    """
+    conn = connections[using]
+    if conn.in_atomic_block:
+        callback = getattr(conn, "planversion_callback", None)
+        # A rolled back transaction discards its callback
+        if callback and any(i[1] is callback for i in conn.run_on_commit):
+            return
+        conn.planversion_callback = partial(_bumpPlanVersionOnCommit, using)
+        transaction.on_commit(conn.planversion_callback, using=using)
+        return
+    from freppledb.common.middleware import _thread_locals
+
+    request = getattr(_thread_locals, "request", None)
+    if request is None:
+        bumpPlanVersion(using)
+    elif hasattr(request, "planversion_pending"):
+        request.planversion_pending.add(using)
+    else:
+        request.planversion_pending = {using}
+
+
+@receiver([post_save, post_delete])
+def data_changed(sender, using=DEFAULT_DB_ALIAS, raw=False, **kwargs):
+    # Parameters are excluded: some of them are updated continuously
+    if not raw and issubclass(sender, AuditModel) and sender is not Parameter:
+        planChanged(using)
+
+
+@receiver([post_save, post_delete], sender=Parameter)
+def parameter_changed(sender, instance, using=DEFAULT_DB_ALIAS, **kwargs):
+    # The heartbeat of the worker is read from the database directly
+    if instance.name != "Worker alive":
+        Parameter.clearCache(using)
+
 
 class Scenario(models.Model):
     scenarioStatus = (("free", _("free")), ("in use", _("in use")), ("busy", _("busy")))
@@ -788,17 +956,32 @@ class Comment(models.Model):
             update_fields=update_fields,
         )
         if update_fields != ["processed"]:
-            req = getattr(_thread_locals, "request", None)
-            NotificationFactory.launchWorker(
-                database=using,
-                url=(
-                    "%s://%s" % ("https" if req.is_secure() else "http", req.get_host())
-                    if req
-                    else None
-                ),
-            )
+            self.launchNotifications(using)
         return tmp
 
+    @staticmethod
+    def launchNotifications(using=DEFAULT_DB_ALIAS):
+        from .middleware import _thread_locals
+
+        req = getattr(_thread_locals, "request", None)
+        NotificationFactory.launchWorker(
+            database=using,
+            url=(
+                "%s://%s" % ("https" if req.is_secure() else "http", req.get_host())
+                if req
+                else None
+            ),
+        )
+
+    @classmethod
+    def createBulk(cls, comments, using=DEFAULT_DB_ALIAS):
+        """
+        Saves a list of comments with a single statement.
+        """
+        if comments:
+            cls.objects.using(using).bulk_create(comments)
+            cls.launchNotifications(using)
+
     def attachmentlink(self):
         if self.attachment:
             return mark_safe(
@@ -100,6 +100,8 @@ from freppledb.common.models import (
     Bucket,
     HierarchyModel,
     NotificationFactory,
+    getPlanVersion,
+    planChanged,
 )
 from freppledb.common.dataload import parseExcelWorksheet, parseCSVdata
 from freppledb.common.localization import parseLocalizedDate, parseLocalizedDateTime
@@ -1561,8 +1563,25 @@ class GridReport(View):
             cnt = (page - 1) * request.pagesize + 1
             if hasattr(cls, "query"):
                 return cls.query(request, query[cnt - 1 : cnt + request.pagesize])
-            else:
-                return query[cnt - 1 : cnt + request.pagesize].values(*fields)
+            resultcache = getattr(request, "resultcache", None)
+            if resultcache:
+                # Continue after the last row of the previous page
+                sortfields = resultcache[2]
+                query = query.order_by(
+                    *[("-%s" % f) if desc else f for f, desc in sortfields]
+                )
+                fields = list(fields) + [f for f, desc in sortfields if f not in fields]
+                request.keyset_page = page
+                key = resultcache[1]["keys"].get(page - 1, None)
+                if key:
+                    return (
+                        query.filter(cls._getKeysetFilter(sortfields, key))[
+                            : request.pagesize + 1
+                        ]
+                        .values(*fields)
+                        .iterator()
+                    )
+            return query[cnt - 1 : cnt + request.pagesize].values(*fields)
         else:
             limit = getattr(request, "limit", 0)
             if limit:
@@ -1591,22 +1610,122 @@ class GridReport(View):
                     request.database
                 )
 
+        resultcache = cls._getResultCache(request)
+        if resultcache and "count" in resultcache[1]:
+            return resultcache[1]["count"]
+
         tmp = request.query.query.get_compiler(request.database).as_sql(
             with_col_aliases=False
         )
         with connections[request.database].cursor() as cursor:
             cursor.execute("select count(*) from (" + tmp[0] + ") t_subquery", tmp[1])
             cache_val = cursor.fetchone()[0]
+            if resultcache:
+                resultcache[1]["count"] = cache_val
+                cache.set(resultcache[0], resultcache[1], settings.GRID_CACHE_TIMEOUT)
             return cache_val
 
+    @classmethod
+    def _getResultCache(cls, request):
+        """
+        Returns a tuple with the cache key, the cached results and the sort
+        fields for the query, filter and sort order of the request.
+        The cache stores the record count and the sort key of the last row of
+        each page served, which allows to fetch the next page without an offset.
+        The key of the cache includes the plan version, such that any edit of
+        the plan or the data invalidates the cache.
+        """
+        if not settings.GRID_CACHE_TIMEOUT or hasattr(cls, "query"):
+            return None
+        try:
+            sortfields = cls._getKeysetFields(cls._apply_sort(request, request.query))
+            if not sortfields:
+                return None
+            sql, params = (
+                request.query.order_by(
+                    *[("-%s" % f) if desc else f for f, desc in sortfields]
+                )
+                .query.get_compiler(request.database)
+                .as_sql(with_col_aliases=False)
+            )
+            key = (
+                "gridreport_%s"
+                % sha1(
+                    repr(
+                        (
+                            cls.__module__,
+                            cls.__name__,
+                            request.database,
+                            request.user.pk,
+                            request.pagesize,
+                            sql,
+                            params,
+                            getPlanVersion(request.database),
+                        )
+                    ).encode("utf-8")
+                ).hexdigest()
+            )
+        except Exception as e:
+            logger.warning("Grid report result cache not available: %s" % e)
+            return None
+        request.resultcache = (key, cache.get(key) or {"keys": {}}, sortfields)
+        return request.resultcache
+
+    @staticmethod
+    def _getKeysetFields(query):
+        """
+        Returns a list of (field name, descending) tuples with the sort order
+        of the query, completed with the primary key to make it unique.
+        Returns None when the sort order isn't suited for keyset pagination.
+        """
+        pk = query.model._meta.pk.name
+        sortfields = []
+        for f in query.query.order_by:
+            if not isinstance(f, str) or f == "?" or "." in f:
+                return None
+            desc = f.startswith("-")
+            f = f.lstrip("-+")
+            if f == "pk":
+                f = pk
+            sortfields.append((f, desc))
+        if not any(f == pk for f, desc in sortfields):
+            sortfields.append((pk, False))
+        return sortfields
+
+    @staticmethod
+    def _getKeysetFilter(sortfields, key):
+        """
+        Builds a filter selecting the rows that sort after the given key.
+        PostgreSQL sorts null values last in ascending order and first in
+        descending order.
+        """
+        q = None
+        for idx, (f, desc) in enumerate(sortfields):
+            if key[idx] is None:
+                term = models.Q(**{"%s__isnull" % f: False}) if desc else None
+            elif desc:
+                term = models.Q(**{"%s__lt" % f: key[idx]})
+            else:
+                term = models.Q(**{"%s__gt" % f: key[idx]}) | models.Q(
+                    **{"%s__isnull" % f: True}
+                )
+            if term is not None:
+                for prev in range(idx):
+                    if key[prev] is None:
+                        term &= models.Q(**{"%s__isnull" % sortfields[prev][0]: True})
+                    else:
+                        term &= models.Q(**{sortfields[prev][0]: key[prev]})
+                q = term if q is None else q | term
+        return q if q is not None else models.Q(pk__in=[])
+
     @classmethod
     def _generate_json_data(cls, request, *args, **kwargs):
         request.prefs = request.user.getPreference(
             cls.getKey(request, *args, **kwargs), database=request.database
         )
-        recs = cls.count_query(request, *args, **kwargs)
         if "rows" in request.GET:
             request.pagesize = int(request.GET["rows"])
+        recs = cls.count_query(request, *args, **kwargs)
         total_pages = math.ceil(float(recs) / request.pagesize)
         page = request.GET.get("page", 1)
         if page is not None:
@@ -1630,7 +1749,14 @@ class GridReport(View):
         # GridReport
         first = True
         fields = [i.field_name for i in request.rows if i.field_name]
+        rownumber = 0
         for i in cls.data_query(request, *args, fields=fields, page=page, **kwargs):
+            rownumber += 1
+            if rownumber == request.pagesize and getattr(request, "keyset_page", None):
+                # Remember where the next page starts
+                resultcache = request.resultcache
+                resultcache[1]["keys"][page] = tuple(i[f] for f, desc in resultcache[2])
+                cache.set(resultcache[0], resultcache[1], settings.GRID_CACHE_TIMEOUT)
             if first:
                 r = ["{"]
                 first = False
@@ -2151,6 +2277,7 @@ class GridReport(View):
                                 cls.model.objects.all().using(request.database).filter(
                                     pk__in=data["update"]["pk"]
                                 ).update(**fields)
+                                planChanged(request.database)
                                 for o in data["update"]["pk"]:
                                     Comment(
                                         user_id=request.user.id,
@@ -2168,6 +2295,7 @@ class GridReport(View):
                                 if flt:
                                     objs = objs.filter(flt)
                                 objs.update(**fields)
+                                planChanged(request.database)
                                 for k in objs:
                                     Comment(
                                         user_id=request.user.id,
@@ -2676,13 +2676,24 @@ $(function () {
   getUnreadMessages();
 
   // Autocomplete search functionality
+  var searchrequest = null;
   var searchsource = new Bloodhound({
     datumTokenizer: Bloodhound.tokenizers.obj.whitespace('value'),
     queryTokenizer: Bloodhound.tokenizers.whitespace,
     //prefetch: '/search/',
     remote: {
       url: url_prefix + '/search/?term=%QUERY',
-      wildcard: '%QUERY'
+      wildcard: '%QUERY',
+      // A new keystroke aborts the search that is still running
+      transport: function (options, onSuccess, onError) {
+        if (searchrequest)
+          searchrequest.abort();
+        var request = $.ajax(options).done(onSuccess).fail(onError).always(function () {
+          if (searchrequest === request)
+            searchrequest = null;
+        });
+        searchrequest = request;
+      }
     }
   });
   $('.search-input').typeahead({ minLength: 2 }, {
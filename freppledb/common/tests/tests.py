@@ -21,12 +21,17 @@
 # WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 #
 
+from datetime import datetime
+import json
 import os
 
+from django.db import connection
 from django.http.response import StreamingHttpResponse
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
 
-from freppledb.common.models import User, Scenario
+from freppledb.common.commands import copy_line, CopyFromGenerator
+from freppledb.common.models import Parameter, User, Scenario, getPlanVersion
+from freppledb.input.models import Item
 
 
 def checkResponse(testcase, response):
@@ -51,6 +56,106 @@ class DataLoadTest(TestCase):
         self.fail("Didn't find expected number of parameters")
 
 
+class GridReportCacheTest(TestCase):
+    def setUp(self):
+        self.client.login(username="admin", password="admin")
+        for i in range(25):
+            Item(name="item %02d" % i, cost=i % 4).save()
+
+    def getPages(self, sort):
+        pages = []
+        for page in range(1, 4):
+            response = self.client.get(
+                "/data/input/item/?format=json&rows=10&page=%s&%s" % (page, sort)
+            )
+            data = json.loads(b"".join(response.streaming_content))
+            pages.append([r["name"] for r in data["rows"]])
+        return pages
+
+    def getCount(self, sort):
+        response = self.client.get(
+            "/data/input/item/?format=json&rows=10&page=1&%s" % sort
+        )
+        return json.loads(b"".join(response.streaming_content))["records"]
+
+    def test_keyset_pages(self):
+        for sort in ("sidx=cost&sord=desc", "sidx=name&sord=asc"):
+            with override_settings(GRID_CACHE_TIMEOUT=0):
+                expected = self.getPages(sort)
+            # First pass fills the cache, the second pass uses it
+            self.assertEqual(self.getPages(sort), expected)
+            self.assertEqual(self.getPages(sort), expected)
+
+    def test_invalidation(self):
+        count = self.getCount("sidx=name&sord=asc")
+        # The plan version is bumped when the transaction commits
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            Item(name="item 99").save()
+            Item(name="item 98").save()
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self.getCount("sidx=name&sord=asc"), count + 2)
+
+    def test_mass_update(self):
+        # Mass edits update a queryset and don't send a post_save signal
+        before = getPlanVersion()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/data/input/item/",
+                json.dumps(
+                    {"update": {"pk": ["item 01", "item 02"], "fields": {"cost": "7"}}}
+                ),
+                content_type="application/json",
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Item.objects.filter(cost=7).count(), 2)
+        self.assertNotEqual(getPlanVersion(), before)
+
+
+class ParameterCacheTest(TransactionTestCase):
+    def setParameter(self, value):
+        # Raw update that bypasses the model signals
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "update common_parameter set value = %s where name = 'test.cache'",
+                (value,),
+            )
+
+    def test_cache(self):
+        Parameter(name="test.cache", value="1").save()
+        self.assertEqual(Parameter.getValue("test.cache"), "1")
+        self.assertIsNone(Parameter.getValue("test.missing"))
+        self.assertEqual(Parameter.getValue("test.missing", default="x"), "x")
+
+        # Committed changes are picked up through the version check
+        self.setParameter("2")
+        self.assertEqual(Parameter.getValue("test.cache"), "2")
+
+        # A frozen cache doesn't see the changes until it is cleared
+        Parameter.freezeCache()
+        try:
+            self.assertEqual(Parameter.getValue("test.cache"), "2")
+            self.setParameter("3")
+            self.assertEqual(Parameter.getValue("test.cache"), "2")
+            Parameter.objects.get(name="test.cache").save()
+            self.assertEqual(Parameter.getValue("test.cache"), "3")
+        finally:
+            Parameter.freezeCache(frozen=False)
+
+        Parameter.objects.get(name="test.cache").delete()
+        self.assertIsNone(Parameter.getValue("test.cache"))
+
+    def test_heartbeat(self):
+        # The heartbeat of the worker doesn't change the parameter version
+        Parameter.getValue("test.cache")
+        version = Parameter._cache["default"][0]
+        Parameter(name="Worker alive", value="2024-01-01 00:00:00").save()
+        Parameter.getValue("test.cache")
+        self.assertEqual(Parameter._cache["default"][0], version)
+        Parameter(name="test.cache", value="1").save()
+        Parameter.getValue("test.cache")
+        self.assertNotEqual(Parameter._cache["default"][0], version)
+
+
 class UserPreferenceTest(TestCase):
     def test_get_set_preferences(self):
         user = User.objects.all().get(username="admin")
@@ -77,3 +182,25 @@ class AppsAndAboutTest(TestCase):
         self.assertEqual(response.status_code, 200)
         response = self.client.get("/about/")
         self.assertEqual(response.status_code, 200)
+
+
+class CopyFromGeneratorTest(SimpleTestCase):
+    def test_copy_line(self):
+        self.assertEqual(
+            copy_line(["a\\b", None, 1.5, True, datetime(2024, 1, 2, 3, 4, 5)]),
+            "a\\\\b\v\\N\v1.5\vTrue\v2024-01-02 03:04:05\n",
+        )
+        self.assertEqual(copy_line(["line1\nline2"], sep="\t"), "line1\\nline2\n")
+
+    def test_chunks(self):
+        lines = ["%s\n" % i for i in range(1000)]
+        gen = CopyFromGenerator(iter(lines))
+        chunks = []
+        while True:
+            data = gen.read(100)
+            if not data:
+                break
+            self.assertLessEqual(len(data), 100)
+            chunks.append(data)
+        self.assertEqual("".join(chunks), "".join(lines))
+        self.assertEqual(CopyFromGenerator(iter(lines)).read(), "".join(lines))
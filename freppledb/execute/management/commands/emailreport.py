@@ -52,6 +52,9 @@ class Command(BaseCommand):
 
     requires_system_checks = []
 
+    # The command can run together with other non-exclusive tasks
+    exclusive = False
+
     def get_version(self):
         return __version__
 
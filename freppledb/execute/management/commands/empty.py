@@ -36,7 +36,7 @@ from django.template.loader import render_to_string
 
 from freppledb.execute.models import Task
 from freppledb.common.middleware import _thread_locals
-from freppledb.common.models import User
+from freppledb.common.models import User, bumpPlanVersion
 from freppledb.common.report import EXCLUDE_FROM_BULK_OPERATIONS
 import freppledb.input.models as inputmodels
 from freppledb import __version__
@@ -252,13 +252,17 @@ class Command(BaseCommand):
                 tables.add("operationplanmaterial")
                 tables.add("operationplanresource")
                 tables.add("out_problem")
+            if "operationplan" in tables or "demand" in tables:
+                tables.add("out_pegging")
             if "resource" in tables and "out_resourceplan" not in tables:
                 tables.add("out_resourceplan")
+            if "out_resourceplan" in tables:
+                tables.add("out_resourceplanbucket")
             if "freppledb.forecast" in settings.INSTALLED_APPS:
                 if "forecast" in tables:
                     tables.add("forecastplan")
                 if "forecastplan" in tables:
-                    cursor.execute("refresh materialized view forecastreport_view")
+                    tables.add("forecastreport_view")
             if "demand" in tables and "out_constraint" not in tables:
                 tables.add("out_constraint")
             if (
@@ -316,6 +320,7 @@ class Command(BaseCommand):
                     cursor.execute("update common_user set horizonbuckets = null")
                 for stmt in connections[database].ops.sql_flush(no_style(), tables):
                     cursor.execute(stmt)
+            bumpPlanVersion(database)
 
             # Task update
             task.status = "Done"
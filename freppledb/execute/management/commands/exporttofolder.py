@@ -63,6 +63,9 @@ class Command(BaseCommand):
 
     requires_system_checks = []
 
+    # The command can run together with other non-exclusive tasks
+    exclusive = False
+
     # The "statements" variable is only used during a transition period
     # to give customers the time to migrate their legacy custom configuration.
     statements = [
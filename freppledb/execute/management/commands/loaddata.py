@@ -36,6 +36,7 @@ from freppledb.common.models import User
 from freppledb.common.middleware import _thread_locals
 from freppledb.common.report import getCurrentDate
 from freppledb.execute.models import Task
+from freppledb.output.commands import ExportPegging
 
 
 class Command(loaddata.Command):
@@ -133,6 +134,12 @@ class Command(loaddata.Command):
             # Excecute the standard django command
             super().handle(*fixture_labels, **options)
 
+            # Fixtures can contain demand pegging: rebuild its materialized tree
+            with transaction.atomic(using=database, savepoint=False):
+                with connections[database].cursor() as cursor:
+                    cursor.execute("truncate table out_pegging")
+                    cursor.execute(ExportPegging.peggingsql % ("",))
+
             # if the fixture doesn't contain the 'demo' word, let's not apply loaddata post-treatments
             if "FREPPLE_TEST" in os.environ:
                 return
@@ -178,6 +185,8 @@ class Command(loaddata.Command):
 
                 # Update archive tables
                 if "freppledb.archive" in settings.INSTALLED_APPS:
+                    from freppledb.archive.models import ArchiveManager
+
                     # ax_manager table needs to be updated in the right order.
                     # Otherwise we can get duplicates.
                     cursor.execute(
@@ -196,29 +205,33 @@ class Command(loaddata.Command):
                     cursor.execute(
                         """
                         update ax_buffer set
-                          snapshot_date_id = snapshot_date_id + %s * interval '1 day'
+                          snapshot_date_id = snapshot_date_id + %s * interval '1 day',
+                          valid_until = valid_until + %s * interval '1 day'
                         """,
-                        (offset,),
+                        2 * (offset,),
                     )
                     cursor.execute(
                         """
                         update ax_demand set
                           snapshot_date_id = snapshot_date_id + %s * interval '1 day',
+                          valid_until = valid_until + %s * interval '1 day',
                           due = due + %s * interval '1 day',
                           deliverydate = deliverydate + %s * interval '1 day'
                         """,
-                        3 * (offset,),
+                        4 * (offset,),
                     )
                     cursor.execute(
                         """
                         update ax_operationplan set
                           snapshot_date_id = snapshot_date_id + %s * interval '1 day',
+                          valid_until = valid_until + %s * interval '1 day',
                           startdate = startdate + %s * interval '1 day',
                           enddate = enddate + %s * interval '1 day',
                           due = due + %s * interval '1 day'
                         """,
-                        4 * (offset,),
+                        5 * (offset,),
                     )
+                    ArchiveManager.syncPartitions(cursor)
 
                 # Task update
                 task.status = "Done"
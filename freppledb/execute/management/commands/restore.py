@@ -30,7 +30,7 @@ from django.conf import settings
 from django.db import DEFAULT_DB_ALIAS
 
 from freppledb.execute.models import Task
-from freppledb.common.models import User
+from freppledb.common.models import Parameter, User
 from freppledb import __version__
 
 
@@ -132,6 +132,11 @@ class Command(BaseCommand):
                     p.wait()
                     raise Exception("Database restoration failed")
 
+            # The restored schema needs to be reconciled with the attributes
+            Parameter.objects.using(DEFAULT_DB_ALIAS).filter(
+                name="attributes.checksum"
+            ).delete()
+
             # Task update
             # We need to recreate a new task record, since the previous one is lost during the restoration.
             task = Task(
@@ -24,16 +24,18 @@
 from datetime import datetime, timedelta
 import logging
 from multiprocessing import Process
+from multiprocessing.connection import wait
 import operator
 import os
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 import shlex
-from subprocess import Popen
+from subprocess import DEVNULL, Popen
 import sys
 from threading import Thread
 import time
 
 from django.conf import settings
-from django.core.management import get_commands
+from django.core.management import get_commands, load_command_class
 from django.core.management.base import BaseCommand, CommandError
 from django.db import DEFAULT_DB_ALIAS, connections
 
@@ -79,7 +81,14 @@ def checkActive(database=DEFAULT_DB_ALIAS):
 
 def launchWorker(database=DEFAULT_DB_ALIAS):
     os.environ["FREPPLE_CONFIGDIR"] = settings.FREPPLE_CONFIGDIR
-    if not checkActive(database):
+    if checkActive(database):
+        # Wake up the running worker
+        try:
+            with connections[database].cursor() as cursor:
+                cursor.execute("notify %s" % TaskListener.channel)
+        except Exception:
+            pass
+    else:
         if os.path.isfile(os.path.join(settings.FREPPLE_APP, "frepplectl.py")):
             if "python" in sys.executable:
                 # Development layout
@@ -119,79 +128,269 @@ def launchWorker(database=DEFAULT_DB_ALIAS):
             Popen(["frepplectl", "runworker", "--database=%s" % database])
 
 
-def runTask(task, database):
+class TaskListener:
+    """
+    Dedicated database connection listening for notifications about new tasks.
+
+    The launchWorker function sends a notification when a worker is already
+    active. Without a notification the worker checks the queue every 5 seconds.
+    A separate connection is used because all django connections are closed
+    before launching a task.
+    """
+
+    channel = "frepple_task"
+
+    def __init__(self, database=DEFAULT_DB_ALIAS):
+        conn = connections[database]
+        self.connection = conn.get_new_connection(conn.get_connection_params())
+        self.connection.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        with self.connection.cursor() as cursor:
+            cursor.execute("listen %s" % self.channel)
+
+    def wait(self, timeout, processes=[]):
+        """
+        Waits till a notification arrives, one of the processes finishes or
+        the timeout expires.
+        """
+        wait([self.connection] + [p.sentinel for p in processes], timeout)
+        self.connection.poll()
+        self.connection.notifies.clear()
+
+    def close(self):
+        try:
+            self.connection.close()
+        except Exception:
+            pass
+
+
+_exclusive = {}
+
+
+def isExclusive(name):
+    """
+    Tasks are exclusive unless their command class has an attribute
+    "exclusive" set to False.
+    An exclusive task never runs at the same time as any other task on a
+    database. Only non-exclusive tasks run together.
+    """
+    if name not in _exclusive:
+        try:
+            _exclusive[name] = getattr(
+                load_command_class(get_commands()[name], name), "exclusive", True
+            )
+        except Exception:
+            _exclusive[name] = True
+    return _exclusive[name]
+
+
+def startTask(task, database):
+    """
+    Launches a task in a child process, and returns the process.
+    None is returned when the task is not recognized.
+    """
     task.started = datetime.now()
     # Verify the command exists
-    exists = False
-    for commandname in get_commands():
-        if commandname == task.name:
-            exists = True
-            break
-
-    if not exists:
+    if task.name not in get_commands():
         # No such task exists
         logger.error("Task %s not recognized" % task.name)
         task.status = "Failed"
         task.processid = None
         task.save(using=database)
+        return None
+
+    # Close all database connections to assure the parent and child
+    # process don't share them.
+    connections.close_all()
+    # Spawn a new command process
+    args = []
+    kwargs = {"database": database, "task": task.id, "verbosity": 0}
+    if task.arguments:
+        for i in shlex.split(task.arguments or ""):
+            if "=" in i:
+                key, val = i.split("=")
+                kwargs[key.strip("--").replace("-", "_")] = val
+            else:
+                args.append(i)
+    child = Process(
+        target=runCommand,
+        args=(task.name, *args),
+        kwargs=kwargs,
+        name="frepplectl %s" % task.name,
+    )
+    child.start()
+
+    # Normally, the child will update the processid.
+    # Just to make sure, we do it also here.
+    task.processid = child.pid
+    task.save(update_fields=["processid"], using=database)
+    return child
+
+
+def finishTask(task, database):
+    """
+    Updates a task after its child process finished.
+    """
+    background = "background" in task.arguments if task.arguments else False
+
+    # Read the task again from the database and update it
+    task = Task.objects.all().using(database).get(pk=task.id)
+    task.processid = None
+    if (
+        task.status not in ("Done", "Failed") or not task.finished or not task.started
+    ) and task.status != "Canceled":
+        now = datetime.now()
+        if not task.started:
+            task.started = now
+        if not background:
+            if not task.finished:
+                task.finished = now
+            if task.status not in ("Done", "Failed"):
+                task.status = "Done"
+        task.save(using=database)
+    if "FREPPLE_TEST" not in os.environ:
+        logger.debug(
+            "Worker %s for database '%s' finished task %d at %s: success"
+            % (
+                os.getpid(),
+                settings.DATABASES[database]["NAME"],
+                task.id,
+                datetime.now(),
+            )
+        )
+
+
+def failTask(task, database, e):
+    # Read the task again from the database and update.
+    task = Task.objects.all().using(database).get(pk=task.id)
+    task.status = "Failed"
+    now = datetime.now()
+    if not task.started:
+        task.started = now
+    task.finished = now
+    task.message = str(e)
+    task.save(using=database)
+    if "FREPPLE_TEST" not in os.environ:
+        logger.debug(
+            "Worker %s for database '%s' finished task %d at %s: failed"
+            % (
+                os.getpid(),
+                settings.DATABASES[database]["NAME"],
+                task.id,
+                datetime.now(),
+            )
+        )
+
+
+def runTask(task, database):
+    child = startTask(task, database)
+    if child:
+        # Wait for the child to finish
+        child.join()
+        finishTask(task, database)
+
+
+def BenchmarkLatency(database=DEFAULT_DB_ALIAS, count=20, interval=1.0):
+    """
+    Code used for measuring the delay between submitting a task and the
+    worker picking it up.
+
+    Tasks with an unknown command are submitted at a fixed interval. The
+    worker fails them immediately, which allows measuring the queue latency
+    without the time to launch and run a command.
+
+    To test, run the following command:
+       frepplectl shell -c "from freppledb.execute.management.commands.runworker import BenchmarkLatency; BenchmarkLatency()"
+    """
+    tasks = []
+    for cnt in range(count):
+        task = Task(
+            name="benchmark_latency", submitted=datetime.now(), status="Waiting"
+        )
+        task.save(using=database)
+        tasks.append(task.id)
+        launchWorker(database)
+        time.sleep(interval)
+
+    # Wait for the queue to be processed
+    timeout = time.time() + 60
+    while (
+        Task.objects.all()
+        .using(database)
+        .filter(id__in=tasks, status="Waiting")
+        .exists()
+        and time.time() < timeout
+    ):
+        time.sleep(1)
+
+    delays = [
+        (t.started - t.submitted).total_seconds()
+        for t in Task.objects.all().using(database).filter(id__in=tasks)
+        if t.started
+    ]
+    Task.objects.all().using(database).filter(id__in=tasks).delete()
+    if delays:
+        print(
+            "Picked up %s of %s tasks: average latency %.3f seconds, maximum %.3f seconds"
+            % (len(delays), count, sum(delays) / len(delays), max(delays))
+        )
     else:
-        # Close all database connections to assure the parent and child
-        # process don't share them.
+        print("No tasks were picked up")
+    return delays
+
+
+def BenchmarkStartup(database=DEFAULT_DB_ALIAS, count=5):
+    """
+    Code used for measuring the time to start a new process.
+
+    Every frepplectl command and every task launched by the worker initializes
+    django, which includes the synchronization of the attribute fields.
+
+    To test, run the following command:
+       frepplectl shell -c "from freppledb.execute.management.commands.runworker import BenchmarkStartup; BenchmarkStartup()"
+    """
+    from freppledb.boot import addAttributesFromDatabase
+
+    if os.path.isfile(os.path.join(settings.FREPPLE_APP, "frepplectl.py")):
+        frepplectl = [
+            sys.executable,
+            os.path.join(settings.FREPPLE_APP, "frepplectl.py"),
+        ]
+    else:
+        frepplectl = ["frepplectl"]
+
+    def measure(label, func):
+        durations = []
+        for cnt in range(count):
+            start = time.perf_counter()
+            func()
+            durations.append(time.perf_counter() - start)
+        print(
+            "%s: average %.3f seconds, maximum %.3f seconds"
+            % (label, sum(durations) / count, max(durations))
+        )
+        return durations
+
+    def spawnTask():
         connections.close_all()
-        # Spawn a new command process
-        args = []
-        kwargs = {"database": database, "task": task.id, "verbosity": 0}
-        background = "background" in task.arguments if task.arguments else False
-        if task.arguments:
-            for i in shlex.split(task.arguments or ""):
-                if "=" in i:
-                    key, val = i.split("=")
-                    kwargs[key.strip("--").replace("-", "_")] = val
-                else:
-                    args.append(i)
         child = Process(
             target=runCommand,
-            args=(task.name, *args),
-            kwargs=kwargs,
-            name="frepplectl %s" % task.name,
+            args=("check",),
+            kwargs={"databases": [database], "verbosity": 0},
+            name="frepplectl check",
         )
         child.start()
-
-        # Normally, the child will update the processid.
-        # Just to make sure, we do it also here.
-        task.processid = child.pid
-        task.save(update_fields=["processid"], using=database)
-
-        # Wait for the child to finish
         child.join()
 
-        # Read the task again from the database and update it
-        task = Task.objects.all().using(database).get(pk=task.id)
-        task.processid = None
-        if (
-            task.status not in ("Done", "Failed")
-            or not task.finished
-            or not task.started
-        ) and task.status != "Canceled":
-            now = datetime.now()
-            if not task.started:
-                task.started = now
-            if not background:
-                if not task.finished:
-                    task.finished = now
-                if task.status not in ("Done", "Failed"):
-                    task.status = "Done"
-            task.save(using=database)
-        if "FREPPLE_TEST" not in os.environ:
-            logger.debug(
-                "Worker %s for database '%s' finished task %d at %s: success"
-                % (
-                    os.getpid(),
-                    settings.DATABASES[database]["NAME"],
-                    task.id,
-                    datetime.now(),
-                )
-            )
+    return {
+        "attributes": measure(
+            "Synchronization of the attribute fields", addAttributesFromDatabase
+        ),
+        "help": measure(
+            "frepplectl help",
+            lambda: Popen(frepplectl + ["help"], stdout=DEVNULL).wait(),
+        ),
+        "task": measure("Task spawned by the worker", spawnTask),
+    }
 
 
 class Command(BaseCommand):
@@ -251,21 +450,62 @@ class Command(BaseCommand):
         idle_loop_done = False
         old_thread_locals = getattr(_thread_locals, "database", None)
         setattr(_thread_locals, "database", database)
+        try:
+            listener = TaskListener(database)
+        except Exception as e:
+            logger.warning("Worker can't listen for new tasks: %s" % e)
+            listener = None
+        slots = max(1, settings.WORKER_SLOTS)
+        running = {}
         while True:
-            try:
+            # Pick up the tasks that finished
+            for task, child, exclusive in list(running.values()):
+                if not child.is_alive():
+                    child.join()
+                    del running[task.id]
+                    try:
+                        finishTask(task, database)
+                    except Exception as e:
+                        failTask(task, database, e)
+
+            # Launch new tasks, in the order they were submitted.
+            # An exclusive task waits till all running tasks finish, and no
+            # task starts while an exclusive task is running. Eg an export
+            # never reads a plan that is being rewritten.
+            while len(running) < slots:
                 task = (
                     Task.objects.all()
                     .using(database)
                     .filter(status="Waiting")
-                    .order_by("id")[0]
+                    .exclude(id__in=list(running.keys()))
+                    .order_by("id")
+                    .first()
                 )
+                if not task:
+                    break
                 idle_loop_done = False
-            except Exception:
-                # No more tasks found
-                if continuous:
-                    time.sleep(5)
-                    continue
-                else:
+                exclusive = isExclusive(task.name)
+                if running and (exclusive or any(r[2] for r in running.values())):
+                    break
+                try:
+                    if "FREPPLE_TEST" not in os.environ:
+                        logger.debug(
+                            "Worker %s for database '%s' starting task %d at %s"
+                            % (
+                                os.getpid(),
+                                settings.DATABASES[database]["NAME"],
+                                task.id,
+                                datetime.now(),
+                            )
+                        )
+                    child = startTask(task, database)
+                    if child:
+                        running[task.id] = (task, child, exclusive)
+                except Exception as e:
+                    failTask(task, database, e)
+
+            if not running:
+                if not continuous and not task:
                     # Special case: we need to permit a single idle loop before shutting down
                     # the worker. If we shut down immediately, a newly launched task could think
                     # that a worker is already running - while it just shut down.
@@ -273,40 +513,20 @@ class Command(BaseCommand):
                         break
                     else:
                         idle_loop_done = True
-                        time.sleep(5)
-                        continue
-            try:
-                if "FREPPLE_TEST" not in os.environ:
-                    logger.debug(
-                        "Worker %s for database '%s' starting task %d at %s"
-                        % (
-                            os.getpid(),
-                            settings.DATABASES[database]["NAME"],
-                            task.id,
-                            datetime.now(),
-                        )
-                    )
-                runTask(task, database)
-            except Exception as e:
-                # Read the task again from the database and update.
-                task = Task.objects.all().using(database).get(pk=task.id)
-                task.status = "Failed"
-                now = datetime.now()
-                if not task.started:
-                    task.started = now
-                task.finished = now
-                task.message = str(e)
-                task.save(using=database)
-                if "FREPPLE_TEST" not in os.environ:
-                    logger.debug(
-                        "Worker %s for database '%s' finished task %d at %s: failed"
-                        % (
-                            os.getpid(),
-                            settings.DATABASES[database]["NAME"],
-                            task.id,
-                            datetime.now(),
-                        )
-                    )
+
+            # Wait for a notification, a task to finish or the next check
+            if listener:
+                try:
+                    listener.wait(5, [r[1] for r in running.values()])
+                    continue
+                except Exception as e:
+                    logger.warning("Worker stops listening for new tasks: %s" % e)
+                    listener.close()
+                    listener = None
+            time.sleep(1 if running else 5)
+        if listener:
+            listener.close()
+
         # Remove the parameter again
         try:
             Parameter.objects.all().using(database).get(pk="Worker alive").delete()
@@ -22,8 +22,11 @@
 #
 
 import os
+import shutil
 import subprocess
+from contextlib import nullcontext
 from datetime import datetime
+from time import time
 
 from django.core.management import call_command
 from django.core.management.base import BaseCommand, CommandError
@@ -86,6 +89,12 @@ class Command(BaseCommand):
         parser.add_argument(
             "--dumpfile", default=None, help="specifies source dump file"
         )
+        parser.add_argument(
+            "--jobs",
+            type=int,
+            default=None,
+            help="Number of parallel jobs to dump and restore the database",
+        )
         parser.add_argument("source", help="source database to copy")
         parser.add_argument("destination", help="destination database to copy")
 
@@ -100,6 +109,7 @@ class Command(BaseCommand):
         # Pick up options
         force = options["force"]
         promote = options["promote"]
+        jobs = options["jobs"] or getattr(settings, "SCENARIO_COPY_JOBS", 1) or 1
         test = "FREPPLE_TEST" in os.environ
         if options["user"]:
             try:
@@ -156,6 +166,8 @@ class Command(BaseCommand):
                 )
             if force:
                 task.arguments += " --force"
+            if options["jobs"]:
+                task.arguments += " --jobs=%s" % options["jobs"]
             task.save(using=source)
             try:
                 destinationscenario = Scenario.objects.using(DEFAULT_DB_ALIAS).get(
@@ -355,7 +367,16 @@ class Command(BaseCommand):
 
             # Copying the data
             # Commenting the next line is a little more secure, but requires you to create a .pgpass file.
-            if not options["dumpfile"]:
+            if not options["dumpfile"] and jobs > 1:
+                if settings.DATABASES[source]["PASSWORD"]:
+                    os.environ["PGPASSWORD"] = settings.DATABASES[source]["PASSWORD"]
+                commandline = None
+                excluded = (
+                    [*excludedTables, *noOwnershipTables]
+                    if destination == DEFAULT_DB_ALIAS
+                    else noOwnershipTables
+                )
+            elif not options["dumpfile"]:
                 if settings.DATABASES[source]["PASSWORD"]:
                     os.environ["PGPASSWORD"] = settings.DATABASES[source]["PASSWORD"]
                 if os.name == "nt":
@@ -406,8 +427,9 @@ class Command(BaseCommand):
                     or settings.DATABASES[destination]["NAME"],
                 )
             else:
-                cmd = "pg_restore -n public -Fc --no-password %s%s%s -d %s %s"
+                cmd = "pg_restore -n public -Fc --no-password %s%s%s%s -d %s %s"
                 commandline = cmd % (
+                    ("-j %s " % jobs) if jobs > 1 else "",
                     settings.DATABASES[destination]["USER"]
                     and ("-U %s " % settings.DATABASES[destination]["USER"])
                     or "",
@@ -423,21 +445,30 @@ class Command(BaseCommand):
                     os.path.join(settings.FREPPLE_LOGDIR, options["dumpfile"]),
                 )
 
-            with subprocess.Popen(
-                commandline,
-                shell=True,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.PIPE,
+            with (
+                subprocess.Popen(
+                    commandline,
+                    shell=True,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.PIPE,
+                )
+                if commandline
+                else nullcontext()
             ) as p:
                 error_message = None
                 try:
-                    res = p.communicate()
-                    task.processid = p.pid
-                    task.save(using=source)
-                    p.wait()
-                    error_message = res[1].decode().partition("\n")[0]
-                    if p.returncode != 0 or "error" in error_message.lower():
-                        raise Exception(error_message)
+                    if p:
+                        res = p.communicate()
+                        task.processid = p.pid
+                        task.save(using=source)
+                        p.wait()
+                        error_message = res[1].decode().partition("\n")[0]
+                        if p.returncode != 0 or "error" in error_message.lower():
+                            raise Exception(error_message)
+                    else:
+                        self.parallelCopy(
+                            task, source, destination, jobs, excluded, test
+                        )
 
                     if not options["dumpfile"]:
                         # Successful copy can still leave warnings and errors
@@ -465,8 +496,9 @@ class Command(BaseCommand):
                         )
 
                 except Exception as e:
-                    p.kill()
-                    p.wait()
+                    if p:
+                        p.kill()
+                        p.wait()
                     # Consider the destination database free again
                     if destination != DEFAULT_DB_ALIAS:
                         destinationscenario.status = "Free"
@@ -517,6 +549,25 @@ class Command(BaseCommand):
                 except BaseException:
                     pass
 
+            # Invalidate cached report results and parameters of the destination.
+            # The versions copied from the source are moved past any value
+            # the destination used before.
+            with connections[destination].cursor() as cursor:
+                cursor.execute(
+                    """
+                    select setval('common_planversion',
+                      greatest(last_value + 1, (extract(epoch from now()) * 1000)::bigint))
+                    from common_planversion
+                    """
+                )
+                cursor.execute(
+                    """
+                    update common_parameterversion
+                    set version = greatest(version + 1, (extract(epoch from now()) * 1000)::bigint)
+                    """
+                )
+            Parameter.clearCache(destination)
+
             # Give access to the destination scenario to:
             #  a) the user doing the copy
             #  b) all active superusers from the source schema
@@ -622,6 +673,112 @@ class Command(BaseCommand):
                 task.save(using=source)
             settings.DEBUG = tmp_debug
 
+    @staticmethod
+    def getConnectionArguments(database, test=False):
+        db = settings.DATABASES[database]
+        return "%s%s%s-d %s" % (
+            db["USER"] and ("-U %s " % db["USER"]) or "",
+            db["HOST"] and ("-h %s " % db["HOST"]) or "",
+            db["PORT"] and ("-p %s " % db["PORT"]) or "",
+            test and db["TEST"]["NAME"] or db["NAME"],
+        )
+
+    @staticmethod
+    def runWithProgress(commandline, task, database, marker, total, start, end):
+        """
+        Runs a pg_dump or pg_restore command in verbose mode.
+        The progress is estimated from the number of output lines containing
+        the marker string, and is reported in the status of the task.
+        """
+        errors = []
+        done = 0
+        lastsave = time()
+        with subprocess.Popen(
+            commandline,
+            shell=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+        ) as p:
+            task.processid = p.pid
+            task.save(using=database, update_fields=["processid"])
+            try:
+                for line in p.stderr:
+                    if marker in line:
+                        done += 1
+                        if total and time() - lastsave > 2:
+                            task.status = "%d%%" % (
+                                start + (end - start) * min(done, total) / total
+                            )
+                            task.save(using=database, update_fields=["status"])
+                            lastsave = time()
+                    elif "error:" in line.lower():
+                        errors.append(line.strip())
+                p.wait()
+            except BaseException:
+                p.kill()
+                p.wait()
+                raise
+        if p.returncode != 0 or errors:
+            raise Exception(
+                errors[0] if errors else "%s failed" % commandline.split(" ", 1)[0]
+            )
+        task.status = "%d%%" % end
+        task.save(using=database, update_fields=["status"])
+
+    def parallelCopy(self, task, source, destination, jobs, excluded, test):
+        """
+        Copies the database with a directory format dump and restore.
+        Both the dump and the restore use multiple parallel jobs, unlike the
+        single pg_dump | pg_restore pipe.
+        """
+        dumpdir = os.path.join(settings.FREPPLE_LOGDIR, "scenario_copy_%s" % task.id)
+        shutil.rmtree(dumpdir, ignore_errors=True)
+        try:
+            with connections[source].cursor() as cursor:
+                cursor.execute(
+                    """
+                    select count(*)
+                    from pg_catalog.pg_tables
+                    where schemaname = 'public' and not (tablename = any(%s))
+                    """,
+                    (excluded,),
+                )
+                tables = cursor.fetchone()[0]
+            self.runWithProgress(
+                "pg_dump -Fd -j %s -v -f %s %s%s"
+                % (
+                    jobs,
+                    dumpdir,
+                    "".join("-T %s " % t for t in excluded),
+                    self.getConnectionArguments(source, test),
+                ),
+                task,
+                source,
+                "finished item",
+                tables,
+                0,
+                40,
+            )
+            toc = subprocess.run(
+                ["pg_restore", "-l", "-n", "public", dumpdir],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+            )
+            self.runWithProgress(
+                "pg_restore -n public -Fd -j %s -v --no-password %s %s"
+                % (jobs, self.getConnectionArguments(destination, test), dumpdir),
+                task,
+                source,
+                "finished item",
+                sum(1 for i in toc.stdout.splitlines() if i and not i.startswith(";")),
+                40,
+                95,
+            )
+        finally:
+            shutil.rmtree(dumpdir, ignore_errors=True)
+
     # accordion template
     title = _("scenario management")
     index = 1500
@@ -697,3 +854,22 @@ class Command(BaseCommand):
             },
             request=request,
         )
+
+
+def BenchmarkScenarioCopy(source, destination, jobs=(1, 2, 4, 8), repeat=1):
+    """
+    Code used for comparing the duration of a scenario copy with the
+    single pg_dump | pg_restore pipe and with a parallel directory format
+    dump and restore.
+
+    The destination scenario is overwritten.
+
+    To test, run the following command:
+       frepplectl shell -c "from freppledb.execute.management.commands.scenario_copy import BenchmarkScenarioCopy; BenchmarkScenarioCopy('default', 'scenario1')"
+    """
+    print("%-10s %10s" % ("jobs", "seconds"))
+    for j in jobs:
+        for r in range(repeat):
+            starttime = time()
+            call_command("scenario_copy", source, destination, force=True, jobs=j)
+            print("%-10s %10.2f" % (j, time() - starttime))
@@ -22,15 +22,18 @@
 #
 
 from datetime import datetime, timedelta
+from decimal import Decimal
 from freppledb.common.report import getCurrentDate
 import importlib
+from psycopg2.extras import execute_batch
 import random
+from time import time
 
 from django.conf import settings
 from django.core import management
 from django.core.management.base import BaseCommand, CommandError
-from django.db import transaction, DEFAULT_DB_ALIAS
-from django.db.models import Sum, Max, Count, F
+from django.db import connections, transaction, DEFAULT_DB_ALIAS
+from django.db.models import Sum, Max, Count, F, Q
 
 from freppledb import __version__
 from freppledb.common.middleware import _thread_locals
@@ -43,7 +46,12 @@ from freppledb.input.models import (
     Demand,
     Item,
 )
-from freppledb.input.models import ManufacturingOrder, Location
+from freppledb.input.models import (
+    ManufacturingOrder,
+    Location,
+    Operation,
+    OperationMaterial,
+)
 from freppledb.common.report import getCurrentDate
 
 
@@ -90,6 +98,10 @@ class Command(BaseCommand):
   coded in a dedicated simulation class. A default implementation is
   provided, which can easily be extended in a subclass.
 
+  With the option "batch" the simulation keeps the inventory in memory
+  between the buckets, and changes the status of the orders with set-based
+  SQL statements rather than record per record.
+
   Warning: The simulation run will update the data in the database.
   Make a backup if you can't afford loosing the current contents.
   """
@@ -136,6 +148,18 @@ class Command(BaseCommand):
             default=False,
             help="Allows to stop the simulation at the end of each step",
         )
+        parser.add_argument(
+            "--batch",
+            action="store_true",
+            default=False,
+            help="Keeps the inventory in memory and updates the orders with set-based SQL statements",
+        )
+        parser.add_argument(
+            "--archive",
+            type=int,
+            default=1,
+            help="Archive a snapshot of the plan every N buckets. Use 0 to disable the archiving",
+        )
 
     def handle(self, **options):
         # Pick up the options
@@ -190,6 +214,13 @@ class Command(BaseCommand):
             if step < 0:
                 raise ValueError("Invalid step: %s" % options["step"])
             task.arguments += " --step=%d" % step
+            archive = int(options["archive"])
+            if archive < 0:
+                raise ValueError("Invalid archive: %s" % options["archive"])
+            if archive != 1:
+                task.arguments += " --archive=%d" % archive
+            if options["batch"]:
+                task.arguments += " --batch"
             verbosity = int(options["verbosity"])
 
             # Log task
@@ -213,6 +244,11 @@ class Command(BaseCommand):
 
             # Get current date
             curdate = getCurrentDate(database).date()
+            param = (
+                Parameter.objects.all()
+                .using(database)
+                .get_or_create(name="currentdate")[0]
+            )
 
             # Compute how many simulation steps we need
             bckt_list = []
@@ -226,9 +262,12 @@ class Command(BaseCommand):
             if options.get("simulator", None):
                 cls = load_class(options["simulator"])
                 simulator = cls(database=database, verbosity=verbosity)
+            elif options["batch"]:
+                simulator = BatchSimulator(database=database, verbosity=verbosity)
             else:
                 simulator = Simulator(database=database, verbosity=verbosity)
             simulator.buckets = 1
+            simulator.archive_frequency = archive
 
             # Loop over all dates in the simulation horizon
             idx = 0
@@ -243,6 +282,7 @@ class Command(BaseCommand):
                     continue
 
                 # Start message
+                bucket_start = time()
                 task.status = "%.0f%%" % (100.0 * idx / bckt_list_len)
                 task.message = "Simulating bucket from %s to %s " % (strt, nd)
                 task.save(using=database)
@@ -274,9 +314,11 @@ class Command(BaseCommand):
                 # Generate the constrained plan
                 if verbosity > 1:
                     print("  Generating plan...")
+                plan_start = time()
                 management.call_command(
                     "runplan", database=database, env="fcst,supply,nowebservice"
                 )
+                plan_time = time() - plan_start
 
                 if options["pause"]:
                     print(
@@ -332,6 +374,15 @@ class Command(BaseCommand):
                 with transaction.atomic(using=database):
                     simulator.end_bucket(strt, nd)
 
+                bucket_time = time() - bucket_start
+                simulator.bucket_time += bucket_time
+                simulator.plan_time += plan_time
+                if verbosity > 0:
+                    print(
+                        "  Simulated bucket in %.2f seconds, of which %.2f seconds for planning"
+                        % (bucket_time, plan_time)
+                    )
+
             # Report statistics from the simulation.
             # The simulator class collected these results during its run.
             if verbosity > 1:
@@ -394,13 +445,42 @@ class Simulator:
         self.demand_value = 0
         self.demand_count = 0
 
+        # Archive a snapshot every N buckets
+        self.archive_frequency = 1
+        self.bucket_count = 0
+
+        # Timings, in seconds
+        self.bucket_time = 0
+        self.plan_time = 0
+
     def start_bucket(self, strt, nd):
         """
         A method called at the start of each simulation bucket.
 
         It can be used to gather performance metrics, or initialize some variables.
         """
-        management.call_command("archive", database=self.database, verbosity=0)
+        if self.archive_frequency and self.bucket_count % self.archive_frequency == 0:
+            management.call_command("archive", database=self.database, verbosity=0)
+        self.bucket_count += 1
+
+    def getBuffer(self, item, location):
+        """
+        Returns the buffer of an item at a location, creating it if needed.
+        """
+        buf, created = (
+            Buffer.objects.select_for_update()
+            .using(self.database)
+            .get_or_create(item=item, location=location)
+        )
+        if created or buf.onhand is None:
+            buf.onhand = Decimal(0)
+        return buf
+
+    def saveBuffer(self, buf):
+        buf.save(using=self.database)
+
+    def saveDemand(self, dmd):
+        dmd.save(using=self.database)
 
     def end_bucket(self, strt, nd):
         """
@@ -721,13 +801,11 @@ class Simulator:
                 continue
             if not fl.item or not oper.location:
                 continue
-            buf = Buffer.objects.using(self.database).get_or_create(
-                item=fl.item, location=oper.location
-            )[0]
+            buf = self.getBuffer(fl.item, oper.location)
             if fl.type in ("start", "end") or not fl.type:
                 if consume:
                     buf.onhand += qty * fl.quantity
-                    buf.save(using=self.database)
+                    self.saveBuffer(buf)
                 elif buf.onhand < -fl.quantity * min_qty:
                     # Even the minimum isn't available
                     return 0
@@ -748,7 +826,7 @@ class Simulator:
             if fl.type in ("fixed_start", "fixed_end"):
                 if consume:
                     buf.onhand += qty
-                    buf.save(using=self.database)
+                    self.saveBuffer(buf)
                 elif buf.onhand < -min_qty:
                     # Even the minimum isn't available
                     return 0
@@ -814,7 +892,7 @@ class Simulator:
                         dmd.due,
                     )
                 )
-            dmd.save(using=self.database)
+            self.saveDemand(dmd)
 
     def ship_customer_demand(self, strt, nd):
         """
@@ -837,6 +915,7 @@ class Simulator:
         for dmd in (
             Demand.objects.using(self.database)
             .filter(due__lt=nd, status="open")
+            .select_related("item", "location", "operation")
             .order_by("priority", "due")
         ):
             oper = dmd.operation
@@ -851,7 +930,7 @@ class Simulator:
                     if dmd.quantity > ship_qty:
                         # Partial shipment
                         dmd.quantity -= ship_qty
-                        dmd.save(using=self.database)
+                        self.saveDemand(dmd)
                         self.checkDemandExpired(dmd, nd)
                         continue
                 else:
@@ -860,13 +939,7 @@ class Simulator:
                     continue
             else:
                 # Case 2: Automatically generated delivery operation
-                buf, created = (
-                    Buffer.objects.select_for_update()
-                    .using(self.database)
-                    .get_or_create(item=dmd.item, location=dmd.location)
-                )
-                if created:
-                    buf.onhand = 0.0
+                buf = self.getBuffer(dmd.item, dmd.location)
                 if buf.onhand < (dmd.minshipment or 0):
                     # Not sufficient to ship something
                     self.checkDemandExpired(dmd, nd)
@@ -874,7 +947,7 @@ class Simulator:
                 elif buf.onhand >= dmd.quantity:
                     # Shipping the complete remaining quantity
                     buf.onhand -= dmd.quantity
-                    buf.save(using=self.database)
+                    self.saveBuffer(buf)
                 else:
                     if dmd.quantity > (dmd.minshipment or 0):
                         ship_qty = min(
@@ -889,9 +962,9 @@ class Simulator:
                     else:
                         # Partial shipment is possible
                         dmd.quantity -= ship_qty
-                        dmd.save(using=self.database)
+                        self.saveDemand(dmd)
                         buf.onhand -= ship_qty
-                        buf.save(using=self.database)
+                        self.saveBuffer(buf)
                         if self.verbosity > 2:
                             print(
                                 "      Partially shipping demand %s - %d of %s@%s due on %s - delay %s"
@@ -928,7 +1001,7 @@ class Simulator:
                         max(strt - dmd.due.date(), timedelta(0)),
                     )
                 )
-            dmd.save(using=self.database)
+            self.saveDemand(dmd)
 
     def printStatus(self):
         """
@@ -1045,3 +1118,238 @@ class Simulator:
             "   Average work in progress: %.2f units"
             % (self.wip_quantity / self.buckets)
         )
+        print(
+            "   Average bucket duration: %.2f seconds, of which %.2f seconds for planning"
+            % (
+                self.bucket_time / max(1, self.buckets - 1),
+                self.plan_time / max(1, self.buckets - 1),
+            )
+        )
+
+
+class BatchSimulator(Simulator):
+    """
+    A simulator that keeps the inventory in memory between the buckets, and
+    changes the status of the orders with set-based SQL statements.
+
+    The inventory and the shipped demands are saved to the database once per
+    bucket, before the plan of the next bucket is generated.
+    """
+
+    def __init__(self, database=DEFAULT_DB_ALIAS, verbosity=0):
+        super().__init__(database=database, verbosity=verbosity)
+
+        # Inventory of all buffers without a batch, keyed by item and location
+        self.inventory = {}
+        self.changed_buffers = {}
+        for buf in (
+            Buffer.objects.using(self.database)
+            .filter(Q(batch__isnull=True) | Q(batch=""))
+            .only("id", "item_id", "location_id", "onhand")
+        ):
+            if buf.onhand is None:
+                buf.onhand = Decimal(0)
+            self.inventory[(buf.item_id, buf.location_id)] = buf
+        self.changed_demands = {}
+
+        # Operation materials and location of the operations
+        self.operation_location = {
+            name: location
+            for name, location in Operation.objects.using(self.database).values_list(
+                "name", "location_id"
+            )
+        }
+        self.operation_materials = {}
+        for operation, item, type, quantity in OperationMaterial.objects.using(
+            self.database
+        ).values_list("operation_id", "item_id", "type", "quantity"):
+            self.operation_materials.setdefault(operation, []).append(
+                (item, type, quantity)
+            )
+
+    def getBuffer(self, item, location):
+        return self.getInventory(item.pk, location.pk)
+
+    def getInventory(self, item, location, create=True):
+        buf = self.inventory.get((item, location), None)
+        if not buf and create:
+            buf = Buffer(item_id=item, location_id=location, onhand=Decimal(0))
+            self.inventory[(item, location)] = buf
+        return buf
+
+    def saveBuffer(self, buf):
+        self.changed_buffers[(buf.item_id, buf.location_id)] = buf
+
+    def saveDemand(self, dmd):
+        self.changed_demands[dmd.name] = dmd
+
+    def updateInventory(self, item, location, quantity, create=True):
+        buf = self.getInventory(item, location, create)
+        if buf:
+            buf.onhand += quantity
+            self.saveBuffer(buf)
+
+    def updateStatus(self, ordertype, fromstatus, tostatus, where, nd, returning):
+        """
+        Changes the status of all orders of a type in a single statement,
+        and returns the requested fields of the updated orders.
+        """
+        with connections[self.database].cursor() as cursor:
+            cursor.execute(
+                """
+                update operationplan
+                set status = %%s, lastmodified = %%s
+                where type = %%s and status = %%s and %s <= %%s
+                %s
+                returning %s
+                """
+                % (
+                    where,
+                    "and demand_id is null" if ordertype == "MO" else "",
+                    returning,
+                ),
+                (tostatus, datetime.now(), ordertype, fromstatus, nd),
+            )
+            result = cursor.fetchall()
+        if self.verbosity > 2:
+            print(
+                "      Changed status of %d %ss from %s to %s"
+                % (len(result), ordertype, fromstatus, tostatus)
+            )
+        return result
+
+    def executeMaterials(self, operation, quantity, types):
+        location = self.operation_location.get(operation, None)
+        if not location:
+            return
+        for item, type, qty in self.operation_materials.get(operation, []):
+            if not item:
+                continue
+            elif type == types[0]:
+                self.updateInventory(item, location, qty * quantity)
+            elif type == types[1]:
+                self.updateInventory(item, location, qty)
+
+    def create_purchase_orders(self, strt, nd):
+        self.updateStatus("PO", "proposed", "confirmed", "startdate", nd, "reference")
+
+    def receive_purchase_orders(self, strt, nd):
+        for item, location, quantity in self.updateStatus(
+            "PO", "confirmed", "closed", "enddate", nd, "item_id, location_id, quantity"
+        ):
+            self.updateInventory(item, location, quantity)
+
+    def create_distribution_orders(self, strt, nd):
+        for item, origin, quantity in self.updateStatus(
+            "DO",
+            "proposed",
+            "confirmed",
+            "startdate",
+            nd,
+            "item_id, origin_id, quantity",
+        ):
+            self.updateInventory(item, origin, -quantity, create=False)
+
+    def receive_distribution_orders(self, strt, nd):
+        for item, destination, quantity in self.updateStatus(
+            "DO",
+            "confirmed",
+            "closed",
+            "enddate",
+            nd,
+            "item_id, destination_id, quantity",
+        ):
+            self.updateInventory(item, destination, quantity)
+
+    def create_manufacturing_orders(self, strt, nd):
+        for operation, quantity in self.updateStatus(
+            "MO", "proposed", "confirmed", "startdate", nd, "operation_id, quantity"
+        ):
+            self.executeMaterials(operation, quantity, ("start", "fixed_start"))
+
+    def finish_manufacturing_orders(self, strt, nd):
+        for operation, quantity in self.updateStatus(
+            "MO", "confirmed", "closed", "enddate", nd, "operation_id, quantity"
+        ):
+            self.executeMaterials(operation, quantity, ("end", "fixed_end"))
+
+    def ship_customer_demand(self, strt, nd):
+        super().ship_customer_demand(strt, nd)
+        now = datetime.now()
+        with connections[self.database].cursor() as cursor:
+            execute_batch(
+                cursor,
+                """
+                update demand
+                set status = %s, quantity = %s, category = %s, lastmodified = %s
+                where name = %s
+                """,
+                [
+                    (dmd.status, dmd.quantity, dmd.category, now, dmd.name)
+                    for dmd in self.changed_demands.values()
+                ],
+                page_size=200,
+            )
+        self.changed_demands = {}
+
+    def end_bucket(self, strt, nd):
+        # Save the inventory for the plan of the next bucket
+        now = datetime.now()
+        new_buffers = [b for b in self.changed_buffers.values() if not b.id]
+        changed_buffers = [b for b in self.changed_buffers.values() if b.id]
+        for buf in new_buffers:
+            buf.lastmodified = now
+        Buffer.objects.using(self.database).bulk_create(new_buffers)
+        with connections[self.database].cursor() as cursor:
+            execute_batch(
+                cursor,
+                "update buffer set onhand = %s, lastmodified = %s where id = %s",
+                [(b.onhand, now, b.id) for b in changed_buffers],
+                page_size=200,
+            )
+        self.changed_buffers = {}
+
+        if self.verbosity > 2:
+            self.printStatus()
+
+        # Measure the current inventory, work-in-progress and order book
+        with connections[self.database].cursor() as cursor:
+            cursor.execute(
+                """
+                select
+                  (select sum(buffer.onhand * item.cost)
+                   from buffer
+                   inner join item on item.name = buffer.item_id
+                   where buffer.onhand > 0),
+                  (select sum(onhand) from buffer where onhand > 0),
+                  (select sum(quantity)
+                   from operationplan
+                   where type = 'MO' and status = 'confirmed'),
+                  sum(demand.quantity * item.cost),
+                  sum(demand.quantity),
+                  count(demand.name)
+                from demand
+                inner join item on item.name = demand.item_id
+                where demand.status = 'open'
+                """
+            )
+            (
+                inv_val,
+                inv_qty,
+                wip_qty,
+                dmd_val,
+                dmd_qty,
+                dmd_cnt,
+            ) = cursor.fetchone()
+        if inv_val:
+            self.inventory_value += inv_val
+        if inv_qty:
+            self.inventory_quantity += inv_qty
+        if wip_qty:
+            self.wip_quantity += wip_qty
+        if dmd_val:
+            self.demand_value += dmd_val
+        if dmd_qty:
+            self.demand_quantity += dmd_qty
+        if dmd_cnt:
+            self.demand_count += dmd_cnt
@@ -207,6 +207,14 @@ class execute_multidb(TransactionTestCase):
             input.models.PurchaseOrder.objects.all().using(db2).count(),
         )
 
+        # Copy db1 into db2 with a parallel dump and restore
+        management.call_command("scenario_release", database=db2)
+        management.call_command("scenario_copy", "--jobs=2", db1, db2)
+        self.assertEqual(
+            input.models.PurchaseOrder.objects.all().using(db1).count(),
+            input.models.PurchaseOrder.objects.all().using(db2).count(),
+        )
+
 
 class FixtureTest(TransactionTestCase):
     def test_fixture_demo(self):
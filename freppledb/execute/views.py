@@ -214,7 +214,13 @@ class TaskReport(GridReport):
         )
 
         # Cancel waiting tasks if no runworker is active
-        worker_alive = Parameter.getValue("Worker alive", request.database, None)
+        # Note: the heartbeat doesn't change the version of the cached parameters
+        worker_alive = (
+            Parameter.objects.using(request.database)
+            .filter(name="Worker alive")
+            .values_list("value", flat=True)
+            .first()
+        )
         try:
             if not worker_alive or datetime.now() - datetime.strptime(
                 worker_alive, "%Y-%m-%d %H:%M:%S"
@@ -34,7 +34,7 @@ from django.db import connections, transaction, DEFAULT_DB_ALIAS
 from django.db.models import Case, When, Value, IntegerField, Q
 from django.utils.translation import gettext_lazy as _
 
-from .models import Forecast
+from .models import Forecast, ForecastPlanView
 from freppledb.boot import getAttributes
 from freppledb.common.commands import PlanTaskRegistry, PlanTask, clean_value
 from freppledb.common.models import Parameter, BucketDetail
@@ -1390,6 +1390,7 @@ class ExportForecastMetrics(PlanTask):
                 cursor.execute("vacuum analyze forecast")
             elif cluster != -2:
                 # Incremental export for a single cluster
+                combinations = []
                 for i in frepple.demands():
                     if (
                         isinstance(i, frepple.demand_forecast)
@@ -1405,6 +1406,11 @@ class ExportForecastMetrics(PlanTask):
                             """,
                             (i.smape_error * 100, i.method, i.deviation, i.name),
                         )
+                        if i.location and i.customer:
+                            combinations.append(
+                                (i.item.name, i.location.name, i.customer.name)
+                            )
+                ForecastPlanView.refresh(database, combinations=combinations)
 
 
 @PlanTaskRegistry.register
@@ -1437,9 +1443,9 @@ class ExportForecast(PlanTask):
         frepple.releaseUnusedMemory()
         frepple.cache.printStatus()
 
-        # refresh materialized view
-        with connections[database].cursor() as cursor:
-            cursor.execute("REFRESH MATERIALIZED VIEW forecastreport_view")
+        # Bring the forecast report in sync with the new plan.
+        # The aggregation task of the run rebuilt the list of combinations.
+        ForecastPlanView.refresh(database, hierarchy=True)
 
 
 @PlanTaskRegistry.register
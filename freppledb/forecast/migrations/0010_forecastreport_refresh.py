@@ -0,0 +1,64 @@
+#
+# Copyright (C) 2024 by frePPLe bv
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+from django.conf import settings
+from django.db import migrations, connections
+
+
+def grant_read_access(apps, schema_editor):
+    db = schema_editor.connection.alias
+    role = settings.DATABASES[db].get("SQL_ROLE", "report_role")
+    if role:
+        with connections[db].cursor() as cursor:
+            cursor.execute("select count(*) from pg_roles where rolname = %s", (role,))
+            if not cursor.fetchone()[0]:
+                cursor.execute(
+                    "create role %s with nologin noinherit role current_user" % (role,)
+                )
+            cursor.execute(
+                "grant select on table forecastreport_refresh to %s" % (role,)
+            )
+
+
+class Migration(migrations.Migration):
+    dependencies = [("forecast", "0009_forecastreport_table")]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+            create table forecastreport_refresh (
+              refreshed timestamp
+              );
+
+            insert into forecastreport_refresh (refreshed)
+            select max(value)::timestamp from common_parameter
+            where name = 'forecast.reportRefreshed';
+
+            delete from common_parameter where name = 'forecast.reportRefreshed';
+            """,
+            reverse_sql="drop table forecastreport_refresh",
+        ),
+        migrations.RunPython(
+            code=grant_read_access, reverse_code=migrations.RunPython.noop
+        ),
+    ]
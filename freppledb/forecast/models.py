@@ -28,10 +28,11 @@ from logging import INFO, ERROR, WARNING, DEBUG
 from openpyxl.worksheet.cell_range import CellRange
 from openpyxl.worksheet.worksheet import Worksheet
 import os
+from queue import Queue
 import random
 import requests
-from requests import ConnectionError
-from threading import local
+from requests import ConnectionError, Timeout
+from threading import Event, local, Thread
 
 from django.conf import settings
 from django.core import management
@@ -430,6 +431,20 @@ class ForecastPlan(models.Model):
         This method is called when importing forecast data through a CSV
         or Excel file.
         """
+        cleanup = []
+        try:
+            yield from ForecastPlan._parseData(
+                data, rowmapper, user, database, ping, excel_duration_in_days, cleanup
+            )
+        finally:
+            # Also runs when the upload fails or is aborted
+            for c in cleanup:
+                c()
+
+    @staticmethod
+    def _parseData(
+        data, rowmapper, user, database, ping, excel_duration_in_days, cleanup
+    ):
         warnings = 0
         changed = 0
         errors = 0
@@ -462,7 +477,6 @@ class ForecastPlan(models.Model):
             bounds = CellRange(data.auto_filter.ref).bounds
         else:
             bounds = None
-        svcdata = []
 
         # keep a list of all forecast combinations visited
         # This is used to add missing forecast records.
@@ -659,17 +673,94 @@ class ForecastPlan(models.Model):
                 if server:
                     server = server.replace("0.0.0.0:", "localhost:")
 
-                def sendToService(d):
-                    response = session.post(
+                def sendToService(sendsession, d):
+                    response = sendsession.post(
                         "http://%s/forecast/detail/" % server,
                         headers={
                             "Authorization": "Bearer %s" % token,
                             "Content-Type": "application/json",
                         },
-                        json=d,
+                        data=json.dumps(d, separators=(",", ":")),
+                        timeout=settings.FORECAST_UPLOAD_TIMEOUT,
                     )
                     return response.json().get("errors", []) or []
 
+                # The batches are posted by separate threads, each with its own
+                # http session. We can continue reading the file while the web
+                # service is processing several batches at the same time.
+                # The records of a forecast always go to the same thread, so
+                # the updates of a forecast are applied in the order of the file.
+                # Each thread has a queue of a single batch waiting to be sent.
+                sendqueues = [
+                    Queue(maxsize=1)
+                    for i in range(max(1, settings.FORECAST_UPLOAD_QUEUE))
+                ]
+                sendbatches = [[] for q in sendqueues]
+                senderrors = []
+                senderstop = Event()
+
+                def sender(sendqueue):
+                    with requests.Session() as sendsession:
+                        while True:
+                            d = sendqueue.get()
+                            if d is None:
+                                break
+                            if senderstop.is_set():
+                                # Drop the remaining batches after a lost
+                                # connection or an aborted upload
+                                continue
+                            try:
+                                senderrors.extend(sendToService(sendsession, d))
+                            except (ConnectionError, Timeout) as e:
+                                senderrors.append(
+                                    e
+                                    if isinstance(e, ConnectionError)
+                                    else ConnectionError(str(e))
+                                )
+                                senderstop.set()
+                            except Exception as e:
+                                senderrors.append(e)
+
+                senderthreads = [
+                    Thread(target=sender, args=(q,), daemon=True) for q in sendqueues
+                ]
+                for t in senderthreads:
+                    t.start()
+
+                def stopSender(abort=False):
+                    if abort:
+                        senderstop.set()
+                    for q, t in zip(sendqueues, senderthreads):
+                        if t.is_alive():
+                            q.put(None)
+                    for t in senderthreads:
+                        t.join()
+
+                cleanup.append(lambda: stopSender(abort=True))
+
+                def getSendErrors():
+                    while senderrors:
+                        e = senderrors.pop(0)
+                        if isinstance(e, Exception):
+                            raise e
+                        yield e
+
+                def sendRecord(r):
+                    n = hash(
+                        (
+                            r.get("forecast", None),
+                            r.get("item", None),
+                            r.get("location", None),
+                            r.get("customer", None),
+                        )
+                    ) % len(sendqueues)
+                    sendbatches[n].append(r)
+                    if len(sendbatches[n]) >= 1000:
+                        # Blocks when the queue of the thread is full
+                        sendqueues[n].put(sendbatches[n])
+                        sendbatches[n] = []
+                    return getSendErrors()
+
                 Forecast.flush(session, mode="manual", database=database, token=token)
 
             # Case 2: Skip empty rows
@@ -684,14 +775,13 @@ class ForecastPlan(models.Model):
                         yield (DEBUG, rownumber, None, None, None)
 
                 multiplier = rowWrapper.get("multiplier") or 1
-                if populateForecastTable:
-                    forecast_combinations.add(
-                        (
-                            rowWrapper.get("item", None),
-                            rowWrapper.get("location", None),
-                            rowWrapper.get("customer", None),
-                        )
+                forecast_combinations.add(
+                    (
+                        rowWrapper.get("item", None),
+                        rowWrapper.get("location", None),
+                        rowWrapper.get("customer", None),
                     )
+                )
 
                 # Call the update method
                 if pivotbuckets:
@@ -712,20 +802,13 @@ class ForecastPlan(models.Model):
                         try:
                             val = rowWrapper.get(col, None)
                             if val is not None and val != "":
-                                svcdata.append(
-                                    {
-                                        "bucket": col,
-                                        "forecast": rowWrapper.get("forecast", None),
-                                        "item": rowWrapper.get("item", None),
-                                        "location": rowWrapper.get("location", None),
-                                        "customer": rowWrapper.get("customer", None),
-                                        field.name: val * multiplier,
-                                    }
-                                )
-                                if len(svcdata) >= 1000:
-                                    for e in sendToService(svcdata):
-                                        yield (ERROR, None, None, None, e)
-                                    svcdata = []
+                                r = {"bucket": col, field.name: val * multiplier}
+                                for f in ("forecast", "item", "location", "customer"):
+                                    t = rowWrapper.get(f, None)
+                                    if t:
+                                        r[f] = t
+                                for e in sendRecord(r):
+                                    yield (ERROR, None, None, None, e)
                                 changed += 1
                         except ConnectionError:
                             yield (
@@ -743,13 +826,10 @@ class ForecastPlan(models.Model):
                     # Upload in list layout
                     try:
                         r = {
-                            m.name: (
-                                rowWrapper.get(m.name) * multiplier
-                                if rowWrapper.get(m.name) is not None
-                                and rowWrapper.get(m.name) != ""
-                                else None
-                            )
+                            m.name: rowWrapper.get(m.name) * multiplier
                             for m in measures
+                            if rowWrapper.get(m.name) is not None
+                            and rowWrapper.get(m.name) != ""
                         }
                         for f in (
                             "forecast",
@@ -765,11 +845,8 @@ class ForecastPlan(models.Model):
                                 t = t.strftime("%Y-%m-%dT%H:%M:%S")
                             if t:
                                 r[f] = t
-                        svcdata.append(r)
-                        if len(svcdata) >= 1000:
-                            for e in sendToService(svcdata):
-                                yield (ERROR, None, None, None, e)
-                            svcdata = []
+                        for e in sendRecord(r):
+                            yield (ERROR, None, None, None, e)
                         changed += 1
                     except ConnectionError:
                         yield (
@@ -784,8 +861,13 @@ class ForecastPlan(models.Model):
                         errors += 1
                         yield (ERROR, rownumber, None, None, str(e))
 
-        if svcdata:
-            for e in sendToService(svcdata):
+        if session:
+            # Wait for all batches to be processed
+            for q, d in zip(sendqueues, sendbatches):
+                if d:
+                    q.put(d)
+            stopSender()
+            for e in getSendErrors():
                 yield (ERROR, None, None, None, e)
 
         # Add any missing forecast record
@@ -881,9 +963,10 @@ class ForecastPlan(models.Model):
             },
         )
 
-        # refresh materialized view in case new combinations have been added
-        with connections[database].cursor() as cursor:
-            cursor.execute("REFRESH MATERIALIZED VIEW forecastreport_view")
+        # Refresh the report for the uploaded combinations and their parents
+        ForecastPlanView.refresh(
+            database, combinations=forecast_combinations, ancestors=True
+        )
 
 
 class Measure(AuditModel):
@@ -1358,6 +1441,182 @@ class ForecastPlanView(models.Model):
         unique_together = (("item_id", "location_id", "customer_id"),)
         managed = False
 
+    @classmethod
+    def refresh(
+        cls,
+        database=DEFAULT_DB_ALIAS,
+        combinations=None,
+        ancestors=False,
+        hierarchy=False,
+    ):
+        """
+        Brings the forecastreport_view table in sync with the forecastplan table.
+
+        Without arguments all item/location/customer combinations are compared,
+        and only the records that are new, changed or obsolete get written.
+        With a list of (item, location, customer) tuples only those combinations
+        are recomputed. The ancestors flag extends that list with all parent
+        combinations in the item, location and customer hierarchies.
+
+        The hierarchy flag reads the combinations from the forecasthierarchy
+        table. The aggregation of a plan run maintains that table, and removes
+        the forecastplan records of all other combinations.
+        """
+        if combinations is not None:
+            combinations = [c for c in combinations if None not in c]
+            if not combinations:
+                return
+        with connections[database].cursor() as cursor:
+            if hierarchy:
+                scopetable = "forecasthierarchy"
+            elif combinations is None:
+                scopetable = None
+            else:
+                scopetable = "forecastreport_scope"
+                cursor.execute(
+                    """
+                    drop table if exists forecastreport_scope;
+                    create temporary table forecastreport_scope (
+                      item_id character varying(300),
+                      location_id character varying(300),
+                      customer_id character varying(300)
+                      );
+                    """
+                )
+                cursor.execute(
+                    """
+                    insert into forecastreport_scope
+                    select * from unnest(%s::varchar[], %s::varchar[], %s::varchar[])
+                    """,
+                    [list(i) for i in zip(*combinations)],
+                )
+                if ancestors:
+                    cursor.execute(
+                        """
+                        insert into forecastreport_scope
+                        select distinct item_parent.name, location_parent.name, customer_parent.name
+                        from forecastreport_scope
+                        inner join item on item.name = forecastreport_scope.item_id
+                        inner join location on location.name = forecastreport_scope.location_id
+                        inner join customer on customer.name = forecastreport_scope.customer_id
+                        inner join item item_parent on item.lft between item_parent.lft and item_parent.rght
+                        inner join location location_parent on location.lft between location_parent.lft and location_parent.rght
+                        inner join customer customer_parent on customer.lft between customer_parent.lft and customer_parent.rght
+                        """
+                    )
+                cursor.execute(
+                    "create index on forecastreport_scope (item_id, location_id, customer_id)"
+                )
+
+            # Insert new and update changed combinations
+            cursor.execute(
+                """
+                insert into forecastreport_view
+                  (name, item_id, location_id, customer_id, method, out_method, out_smape)
+                select
+                  coalesce(forecast.name, combinations.item_id||' @ '||
+                    combinations.location_id||' @ '||
+                    combinations.customer_id),
+                  combinations.item_id,
+                  combinations.location_id,
+                  combinations.customer_id,
+                  coalesce(forecast.method,'aggregate'),
+                  coalesce(forecast.out_method,'aggregate'),
+                  forecast.out_smape
+                from (%s) combinations
+                left outer join forecast
+                  on forecast.item_id = combinations.item_id
+                  and forecast.location_id = combinations.location_id
+                  and forecast.customer_id = combinations.customer_id
+                on conflict (item_id, location_id, customer_id) do update set
+                  name = excluded.name,
+                  method = excluded.method,
+                  out_method = excluded.out_method,
+                  out_smape = excluded.out_smape
+                where (
+                  forecastreport_view.name, forecastreport_view.method,
+                  forecastreport_view.out_method, forecastreport_view.out_smape
+                  ) is distinct from (
+                  excluded.name, excluded.method, excluded.out_method, excluded.out_smape
+                  )
+                """
+                % (
+                    """
+                    select item_id, location_id, customer_id
+                    from %s scope
+                    where exists (
+                      select 1 from forecastplan
+                      where forecastplan.item_id = scope.item_id
+                      and forecastplan.location_id = scope.location_id
+                      and forecastplan.customer_id = scope.customer_id
+                      )
+                    group by item_id, location_id, customer_id
+                    """
+                    % scopetable
+                    if scopetable
+                    else """
+                    select distinct item_id, location_id, customer_id
+                    from forecastplan
+                    """,
+                )
+            )
+
+            # Delete combinations that no longer exist
+            if hierarchy:
+                cursor.execute(
+                    """
+                    delete from forecastreport_view
+                    where not exists (
+                      select 1 from forecasthierarchy
+                      where forecasthierarchy.item_id = forecastreport_view.item_id
+                      and forecasthierarchy.location_id = forecastreport_view.location_id
+                      and forecasthierarchy.customer_id = forecastreport_view.customer_id
+                      )
+                    """
+                )
+            cursor.execute(
+                """
+                delete from forecastreport_view
+                where not exists (
+                  select 1 from forecastplan
+                  where forecastplan.item_id = forecastreport_view.item_id
+                  and forecastplan.location_id = forecastreport_view.location_id
+                  and forecastplan.customer_id = forecastreport_view.customer_id
+                  ) %s
+                """
+                % (
+                    """
+                    and exists (
+                      select 1 from %s scope
+                      where scope.item_id = forecastreport_view.item_id
+                      and scope.location_id = forecastreport_view.location_id
+                      and scope.customer_id = forecastreport_view.customer_id
+                      )
+                    """
+                    % scopetable
+                    if scopetable
+                    else "",
+                )
+            )
+
+            if scopetable == "forecastreport_scope":
+                cursor.execute("drop table forecastreport_scope")
+
+            # Record the freshness of the report
+            cursor.execute(
+                "update forecastreport_refresh set refreshed = %s", (datetime.now(),)
+            )
+
+    @staticmethod
+    def getRefreshed(database=DEFAULT_DB_ALIAS):
+        """
+        Returns the time of the last refresh of the forecastreport_view table.
+        """
+        with connections[database].cursor() as cursor:
+            cursor.execute("select refreshed from forecastreport_refresh")
+            rec = cursor.fetchone()
+            return rec[0] if rec else None
+
 
 def Benchmark():
     """
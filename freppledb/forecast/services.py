@@ -23,6 +23,7 @@
 
 import frepple
 
+from contextlib import contextmanager, nullcontext
 import json
 
 from channels.db import database_sync_to_async
@@ -32,14 +33,26 @@ from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 
 
-from freppledb.webservice.utils import lock
+from freppledb.webservice.utils import hierarchy, lock
 from freppledb.common.localization import parseLocalizedDateTime
-from freppledb.common.models import Comment
-from freppledb.forecast.models import Forecast
+from freppledb.common.models import Comment, planChanged
+from freppledb.forecast.models import Forecast, ForecastPlanView
 from freppledb.input.models import Item, Location, Customer, Buffer
 from freppledb.webservice.utils import fcst_solver
 
 
+@contextmanager
+def deferCacheWrites():
+    """
+    Defers the writes of the forecast cache during an update.
+    """
+    frepple.cache.write_immediately = False
+    try:
+        yield
+    finally:
+        frepple.cache.write_immediately = True
+
+
 class ForecastService(AsyncHttpConsumer):
     """
     Processes forecast update messages in these formats:
@@ -64,6 +77,11 @@ class ForecastService(AsyncHttpConsumer):
         Forecast.objects.all().using(self.scope["database"]).filter(
             item=f.item.name, location=f.location.name, customer=f.customer.name
         ).update(method=f.methods)
+        planChanged(self.scope["database"])
+        ForecastPlanView.refresh(
+            self.scope["database"],
+            combinations=[(f.item.name, f.location.name, f.customer.name)],
+        )
 
     @database_sync_to_async
     def replan(self, item, location):
@@ -127,37 +145,43 @@ class ForecastService(AsyncHttpConsumer):
             raise Exception("Invalid comment type")
 
     async def handle(self, body):
-        async with lock:
-            errors = []
-            try:
-                if self.scope["method"] != "POST":
-                    self.scope["response_headers"].append(
-                        (b"Content-Type", b"text/html")
-                    )
-                    await self.send_response(
-                        401,
-                        (self.msgtemplate % "Only POST requests allowed").encode(),
-                        headers=self.scope["response_headers"],
-                    )
-                    return
+        errors = []
+        try:
+            if self.scope["method"] != "POST":
+                self.scope["response_headers"].append((b"Content-Type", b"text/html"))
+                await self.send_response(
+                    401,
+                    (self.msgtemplate % "Only POST requests allowed").encode(),
+                    headers=self.scope["response_headers"],
+                )
+                return
 
-                # Check permissions
-                if not self.scope["user"].has_perm("forecast.change_forecast"):
-                    self.scope["response_headers"].append(
-                        (b"Content-Type", b"text/html")
-                    )
-                    await self.send_response(
-                        403,
-                        (self.msgtemplate % "Permission denied").encode(),
-                        headers=self.scope["response_headers"],
-                    )
-                    return
+            # Check permissions
+            if not self.scope["user"].has_perm("forecast.change_forecast"):
+                self.scope["response_headers"].append((b"Content-Type", b"text/html"))
+                await self.send_response(
+                    403,
+                    (self.msgtemplate % "Permission denied").encode(),
+                    headers=self.scope["response_headers"],
+                )
+                return
 
-                data = json.loads(body.decode("utf-8"))
+            data = json.loads(body.decode("utf-8"))
 
-                try:
+            # Updates lock the complete plan, comments only need to read
+            if (
+                isinstance(data, dict)
+                and not data.get("buckets", None)
+                and not data.get("forecastmethod", None)
+            ):
+                plan_lock = lock.read("forecast")
+                cache_writes = nullcontext()
+            else:
+                plan_lock = lock.write("forecast")
+                cache_writes = deferCacheWrites()
+            async with plan_lock:
+                with cache_writes:
                     replan = False
-                    frepple.cache.write_immediately = False
                     if isinstance(data, list):
                         # Message format #1
                         for bckt in data:
@@ -167,20 +191,16 @@ class ForecastService(AsyncHttpConsumer):
                             customer = None
                             if bckt.get("item", None):
                                 try:
-                                    item = frepple.item(name=bckt["item"], action="C")
+                                    item = hierarchy.get("item", bckt["item"])
                                 except Exception:
                                     errors.append("Item not found: %s" % bckt["item"])
                             else:
                                 # Use root item
-                                for i in frepple.items():
-                                    item = i
-                                    break
-                                while item and item.owner:
-                                    item = item.owner
+                                item = hierarchy.getRoot("item")
                             if bckt.get("location", None):
                                 try:
-                                    location = frepple.location(
-                                        name=bckt["location"], action="C"
+                                    location = hierarchy.get(
+                                        "location", bckt["location"]
                                     )
                                 except Exception:
                                     errors.append(
@@ -188,15 +208,11 @@ class ForecastService(AsyncHttpConsumer):
                                     )
                             else:
                                 # Use root location
-                                for i in frepple.locations():
-                                    location = i
-                                    break
-                                while location and location.owner:
-                                    location = location.owner
+                                location = hierarchy.getRoot("location")
                             if bckt.get("customer", None):
                                 try:
-                                    customer = frepple.customer(
-                                        name=bckt["customer"], action="C"
+                                    customer = hierarchy.get(
+                                        "customer", bckt["customer"]
                                     )
                                 except Exception:
                                     errors.append(
@@ -204,11 +220,7 @@ class ForecastService(AsyncHttpConsumer):
                                     )
                             else:
                                 # Use root customer
-                                for i in frepple.customers():
-                                    customer = i
-                                    break
-                                while customer and customer.owner:
-                                    customer = customer.owner
+                                customer = hierarchy.getRoot("customer")
                             if customer and item and location:
                                 try:
                                     args = {
@@ -259,48 +271,32 @@ class ForecastService(AsyncHttpConsumer):
                         customer = None
                         if data.get("item", None):
                             try:
-                                item = frepple.item(name=data["item"], action="C")
+                                item = hierarchy.get("item", data["item"])
                             except Exception:
                                 errors.append("Item not found: %s" % data["item"])
                         else:
                             # Use root item
-                            for i in frepple.items():
-                                item = i
-                                break
-                            while item and item.owner:
-                                item = item.owner
+                            item = hierarchy.getRoot("item")
                         if data.get("location", None):
                             try:
-                                location = frepple.location(
-                                    name=data["location"], action="C"
-                                )
+                                location = hierarchy.get("location", data["location"])
                             except Exception:
                                 errors.append(
                                     "Location not found: %s" % data["location"]
                                 )
                         else:
                             # Use root location
-                            for i in frepple.locations():
-                                location = i
-                                break
-                            while location and location.owner:
-                                location = location.owner
+                            location = hierarchy.getRoot("location")
                         if data.get("customer", None):
                             try:
-                                customer = frepple.customer(
-                                    name=data["customer"], action="C"
-                                )
+                                customer = hierarchy.get("customer", data["customer"])
                             except Exception:
                                 errors.append(
                                     "Customer not found: %s" % data["customer"]
                                 )
                         else:
                             # Use root customer
-                            for i in frepple.customers():
-                                customer = i
-                                break
-                            while customer and customer.owner:
-                                customer = customer.owner
+                            customer = hierarchy.getRoot("customer")
 
                         # Update forecast method
                         method = data.get("forecastmethod", None)
@@ -399,9 +395,6 @@ class ForecastService(AsyncHttpConsumer):
                             except Exception:
                                 errors.append(b"Exception during replanning")
 
-                finally:
-                    frepple.cache.write_immediately = True
-
                 # Save a new comment
                 if (
                     "commenttype" in data
@@ -432,13 +425,13 @@ class ForecastService(AsyncHttpConsumer):
                     json.dumps(answer).encode(),
                     headers=self.scope["response_headers"],
                 )
-            except Exception as e:
-                errors.append(str(e).encode())
-                await self.send_response(
-                    500,
-                    json.dumps({"errors": errors}).encode(),
-                    headers=self.scope["response_headers"],
-                )
+        except Exception as e:
+            errors.append(str(e).encode())
+            await self.send_response(
+                500,
+                json.dumps({"errors": errors}).encode(),
+                headers=self.scope["response_headers"],
+            )
 
 
 class FlushService(AsyncHttpConsumer):
@@ -453,12 +446,12 @@ class FlushService(AsyncHttpConsumer):
                 )
                 return
             if self.scope["path"] == "/flush/manual/":
-                async with lock:
+                async with lock.write("flush"):
                     frepple.cache.write_immediately = False
                     if settings.CACHE_MAXIMUM > 300:
                         frepple.cache.maximum = settings.CACHE_MAXIMUM
             elif self.scope["path"] == "/flush/auto/":
-                async with lock:
+                async with lock.write("flush"):
                     frepple.cache.flush()
                     frepple.cache.write_immediately = True
                     if frepple.cache.maximum > 300:
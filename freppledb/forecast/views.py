@@ -823,7 +823,12 @@ class OverviewReport(GridPivot):
                 }
             )
         else:
-            ctx.update({"currency": json.dumps(getCurrency())})
+            ctx.update(
+                {
+                    "currency": json.dumps(getCurrency()),
+                    "report_refreshed": ForecastPlanView.getRefreshed(request.database),
+                }
+            )
         return ctx
 
     @classmethod
@@ -30,6 +30,7 @@ from django.conf import settings
 
 from freppledb.boot import getAttributes
 from freppledb.common.commands import PlanTaskRegistry, PlanTask
+from freppledb.common.models import Parameter
 from freppledb.input.models import (
     Buffer,
     Calendar,
@@ -83,7 +84,11 @@ class cleanStatic(PlanTask):
 
     @classmethod
     def getWeight(cls, database=DEFAULT_DB_ALIAS, **kwargs):
-        if kwargs.get("exportstatic", False) and kwargs.get("source", None):
+        if (
+            kwargs.get("exportstatic", False)
+            and kwargs.get("source", None)
+            and not kwargs.get("incremental", False)
+        ):
             return 1
         else:
             return -1
@@ -750,6 +755,7 @@ class exportParameters(PlanTask):
                 "update common_parameter set value=%s, lastmodified=%s where name='currentdate'",
                 (frepple.settings.current.strftime("%Y-%m-%d %H:%M:%S"), cls.timestamp),
             )
+        Parameter.clearCache(database)
 
 
 @PlanTaskRegistry.register
@@ -20,9 +20,14 @@
 # OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
 # WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 #
+import io
+import json
 import os
 import logging
+import re
 import uuid
+from queue import Queue, Empty, Full
+from threading import Thread
 from time import time
 from datetime import datetime, date, timedelta
 from dateutil.parser import parse
@@ -76,6 +81,355 @@ class LoadTask(PlanTask):
 
     filter = None
 
+    @classmethod
+    def getQueries(cls, database=DEFAULT_DB_ALIAS, **kwargs):
+        """
+        Loading tasks can return here a list of (sql, arguments) tuples with the
+        SELECT statements they will execute.
+        Only statements that don't depend on the engine model or on database
+        updates from earlier planning steps can be listed here: they are
+        executed ahead of time when the prefetchData task is active.
+        """
+        return []
+
+    @classmethod
+    def fetch(cls, database, sql, args=None):
+        """
+        Iterates over the result rows of a SELECT statement.
+        The rows come from the prefetcher if it is already retrieving this
+        statement, or else from a chunked cursor on the current connection.
+        When the setting LOAD_COPY_READER is active, the rows are always read
+        with a CopyReader on a separate connection.
+        """
+        stream = LoadPrefetcher.get(cls, sql)
+        if not stream and getattr(settings, "LOAD_COPY_READER", False):
+            stream = LoadPrefetcher.stream(cls, sql, args, database=database)
+        if stream:
+            try:
+                yield from stream
+            finally:
+                stream.cancelled = True
+        else:
+            with transaction.atomic(using=database):
+                with connections[database].chunked_cursor() as cursor:
+                    cursor.execute(sql, args)
+                    yield from cursor
+
+
+class CopyReader(io.TextIOBase):
+    """
+    File-like object to read the result of a query with a
+    "COPY (select ...) TO STDOUT" statement.
+
+    The COPY output is decoded a block of lines at a time, rather than having
+    psycopg2 convert every field of every row. Numeric fields are returned
+    as float rather than Decimal.
+    The decoded rows are passed as a list of tuples to the consumer function,
+    which gives them the same interface as the rows of a cursor.
+    """
+
+    _escapes = {
+        "b": "\b",
+        "f": "\f",
+        "n": "\n",
+        "r": "\r",
+        "t": "\t",
+        "v": "\v",
+        "\\": "\\",
+    }
+
+    _escape_re = re.compile(r"\\([0-7]{1,3}|.)")
+
+    _interval_re = re.compile(
+        r"(?:(-?\d+) years? ?)?(?:(-?\d+) mons? ?)?(?:(-?\d+) days? ?)?"
+        r"(?:([+-])?(\d+):(\d+):(\d+(?:\.\d+)?))?$"
+    )
+
+    def __init__(self, cursor, consumer, blocksize=2000):
+        self.cursor = cursor
+        self.consumer = consumer
+        self.blocksize = blocksize
+        self._pending = []
+        self._buff = ""
+        self._converters = None
+
+    def writable(self):
+        return True
+
+    @classmethod
+    def _text(cls, value):
+        if "\\" not in value:
+            return value
+        return cls._escape_re.sub(
+            lambda m: (
+                chr(int(m.group(1), 8))
+                if m.group(1).isdigit()
+                else cls._escapes.get(m.group(1), m.group(1))
+            ),
+            value,
+        )
+
+    @staticmethod
+    def _timestamp(value):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            # Older Python versions only accept 3 or 6 digit fractions
+            return parse(value)
+
+    @classmethod
+    def _timestamptz(cls, value):
+        # The session time zone applies, and the engine expects naive datetimes
+        # just like the cursor returns them.
+        return cls._timestamp(value).replace(tzinfo=None)
+
+    @classmethod
+    def _interval(cls, value):
+        m = cls._interval_re.match(value)
+        if not m:
+            raise ValueError("Can't parse interval '%s'" % value)
+        years, months, days, sign, hours, minutes, seconds = m.groups()
+        result = timedelta(
+            days=int(years or 0) * 365 + int(months or 0) * 30 + int(days or 0)
+        )
+        if hours:
+            t = timedelta(
+                hours=int(hours), minutes=int(minutes), seconds=float(seconds)
+            )
+            result += -t if sign == "-" else t
+        return result
+
+    @classmethod
+    def _array(cls, value):
+        # Only one-dimensional arrays of text are supported
+        value = cls._text(value)[1:-1]
+        result = []
+        if not value:
+            return result
+        quoted = False
+        escaped = False
+        wasquoted = False
+        field = []
+        for c in value:
+            if escaped:
+                field.append(c)
+                escaped = False
+            elif c == "\\":
+                escaped = True
+            elif c == '"':
+                quoted = not quoted
+                wasquoted = True
+            elif c == "," and not quoted:
+                f = "".join(field)
+                result.append(None if f == "NULL" and not wasquoted else f)
+                field = []
+                wasquoted = False
+            else:
+                field.append(c)
+        f = "".join(field)
+        result.append(None if f == "NULL" and not wasquoted else f)
+        return result
+
+    # Decoding functions for the postgresql type oids
+    converters = {
+        16: lambda v: v == "t",  # bool
+        20: int,  # int8
+        21: int,  # int2
+        23: int,  # int4
+        114: json.loads,  # json
+        700: float,  # float4
+        701: float,  # float8
+        1082: date.fromisoformat,  # date
+        1700: float,  # numeric
+        3802: json.loads,  # jsonb
+    }
+
+    def execute(self, sql, args=None):
+        # Find the data type of each field
+        self.cursor.execute("select * from (%s) copy_query limit 0" % sql, args)
+        self._converters = []
+        for d in self.cursor.description:
+            if d[1] in (1015, 1009):
+                # varchar[], text[]
+                self._converters.append(self._array)
+            elif d[1] == 1186:
+                # interval
+                self._converters.append(self._interval)
+            elif d[1] == 1114:
+                # timestamp
+                self._converters.append(self._timestamp)
+            elif d[1] == 1184:
+                # timestamptz
+                self._converters.append(self._timestamptz)
+            else:
+                self._converters.append(self.converters.get(d[1], self._text))
+        query = self.cursor.mogrify(sql, args)
+        if isinstance(query, bytes):
+            query = query.decode("utf-8")
+        self.cursor.copy_expert("copy (%s) to stdout" % query, self)
+        self._flush()
+
+    def write(self, data):
+        self._pending.append(data)
+        if len(self._pending) >= self.blocksize:
+            self._flush()
+        return len(data)
+
+    def _flush(self):
+        lines = (self._buff + "".join(self._pending)).split("\n")
+        self._pending = []
+        self._buff = lines.pop()
+        if not lines:
+            return
+        conv = self._converters
+        self.consumer(
+            [
+                tuple(
+                    None if f == "\\N" else c(f) for c, f in zip(conv, line.split("\t"))
+                )
+                for line in lines
+            ]
+        )
+
+
+class LoadPrefetcher:
+    """
+    Executes the queries of the loading tasks on a number of separate database
+    connections.
+
+    The rows are passed in blocks over a bounded queue to the loading task that
+    creates the engine objects. The loading tasks still run one after the other
+    on the main thread, and in the same sequence as before. Only the fetching
+    of the data from the database overlaps with the creation of the objects.
+    """
+
+    # Number of rows passed at once to the consumer
+    blocksize = 2000
+
+    # Maximum number of blocks waiting in the queue of a single query
+    queuesize = 50
+
+    streams = []
+
+    class _Stream:
+        def __init__(self, task, sql, args):
+            self.task = task
+            self.sql = sql
+            self.args = args
+            self.queue = Queue(maxsize=LoadPrefetcher.queuesize)
+            self.cancelled = False
+
+        def put(self, data):
+            # Block when the queue is full, unless the consumer is no longer interested
+            while not self.cancelled:
+                try:
+                    self.queue.put(data, timeout=1)
+                    return
+                except Full:
+                    pass
+
+        def __iter__(self):
+            while True:
+                data = self.queue.get()
+                if data is None:
+                    return
+                if isinstance(data, Exception):
+                    raise data
+                yield from data
+
+    class _Worker(Thread):
+        def __init__(self, database, todo):
+            super().__init__(daemon=True)
+            self.database = database
+            self.todo = todo
+
+        def run(self):
+            try:
+                while True:
+                    try:
+                        stream = self.todo.get_nowait()
+                    except Empty:
+                        break
+                    if stream.cancelled:
+                        continue
+                    try:
+                        if getattr(settings, "LOAD_COPY_READER", False):
+                            with transaction.atomic(using=self.database):
+                                with connections[self.database].cursor() as cursor:
+                                    CopyReader(
+                                        cursor,
+                                        stream.put,
+                                        blocksize=LoadPrefetcher.blocksize,
+                                    ).execute(stream.sql, stream.args)
+                        else:
+                            with transaction.atomic(using=self.database):
+                                with connections[
+                                    self.database
+                                ].chunked_cursor() as cursor:
+                                    cursor.execute(stream.sql, stream.args)
+                                    while not stream.cancelled:
+                                        rows = cursor.fetchmany(
+                                            LoadPrefetcher.blocksize
+                                        )
+                                        if not rows:
+                                            break
+                                        stream.put(rows)
+                    except Exception as e:
+                        stream.put(e)
+                    stream.put(None)
+            finally:
+                connections.close_all()
+
+    @classmethod
+    def start(cls, tasks, database=DEFAULT_DB_ALIAS, workers=1, **kwargs):
+        """
+        Starts retrieving the data of the loading tasks, in the order in
+        which the tasks will be executed.
+        """
+        cls.stop()
+        todo = Queue()
+        for task in tasks:
+            for sql, args in task.getQueries(database=database, **kwargs):
+                stream = cls._Stream(task, sql, args)
+                cls.streams.append(stream)
+                todo.put(stream)
+        if not cls.streams:
+            return 0
+        for _ in range(min(workers, len(cls.streams))):
+            cls._Worker(database, todo).start()
+        return len(cls.streams)
+
+    @classmethod
+    def stream(cls, task, sql, args=None, database=DEFAULT_DB_ALIAS):
+        """
+        Starts retrieving a single query on a separate connection.
+        """
+        stream = cls._Stream(task, sql, args)
+        todo = Queue()
+        todo.put(stream)
+        cls._Worker(database, todo).start()
+        return stream
+
+    @classmethod
+    def get(cls, task, sql):
+        """
+        Returns the stream for a query, or None when the query isn't prefetched.
+        Streams queued before this one are no longer needed and are released.
+        """
+        for idx, stream in enumerate(cls.streams):
+            if stream.task == task and stream.sql == sql:
+                for skipped in cls.streams[:idx]:
+                    skipped.cancelled = True
+                del cls.streams[: idx + 1]
+                return stream
+        return None
+
+    @classmethod
+    def stop(cls):
+        for stream in cls.streams:
+            stream.cancelled = True
+        cls.streams = []
+
 
 @PlanTaskRegistry.register
 class checkBuckets(CheckTask):
@@ -391,6 +745,47 @@ class loadParameter(LoadTask):
                 logger.info("Current date: %s" % frepple.settings.current)
 
 
+@PlanTaskRegistry.register
+class prefetchData(PlanTask):
+    """
+    Starts retrieving the data of the loading tasks on separate database
+    connections. The number of connections is configured with the setting
+    LOAD_PREFETCH_CONNECTIONS. The default value 0 disables the prefetching.
+    """
+
+    description = "Prefetching data"
+    sequence = 90.75
+
+    @classmethod
+    def getWeight(cls, **kwargs):
+        if kwargs.get("skipLoad", False):
+            return -1
+        return 0.1 if getattr(settings, "LOAD_PREFETCH_CONNECTIONS", 0) > 0 else -1
+
+    @classmethod
+    def run(cls, database=DEFAULT_DB_ALIAS, **kwargs):
+        tasks = []
+        for step in PlanTaskRegistry.reg.steps:
+            if (
+                isinstance(step, type)
+                and issubclass(step, LoadTask)
+                and step.sequence > cls.sequence
+            ):
+                weight = step.getWeight(database=database, **kwargs)
+                if weight is not None and weight > 0:
+                    tasks.append(step)
+        cnt = LoadPrefetcher.start(
+            tasks,
+            database=database,
+            workers=settings.LOAD_PREFETCH_CONNECTIONS,
+            **kwargs,
+        )
+        logger.info(
+            "Prefetching %d queries over %d connections"
+            % (cnt, min(cnt, settings.LOAD_PREFETCH_CONNECTIONS))
+        )
+
+
 @PlanTaskRegistry.register
 class loadLocations(LoadTask):
     description = "Importing locations"
@@ -1089,68 +1484,71 @@ class loadItems(LoadTask):
         return -1 if kwargs.get("skipLoad", False) else 1
 
     @classmethod
-    def run(cls, database=DEFAULT_DB_ALIAS, **kwargs):
-        import frepple
-
+    def getQueries(cls, database=DEFAULT_DB_ALIAS, **kwargs):
         if cls.filter:
             filter_where = "where %s " % cls.filter
         else:
             filter_where = ""
-
-        with transaction.atomic(using=database):
-            with connections[database].chunked_cursor() as cursor:
-                cnt = 0
-                starttime = time()
-                attrs = [f[0] for f in getAttributes(Item)]
-                if attrs:
-                    attrsql = ", %s" % ", ".join(attrs)
-                else:
-                    attrsql = ""
-                cursor.execute(
-                    """
+        attrs = [f[0] for f in getAttributes(Item)]
+        if attrs:
+            attrsql = ", %s" % ", ".join(attrs)
+        else:
+            attrsql = ""
+        return [
+            (
+                """
                 select
                   name, description, owner_id,
                   cost, category, subcategory, source, type,
                   (select type from item p_item where item.owner_id = p_item.name) %s
                 from item %s
                 """
-                    % (attrsql, filter_where)
-                )
-                for i in cursor:
-                    cnt += 1
-                    try:
-                        if i[7] == "make to order":
-                            x = frepple.item_mto(
-                                name=i[0],
-                                description=i[1],
-                                category=i[4],
-                                subcategory=i[5],
-                                source=i[6],
-                            )
-                        else:
-                            x = frepple.item_mts(
-                                name=i[0],
-                                description=i[1],
-                                category=i[4],
-                                subcategory=i[5],
-                                source=i[6],
-                            )
-                        if i[2]:
-                            if i[8] == "make to order":
-                                x.owner = frepple.item_mto(name=i[2])
-                            else:
-                                x.owner = frepple.item_mts(name=i[2])
-                        if i[3]:
-                            x.cost = i[3]
-                        idx = 9
-                        for a in attrs:
-                            setattr(x, a, i[idx])
-                            idx += 1
-                    except Exception as e:
-                        logger.error("**** %s ****" % e)
-                logger.info(
-                    "Loaded %d items in %.2f seconds" % (cnt, time() - starttime)
-                )
+                % (attrsql, filter_where),
+                None,
+            )
+        ]
+
+    @classmethod
+    def run(cls, database=DEFAULT_DB_ALIAS, **kwargs):
+        import frepple
+
+        cnt = 0
+        starttime = time()
+        attrs = [f[0] for f in getAttributes(Item)]
+        sql, args = cls.getQueries(database=database, **kwargs)[0]
+        for i in cls.fetch(database, sql, args):
+            cnt += 1
+            try:
+                if i[7] == "make to order":
+                    x = frepple.item_mto(
+                        name=i[0],
+                        description=i[1],
+                        category=i[4],
+                        subcategory=i[5],
+                        source=i[6],
+                    )
+                else:
+                    x = frepple.item_mts(
+                        name=i[0],
+                        description=i[1],
+                        category=i[4],
+                        subcategory=i[5],
+                        source=i[6],
+                    )
+                if i[2]:
+                    if i[8] == "make to order":
+                        x.owner = frepple.item_mto(name=i[2])
+                    else:
+                        x.owner = frepple.item_mts(name=i[2])
+                if i[3]:
+                    x.cost = i[3]
+                idx = 9
+                for a in attrs:
+                    setattr(x, a, i[idx])
+                    idx += 1
+            except Exception as e:
+                logger.error("**** %s ****" % e)
+        logger.info("Loaded %d items in %.2f seconds" % (cnt, time() - starttime))
 
 
 @PlanTaskRegistry.register
@@ -1163,76 +1561,79 @@ class loadItemSuppliers(LoadTask):
         return -1 if kwargs.get("skipLoad", False) else 1
 
     @classmethod
-    def run(cls, database=DEFAULT_DB_ALIAS, **kwargs):
-        import frepple
-
+    def getQueries(cls, database=DEFAULT_DB_ALIAS, **kwargs):
         if cls.filter:
             filter_where = "where %s " % cls.filter
         else:
             filter_where = ""
+        return [
+            (
+                """
+                SELECT
+                supplier_id, item_id, location_id, sizeminimum, sizemultiple, sizemaximum,
+                cost, priority, effective_start, effective_end, source, leadtime,
+                resource_id, resource_qty, fence, batchwindow, extra_safety_leadtime,
+                hard_safety_leadtime
+                FROM itemsupplier %s
+                ORDER BY supplier_id, item_id, location_id, priority desc
+                """
+                % filter_where,
+                None,
+            )
+        ]
 
-        with transaction.atomic(using=database):
-            with connections[database].chunked_cursor() as cursor:
-                cnt = 0
-                starttime = time()
-                cursor.execute(
-                    """
-                    SELECT
-                    supplier_id, item_id, location_id, sizeminimum, sizemultiple, sizemaximum,
-                    cost, priority, effective_start, effective_end, source, leadtime,
-                    resource_id, resource_qty, fence, batchwindow, extra_safety_leadtime,
-                    hard_safety_leadtime
-                    FROM itemsupplier %s
-                    ORDER BY supplier_id, item_id, location_id, priority desc
-                    """
-                    % filter_where
-                )
-                cursuppliername = None
-                curitemname = None
-                for i in cursor:
-                    cnt += 1
-                    try:
-                        if i[0] != cursuppliername:
-                            cursuppliername = i[0]
-                            cursupplier = frepple.supplier(name=cursuppliername)
-                        if i[1] != curitemname:
-                            curitemname = i[1]
-                            curitem = frepple.item(name=curitemname)
-                        curitemsupplier = frepple.itemsupplier(
-                            supplier=cursupplier,
-                            item=curitem,
-                            source=i[9],
-                            leadtime=i[11] if i[11] else 0,
-                            fence=i[14] if i[14] else 0,
-                            resource_qty=i[13],
-                            batchwindow=i[15] if i[15] is not None else 7 * 86400,
-                            extra_safety_leadtime=i[16] if i[16] else 0,
-                            hard_safety_leadtime=i[17] if i[17] else 0,
-                        )
-                        if i[2]:
-                            curitemsupplier.location = frepple.location(name=i[2])
-                        if i[3] is not None:
-                            curitemsupplier.size_minimum = i[3]
-                        if i[4] is not None:
-                            curitemsupplier.size_multiple = i[4]
-                        if i[5]:
-                            curitemsupplier.size_maximum = i[5]
-                        if i[6]:
-                            curitemsupplier.cost = i[6]
-                        if i[7] is not None:
-                            curitemsupplier.priority = i[7]
-                        if i[8] and i[8] > datetime(1971, 1, 3):
-                            curitemsupplier.effective_start = i[8]
-                        if i[9] and i[9] < datetime(2030, 12, 29):
-                            curitemsupplier.effective_end = i[9]
-                        if i[12]:
-                            curitemsupplier.resource = frepple.resource(name=i[12])
-                    except Exception as e:
-                        logger.error("**** %s ****" % e)
-                logger.info(
-                    "Loaded %d item suppliers in %.2f seconds"
-                    % (cnt, time() - starttime)
+    @classmethod
+    def run(cls, database=DEFAULT_DB_ALIAS, **kwargs):
+        import frepple
+
+        cnt = 0
+        starttime = time()
+        sql, args = cls.getQueries(database=database, **kwargs)[0]
+        cursuppliername = None
+        curitemname = None
+        for i in cls.fetch(database, sql, args):
+            cnt += 1
+            try:
+                if i[0] != cursuppliername:
+                    cursuppliername = i[0]
+                    cursupplier = frepple.supplier(name=cursuppliername)
+                if i[1] != curitemname:
+                    curitemname = i[1]
+                    curitem = frepple.item(name=curitemname)
+                curitemsupplier = frepple.itemsupplier(
+                    supplier=cursupplier,
+                    item=curitem,
+                    source=i[9],
+                    leadtime=i[11] if i[11] else 0,
+                    fence=i[14] if i[14] else 0,
+                    resource_qty=i[13],
+                    batchwindow=i[15] if i[15] is not None else 7 * 86400,
+                    extra_safety_leadtime=i[16] if i[16] else 0,
+                    hard_safety_leadtime=i[17] if i[17] else 0,
                 )
+                if i[2]:
+                    curitemsupplier.location = frepple.location(name=i[2])
+                if i[3] is not None:
+                    curitemsupplier.size_minimum = i[3]
+                if i[4] is not None:
+                    curitemsupplier.size_multiple = i[4]
+                if i[5]:
+                    curitemsupplier.size_maximum = i[5]
+                if i[6]:
+                    curitemsupplier.cost = i[6]
+                if i[7] is not None:
+                    curitemsupplier.priority = i[7]
+                if i[8] and i[8] > datetime(1971, 1, 3):
+                    curitemsupplier.effective_start = i[8]
+                if i[9] and i[9] < datetime(2030, 12, 29):
+                    curitemsupplier.effective_end = i[9]
+                if i[12]:
+                    curitemsupplier.resource = frepple.resource(name=i[12])
+            except Exception as e:
+                logger.error("**** %s ****" % e)
+        logger.info(
+            "Loaded %d item suppliers in %.2f seconds" % (cnt, time() - starttime)
+        )
 
 
 @PlanTaskRegistry.register
@@ -1245,20 +1646,14 @@ class loadItemDistributions(LoadTask):
         return -1 if kwargs.get("skipLoad", False) else 1
 
     @classmethod
-    def run(cls, database=DEFAULT_DB_ALIAS, **kwargs):
-        import frepple
-
+    def getQueries(cls, database=DEFAULT_DB_ALIAS, **kwargs):
         if cls.filter:
             filter_where = "where %s " % cls.filter
         else:
             filter_where = ""
-
-        with transaction.atomic(using=database):
-            with connections[database].chunked_cursor() as cursor:
-                cnt = 0
-                starttime = time()
-                cursor.execute(
-                    """
+        return [
+            (
+                """
                 SELECT
                   origin_id, item_id, location_id, sizeminimum, sizemultiple, sizemaximum,
                   cost, priority, effective_start, effective_end, source,
@@ -1266,64 +1661,69 @@ class loadItemDistributions(LoadTask):
                 FROM itemdistribution %s
                 ORDER BY origin_id, item_id, location_id, priority desc
                 """
-                    % filter_where
+                % filter_where,
+                None,
+            )
+        ]
+
+    @classmethod
+    def run(cls, database=DEFAULT_DB_ALIAS, **kwargs):
+        import frepple
+
+        cnt = 0
+        starttime = time()
+        sql, args = cls.getQueries(database=database, **kwargs)[0]
+        curoriginname = None
+        curitemname = None
+        for i in cls.fetch(database, sql, args):
+            if not i[0] or not i[2]:
+                logger.error("Origin and location must be defined, skipping one record")
+                continue
+            if i[0] == i[2]:
+                logger.error(
+                    "Origin and location must be different, skipping one record"
                 )
-                curoriginname = None
-                curitemname = None
-                for i in cursor:
-                    if not i[0] or not i[2]:
-                        logger.error(
-                            "Origin and location must be defined, skipping one record"
-                        )
-                        continue
-                    if i[0] == i[2]:
-                        logger.error(
-                            "Origin and location must be different, skipping one record"
-                        )
-                        continue
-                    cnt += 1
-                    try:
-                        if i[0] != curoriginname:
-                            curoriginname = i[0]
-                            curorigin = frepple.location(name=curoriginname)
-                        if i[1] != curitemname:
-                            curitemname = i[1]
-                            curitem = frepple.item(name=curitemname)
-                        curitemdistribution = frepple.itemdistribution(
-                            origin=curorigin,
-                            item=curitem,
-                            source=i[10],
-                            leadtime=i[11] if i[11] else 0,
-                            fence=i[14] if i[14] else 0,
-                            resource_qty=i[13],
-                            batchwindow=i[15] if i[15] is not None else 7 * 86400,
-                        )
-                        if i[2]:
-                            curitemdistribution.destination = frepple.location(
-                                name=i[2]
-                            )
-                        if i[3] is not None:
-                            curitemdistribution.size_minimum = i[3]
-                        if i[4] is not None:
-                            curitemdistribution.size_multiple = i[4]
-                        if i[5]:
-                            curitemdistribution.size_maximum = i[5]
-                        if i[6]:
-                            curitemdistribution.cost = i[6]
-                        if i[7] is not None:
-                            curitemdistribution.priority = i[7]
-                        if i[8] and i[8] > datetime(1971, 1, 3):
-                            curitemdistribution.effective_start = i[8]
-                        if i[9] and i[9] < datetime(2030, 12, 29):
-                            curitemdistribution.effective_end = i[9]
-                        if i[12]:
-                            curitemdistribution.resource = frepple.resource(name=i[12])
-                    except Exception as e:
-                        logger.error("**** %s ****" % e)
-                logger.info(
-                    "Loaded %d item distributions in %.2f seconds"
-                    % (cnt, time() - starttime)
+                continue
+            cnt += 1
+            try:
+                if i[0] != curoriginname:
+                    curoriginname = i[0]
+                    curorigin = frepple.location(name=curoriginname)
+                if i[1] != curitemname:
+                    curitemname = i[1]
+                    curitem = frepple.item(name=curitemname)
+                curitemdistribution = frepple.itemdistribution(
+                    origin=curorigin,
+                    item=curitem,
+                    source=i[10],
+                    leadtime=i[11] if i[11] else 0,
+                    fence=i[14] if i[14] else 0,
+                    resource_qty=i[13],
+                    batchwindow=i[15] if i[15] is not None else 7 * 86400,
                 )
+                if i[2]:
+                    curitemdistribution.destination = frepple.location(name=i[2])
+                if i[3] is not None:
+                    curitemdistribution.size_minimum = i[3]
+                if i[4] is not None:
+                    curitemdistribution.size_multiple = i[4]
+                if i[5]:
+                    curitemdistribution.size_maximum = i[5]
+                if i[6]:
+                    curitemdistribution.cost = i[6]
+                if i[7] is not None:
+                    curitemdistribution.priority = i[7]
+                if i[8] and i[8] > datetime(1971, 1, 3):
+                    curitemdistribution.effective_start = i[8]
+                if i[9] and i[9] < datetime(2030, 12, 29):
+                    curitemdistribution.effective_end = i[9]
+                if i[12]:
+                    curitemdistribution.resource = frepple.resource(name=i[12])
+            except Exception as e:
+                logger.error("**** %s ****" % e)
+        logger.info(
+            "Loaded %d item distributions in %.2f seconds" % (cnt, time() - starttime)
+        )
 
 
 @PlanTaskRegistry.register
@@ -1336,20 +1736,14 @@ class loadBuffers(LoadTask):
         return -1 if kwargs.get("skipLoad", False) else 1
 
     @classmethod
-    def run(cls, database=DEFAULT_DB_ALIAS, **kwargs):
-        import frepple
-
+    def getQueries(cls, database=DEFAULT_DB_ALIAS, **kwargs):
         if cls.filter:
             filter_where = "where %s " % cls.filter
         else:
             filter_where = ""
-
-        with transaction.atomic(using=database):
-            with connections[database].chunked_cursor() as cursor:
-                cnt = 0
-                starttime = time()
-                cursor.execute(
-                    """
+        return [
+            (
+                """
                 select
                   case
                   when batch is not null
@@ -1383,52 +1777,60 @@ class loadBuffers(LoadTask):
                     item_id ||' @ '||location_id
                   end
                 """
-                    % filter_where
-                )
-                for i in cursor:
-                    cnt += 1
-                    if i[7] == "infinite":
-                        b = frepple.buffer_infinite(
-                            name=i[0],
-                            description=i[1],
-                            location=frepple.location(name=i[2]),
-                            item=frepple.item(name=i[3]),
-                            batch=i[12] if i[12] else None,
-                            onhand=max(i[4] or 0, 0),
-                            category=i[9],
-                            subcategory=i[10],
-                            source=i[11],
-                        )
-                    elif not i[7] or i[7] == "default":
-                        b = frepple.buffer(
-                            name=i[0],
-                            description=i[1],
-                            location=frepple.location(name=i[2]),
-                            item=frepple.item(name=i[3]),
-                            batch=i[12] if i[12] else None,
-                            onhand=max(i[4] or 0, 0),
-                            category=i[9],
-                            subcategory=i[10],
-                            source=i[11],
-                        )
-                        if i[8]:
-                            b.mininterval = i[8]
-                    else:
-                        raise ValueError("Buffer type '%s' not recognized" % i[7])
-                    if i[10] == "tool":
-                        b.tool = True
-                    if i[5]:
-                        b.minimum = i[5]
-                    if i[6]:
-                        b.minimum_calendar = frepple.calendar(name=i[6])
-                    if i[13]:
-                        b.maximum = i[13]
-                    if i[14]:
-                        b.maximum_calendar = frepple.calendar(name=i[14])
+                % filter_where,
+                None,
+            )
+        ]
 
-                logger.info(
-                    "Loaded %d buffers in %.2f seconds" % (cnt, time() - starttime)
+    @classmethod
+    def run(cls, database=DEFAULT_DB_ALIAS, **kwargs):
+        import frepple
+
+        cnt = 0
+        starttime = time()
+        sql, args = cls.getQueries(database=database, **kwargs)[0]
+        for i in cls.fetch(database, sql, args):
+            cnt += 1
+            if i[7] == "infinite":
+                b = frepple.buffer_infinite(
+                    name=i[0],
+                    description=i[1],
+                    location=frepple.location(name=i[2]),
+                    item=frepple.item(name=i[3]),
+                    batch=i[12] if i[12] else None,
+                    onhand=max(i[4] or 0, 0),
+                    category=i[9],
+                    subcategory=i[10],
+                    source=i[11],
+                )
+            elif not i[7] or i[7] == "default":
+                b = frepple.buffer(
+                    name=i[0],
+                    description=i[1],
+                    location=frepple.location(name=i[2]),
+                    item=frepple.item(name=i[3]),
+                    batch=i[12] if i[12] else None,
+                    onhand=max(i[4] or 0, 0),
+                    category=i[9],
+                    subcategory=i[10],
+                    source=i[11],
                 )
+                if i[8]:
+                    b.mininterval = i[8]
+            else:
+                raise ValueError("Buffer type '%s' not recognized" % i[7])
+            if i[10] == "tool":
+                b.tool = True
+            if i[5]:
+                b.minimum = i[5]
+            if i[6]:
+                b.minimum_calendar = frepple.calendar(name=i[6])
+            if i[13]:
+                b.maximum = i[13]
+            if i[14]:
+                b.maximum_calendar = frepple.calendar(name=i[14])
+
+        logger.info("Loaded %d buffers in %.2f seconds" % (cnt, time() - starttime))
 
 
 @PlanTaskRegistry.register
@@ -1703,46 +2105,49 @@ class loadResourceSkills(LoadTask):
         return -1 if kwargs.get("skipLoad", False) else 1
 
     @classmethod
-    def run(cls, database=DEFAULT_DB_ALIAS, **kwargs):
-        import frepple
-
+    def getQueries(cls, database=DEFAULT_DB_ALIAS, **kwargs):
         if cls.filter:
             filter_where = "where %s " % cls.filter
         else:
             filter_where = ""
-
-        with transaction.atomic(using=database):
-            with connections[database].chunked_cursor() as cursor:
-                cnt = 0
-                starttime = time()
-                cursor.execute(
-                    """
+        return [
+            (
+                """
                 SELECT
                   resource_id, skill_id, effective_start, effective_end, priority, source
                 FROM resourceskill %s
                 ORDER BY skill_id, priority, resource_id
                 """
-                    % filter_where
-                )
-                for i in cursor:
-                    cnt += 1
-                    try:
-                        cur = frepple.resourceskill(
-                            resource=frepple.resource(name=i[0]),
-                            skill=frepple.skill(name=i[1]),
-                            priority=i[4] if i[4] is not None else 1,
-                            source=i[5],
-                        )
-                        if i[2] and i[2] > datetime(1971, 1, 3):
-                            cur.effective_start = i[2]
-                        if i[3] and i[3] < datetime(2030, 12, 29):
-                            cur.effective_end = i[3]
-                    except Exception as e:
-                        logger.error("**** %s ****" % e)
-                logger.info(
-                    "Loaded %d resource skills in %.2f seconds"
-                    % (cnt, time() - starttime)
+                % filter_where,
+                None,
+            )
+        ]
+
+    @classmethod
+    def run(cls, database=DEFAULT_DB_ALIAS, **kwargs):
+        import frepple
+
+        cnt = 0
+        starttime = time()
+        sql, args = cls.getQueries(database=database, **kwargs)[0]
+        for i in cls.fetch(database, sql, args):
+            cnt += 1
+            try:
+                cur = frepple.resourceskill(
+                    resource=frepple.resource(name=i[0]),
+                    skill=frepple.skill(name=i[1]),
+                    priority=i[4] if i[4] is not None else 1,
+                    source=i[5],
                 )
+                if i[2] and i[2] > datetime(1971, 1, 3):
+                    cur.effective_start = i[2]
+                if i[3] and i[3] < datetime(2030, 12, 29):
+                    cur.effective_end = i[3]
+            except Exception as e:
+                logger.error("**** %s ****" % e)
+        logger.info(
+            "Loaded %d resource skills in %.2f seconds" % (cnt, time() - starttime)
+        )
 
 
 @PlanTaskRegistry.register
@@ -1755,90 +2160,93 @@ class loadOperationMaterials(LoadTask):
         return -1 if kwargs.get("skipLoad", False) else 1
 
     @classmethod
-    def run(cls, database=DEFAULT_DB_ALIAS, **kwargs):
-        import frepple
-
+    def getQueries(cls, database=DEFAULT_DB_ALIAS, **kwargs):
         if cls.filter:
             filter_where = "where %s " % cls.filter
         else:
             filter_where = ""
-
-        with transaction.atomic(using=database):
-            with connections[database].chunked_cursor() as cursor:
-                cnt = 0
-                starttime = time()
-                # Note: The sorting of the flows is not really necessary, but helps to make
-                # the planning progress consistent across runs and database engines.
-                cursor.execute(
-                    """
+        # Note: The sorting of the flows is not really necessary, but helps to make
+        # the planning progress consistent across runs and database engines.
+        return [
+            (
+                """
                 SELECT
                   operation_id, item_id, quantity, type, effective_start, effective_end,
                   name, priority, search, source, transferbatch, quantity_fixed, "offset"
                 FROM operationmaterial %s
                 ORDER BY operation_id, priority, item_id
                 """
-                    % filter_where
-                )
-                for i in cursor:
-                    cnt += 1
-                    try:
-                        curflow = frepple.flow(
-                            operation=frepple.operation(name=i[0]),
-                            item=frepple.item(name=i[1]),
-                            quantity=i[2],
-                            quantity_fixed=i[11],
-                            type="flow_%s" % i[3],
-                            source=i[9],
-                        )
-                        if i[4] and i[4] > datetime(1971, 1, 3):
-                            curflow.effective_start = i[4]
-                        if i[5] and i[5] < datetime(2030, 12, 29):
-                            curflow.effective_end = i[5]
-                        if i[6] and i[6] != "":
-                            curflow.name = i[6]
-                        if i[7] is not None:
-                            curflow.priority = i[7]
-                        if i[8]:
-                            curflow.search = i[8]
-                        if i[3] == "transfer_batch":
-                            if i[10]:
-                                curflow.transferbatch = i[10]
-                        else:
-                            if i[12]:
-                                curflow.offset = i[12]
-                    except Exception as e:
-                        logger.error("**** %s ****" % e)
-                logger.info(
-                    "Loaded %d operation materials in %.2f seconds"
-                    % (cnt, time() - starttime)
+                % filter_where,
+                None,
+            )
+        ]
+
+    @classmethod
+    def run(cls, database=DEFAULT_DB_ALIAS, **kwargs):
+        import frepple
+
+        cnt = 0
+        starttime = time()
+        sql, args = cls.getQueries(database=database, **kwargs)[0]
+        for i in cls.fetch(database, sql, args):
+            cnt += 1
+            try:
+                curflow = frepple.flow(
+                    operation=frepple.operation(name=i[0]),
+                    item=frepple.item(name=i[1]),
+                    quantity=i[2],
+                    quantity_fixed=i[11],
+                    type="flow_%s" % i[3],
+                    source=i[9],
                 )
+                if i[4] and i[4] > datetime(1971, 1, 3):
+                    curflow.effective_start = i[4]
+                if i[5] and i[5] < datetime(2030, 12, 29):
+                    curflow.effective_end = i[5]
+                if i[6] and i[6] != "":
+                    curflow.name = i[6]
+                if i[7] is not None:
+                    curflow.priority = i[7]
+                if i[8]:
+                    curflow.search = i[8]
+                if i[3] == "transfer_batch":
+                    if i[10]:
+                        curflow.transferbatch = i[10]
+                else:
+                    if i[12]:
+                        curflow.offset = i[12]
+            except Exception as e:
+                logger.error("**** %s ****" % e)
+        logger.info(
+            "Loaded %d operation materials in %.2f seconds" % (cnt, time() - starttime)
+        )
 
-                # Check for operations where:
-                #  - operation.item is still blank
-                #  - they have a single operationmaterial item with quantity > 0
-                # If found we update
-                starttime = time()
-                cnt = 0
-                logger.info("Auto-update operation items...")
-                for oper in frepple.operations():
-                    if oper.hidden or oper.item or oper.owner:
-                        continue
+        # Check for operations where:
+        #  - operation.item is still blank
+        #  - they have a single operationmaterial item with quantity > 0
+        # If found we update
+        starttime = time()
+        cnt = 0
+        logger.info("Auto-update operation items...")
+        for oper in frepple.operations():
+            if oper.hidden or oper.item or oper.owner:
+                continue
+            item = None
+            for fl in oper.flows:
+                if fl.quantity < 0 or fl.hidden:
+                    continue
+                if item and item != fl.item:
                     item = None
-                    for fl in oper.flows:
-                        if fl.quantity < 0 or fl.hidden:
-                            continue
-                        if item and item != fl.item:
-                            item = None
-                            break
-                        else:
-                            item = fl.item
-                    if item:
-                        cnt += 1
-                        oper.item = item
-                logger.info(
-                    "Auto-update of %s operation items in %.2f seconds"
-                    % (cnt, time() - starttime)
-                )
+                    break
+                else:
+                    item = fl.item
+            if item:
+                cnt += 1
+                oper.item = item
+        logger.info(
+            "Auto-update of %s operation items in %.2f seconds"
+            % (cnt, time() - starttime)
+        )
 
 
 @PlanTaskRegistry.register
@@ -1851,61 +2259,64 @@ class loadOperationResources(LoadTask):
         return -1 if kwargs.get("skipLoad", False) else 1
 
     @classmethod
-    def run(cls, database=DEFAULT_DB_ALIAS, **kwargs):
-        import frepple
-
+    def getQueries(cls, database=DEFAULT_DB_ALIAS, **kwargs):
         if cls.filter:
             filter_where = "where %s " % cls.filter
         else:
             filter_where = ""
-
-        with transaction.atomic(using=database):
-            with connections[database].chunked_cursor() as cursor:
-                cnt = 0
-                starttime = time()
-                # Note: The sorting of the loads is not really necessary, but helps to make
-                # the planning progress consistent across runs and database engines.
-                cursor.execute(
-                    """
+        # Note: The sorting of the loads is not really necessary, but helps to make
+        # the planning progress consistent across runs and database engines.
+        return [
+            (
+                """
                 SELECT
                   operation_id, resource_id, quantity, effective_start, effective_end, name,
                   priority, setup, search, skill_id, source, quantity_fixed
                 FROM operationresource %s
                 ORDER BY operation_id, priority, resource_id
                 """
-                    % filter_where
-                )
-                for i in cursor:
-                    cnt += 1
-                    try:
-                        curload = frepple.load(
-                            operation=frepple.operation(name=i[0]),
-                            resource=frepple.resource(name=i[1]),
-                            quantity=i[2],
-                            source=i[10],
-                        )
-                        if i[3] and i[3] > datetime(1971, 1, 3):
-                            curload.effective_start = i[3]
-                        if i[4] and i[4] < datetime(2030, 12, 29):
-                            curload.effective_end = i[4]
-                        if i[5]:
-                            curload.name = i[5]
-                        if i[6] is not None:
-                            curload.priority = i[6]
-                        if i[7]:
-                            curload.setup = i[7]
-                        if i[8]:
-                            curload.search = i[8]
-                        if i[9]:
-                            curload.skill = frepple.skill(name=i[9])
-                        if i[11]:
-                            curload.quantity_fixed = i[11]
-                    except Exception as e:
-                        logger.error("**** %s ****" % e)
-                logger.info(
-                    "Loaded %d resource loads in %.2f seconds"
-                    % (cnt, time() - starttime)
+                % filter_where,
+                None,
+            )
+        ]
+
+    @classmethod
+    def run(cls, database=DEFAULT_DB_ALIAS, **kwargs):
+        import frepple
+
+        cnt = 0
+        starttime = time()
+        sql, args = cls.getQueries(database=database, **kwargs)[0]
+        for i in cls.fetch(database, sql, args):
+            cnt += 1
+            try:
+                curload = frepple.load(
+                    operation=frepple.operation(name=i[0]),
+                    resource=frepple.resource(name=i[1]),
+                    quantity=i[2],
+                    source=i[10],
                 )
+                if i[3] and i[3] > datetime(1971, 1, 3):
+                    curload.effective_start = i[3]
+                if i[4] and i[4] < datetime(2030, 12, 29):
+                    curload.effective_end = i[4]
+                if i[5]:
+                    curload.name = i[5]
+                if i[6] is not None:
+                    curload.priority = i[6]
+                if i[7]:
+                    curload.setup = i[7]
+                if i[8]:
+                    curload.search = i[8]
+                if i[9]:
+                    curload.skill = frepple.skill(name=i[9])
+                if i[11]:
+                    curload.quantity_fixed = i[11]
+            except Exception as e:
+                logger.error("**** %s ****" % e)
+        logger.info(
+            "Loaded %d resource loads in %.2f seconds" % (cnt, time() - starttime)
+        )
 
 
 @PlanTaskRegistry.register
@@ -2022,6 +2433,211 @@ class loadOperationPlans(LoadTask):
     def getWeight(cls, **kwargs):
         return -1 if kwargs.get("skipLoad", False) else 1
 
+    @classmethod
+    def getQueries(cls, database=DEFAULT_DB_ALIAS, **kwargs):
+        if cls.filter:
+            filter_and = "and %s " % cls.filter
+        else:
+            filter_and = ""
+        with_fcst = "freppledb.forecast" in settings.INSTALLED_APPS
+        if "supply" in os.environ:
+            confirmed_filter = """ and (
+              operationplan.status in ('confirmed', 'approved', 'completed')
+              or exists (
+                select 1 from operationplan as child_opplans
+                where child_opplans.owner_id = operationplan.reference
+                and child_opplans.status in ('approved', 'confirmed', 'completed')
+                )
+              )
+              """
+            parent_filter = " where status in ('confirmed', 'approved', 'completed') "
+        else:
+            confirmed_filter = " and operationplan.status <> 'closed'"
+            parent_filter = " where status <> 'closed' "
+        attrs = ["operationplan.%s" % f[0] for f in getAttributes(OperationPlan)]
+        if attrs:
+            attrsql = ", %s" % ", ".join(attrs)
+        else:
+            attrsql = ""
+
+        queries = []
+        # Query 1: top level operationplans
+        if with_fcst:
+            queries.append(
+                (
+                    """
+                    SELECT
+                    operationplan.operation_id, operationplan.reference, operationplan.quantity,
+                    case when operationplan.plan ? 'setupend'
+                       then (operationplan.plan->>'setupend')::timestamp
+                       else operationplan.startdate
+                       end, operationplan.enddate, operationplan.status, operationplan.source,
+                    operationplan.type, operationplan.origin_id, operationplan.destination_id, operationplan.supplier_id,
+                    operationplan.item_id, operationplan.location_id, operationplan.batch, operationplan.quantity_completed,
+                    array(
+                        select resource_id
+                        from operationplanresource
+                        where operationplan_id = operationplan.reference
+                        order by resource_id
+                    ),
+                    case when operationplan.plan ? 'setupoverride'
+                      then (operationplan.plan->>'setupoverride')::integer
+                    end,
+                    coalesce(dmd.name, null),
+                    coalesce(forecast.name, null), operationplan.due
+                    %s
+                    FROM operationplan
+                    LEFT OUTER JOIN (select name from demand
+                    where demand.status is null or demand.status in ('open', 'quote')
+                    ) dmd
+                    on dmd.name = operationplan.demand_id
+                    LEFT OUTER JOIN (select name from forecast) forecast
+                    on forecast.name = operationplan.forecast
+                    WHERE operationplan.owner_id IS NULL
+                    and operationplan.quantity >= 0 and operationplan.status <> 'closed'
+                    %s%s and operationplan.type in ('PO', 'MO', 'DO', 'DLVR')
+                    and (operationplan.startdate is null or operationplan.startdate < '2030-12-31')
+                    and (operationplan.enddate is null or operationplan.enddate < '2030-12-31')
+                    ORDER BY operationplan.reference ASC
+                    """
+                    % (attrsql, filter_and, confirmed_filter),
+                    None,
+                )
+            )
+        else:
+            queries.append(
+                (
+                    """
+                    SELECT
+                    operationplan.operation_id, operationplan.reference, operationplan.quantity,
+                    case when operationplan.plan ? 'setupend'
+                       then (operationplan.plan->>'setupend')::timestamp
+                       else operationplan.startdate
+                       end, operationplan.enddate, operationplan.status, operationplan.source,
+                    operationplan.type, operationplan.origin_id, operationplan.destination_id, operationplan.supplier_id,
+                    operationplan.item_id, operationplan.location_id, operationplan.batch, operationplan.quantity_completed,
+                    array(
+                        select resource_id
+                        from operationplanresource
+                        where operationplan_id = operationplan.reference
+                        order by resource_id
+                    ),
+                    case when operationplan.plan ? 'setupoverride'
+                      then (operationplan.plan->>'setupoverride')::integer
+                    end,
+                    coalesce(dmd.name, null)
+                    %s
+                    FROM operationplan
+                    LEFT OUTER JOIN (select name from demand
+                    where demand.status is null or demand.status in ('open', 'quote')
+                    ) dmd
+                    on dmd.name = operationplan.demand_id
+                    WHERE operationplan.owner_id IS NULL
+                    and operationplan.quantity >= 0 and operationplan.status <> 'closed'
+                    %s%s and operationplan.type in ('PO', 'MO', 'DO', 'DLVR')
+                    and (operationplan.startdate is null or operationplan.startdate < '2030-12-31')
+                    and (operationplan.enddate is null or operationplan.enddate < '2030-12-31')
+                    ORDER BY operationplan.reference ASC
+                    """
+                    % (attrsql, filter_and, confirmed_filter),
+                    None,
+                )
+            )
+        # Query 2: child manufacturing orders
+        if with_fcst:
+            queries.append(
+                (
+                    """
+                    SELECT
+                    operationplan.operation_id, operationplan.reference, operationplan.quantity,
+                    case when operationplan.plan ? 'setupend'
+                       then (operationplan.plan->>'setupend')::timestamp
+                       else operationplan.startdate
+                       end, operationplan.enddate, operationplan.status,
+                    operationplan.owner_id, operationplan.source, operationplan.batch,
+                    array(
+                        select resource_id
+                        from operationplanresource
+                        where operationplan_id = operationplan.reference
+                        order by resource_id
+                    ),
+                    coalesce(dmd.name, null), coalesce(forecast.name, null), operationplan.due %s
+                    FROM operationplan
+                    INNER JOIN (select reference
+                    from operationplan %s
+                    ) opplan_parent
+                    on operationplan.owner_id = opplan_parent.reference
+                    LEFT OUTER JOIN (select name from demand
+                    where demand.status is null or demand.status in ('open', 'quote')
+                    ) dmd
+                    on dmd.name = operationplan.demand_id
+                    LEFT OUTER JOIN (select name from forecast) forecast
+                    on forecast.name = operationplan.forecast
+                    WHERE operationplan.quantity >= 0
+                    and (
+                      operationplan.status <> 'closed'
+                      or exists (
+                        select 1 from operationplan as parent_opplan
+                        where parent_opplan.reference = operationplan.owner_id
+                        and parent_opplan.status <> 'closed'
+                        )
+                    )
+                    %s and operationplan.type = 'MO'
+                    and (operationplan.startdate is null or operationplan.startdate < '2030-12-31')
+                    and (operationplan.enddate is null or operationplan.enddate < '2030-12-31')
+                    ORDER BY operationplan.reference ASC
+                    """
+                    % (attrsql, parent_filter, filter_and),
+                    None,
+                )
+            )
+        else:
+            queries.append(
+                (
+                    """
+                    SELECT
+                    operationplan.operation_id, operationplan.reference, operationplan.quantity,
+                    case when operationplan.plan ? 'setupend'
+                       then (operationplan.plan->>'setupend')::timestamp
+                       else operationplan.startdate
+                       end, operationplan.enddate, operationplan.status,
+                    operationplan.owner_id, operationplan.source, operationplan.batch,
+                    array(
+                        select resource_id
+                        from operationplanresource
+                        where operationplan_id = operationplan.reference
+                        order by resource_id
+                    ),
+                    coalesce(dmd.name, null) %s
+                    FROM operationplan
+                    INNER JOIN (select reference
+                    from operationplan %s
+                    ) opplan_parent
+                    on operationplan.owner_id = opplan_parent.reference
+                    LEFT OUTER JOIN (select name from demand
+                    where demand.status is null or demand.status in ('open', 'quote')
+                    ) dmd
+                    on dmd.name = operationplan.demand_id
+                    WHERE operationplan.quantity >= 0
+                    and (
+                      operationplan.status <> 'closed'
+                      or exists (
+                        select 1 from operationplan as parent_opplan
+                        where parent_opplan.reference = operationplan.owner_id
+                        and parent_opplan.status <> 'closed'
+                        )
+                    )
+                    %s and operationplan.type = 'MO'
+                    and (operationplan.startdate is null or operationplan.startdate < '2030-12-31')
+                    and (operationplan.enddate is null or operationplan.enddate < '2030-12-31')
+                    ORDER BY operationplan.reference ASC
+                    """
+                    % (attrsql, parent_filter, filter_and),
+                    None,
+                )
+            )
+        return queries
+
     @classmethod
     def run(cls, database=DEFAULT_DB_ALIAS, **kwargs):
         import frepple
@@ -2036,390 +2652,194 @@ class loadOperationPlans(LoadTask):
         # don't create extra ones but take that data as input.
         frepple.settings.suppressFlowplanCreation = True
 
-        with transaction.atomic(using=database):
-            with connections[database].chunked_cursor() as cursor:
-                with_fcst = "freppledb.forecast" in settings.INSTALLED_APPS
-                consume_material = (
-                    Parameter.getValue("WIP.consume_material", database, "true").lower()
-                    == "true"
-                )
-                consume_capacity = (
-                    Parameter.getValue("WIP.consume_capacity", database, "true").lower()
-                    == "true"
-                )
-                consume_material_completed = (
-                    Parameter.getValue(
-                        "COMPLETED.consume_material", database, "true"
-                    ).lower()
-                    == "true"
-                )
-                if "supply" in os.environ:
-                    confirmed_filter = """ and (
-                      operationplan.status in ('confirmed', 'approved', 'completed')
-                      or exists (
-                        select 1 from operationplan as child_opplans
-                        where child_opplans.owner_id = operationplan.reference
-                        and child_opplans.status in ('approved', 'confirmed', 'completed')
-                        )
-                      )
-                      """
-                    parent_filter = (
-                        " where status in ('confirmed', 'approved', 'completed') "
-                    )
-                    create_flag = True
-                else:
-                    confirmed_filter = " and operationplan.status <> 'closed'"
-                    parent_filter = " where status <> 'closed' "
-                    create_flag = False
-                cnt_mo = 0
-                cnt_po = 0
-                cnt_do = 0
-                cnt_dlvr = 0
-
-                attrs = [
-                    "operationplan.%s" % f[0] for f in getAttributes(OperationPlan)
-                ]
-                if attrs:
-                    attrsql = ", %s" % ", ".join(attrs)
-                else:
-                    attrsql = ""
+        with_fcst = "freppledb.forecast" in settings.INSTALLED_APPS
+        consume_material = (
+            Parameter.getValue("WIP.consume_material", database, "true").lower()
+            == "true"
+        )
+        consume_capacity = (
+            Parameter.getValue("WIP.consume_capacity", database, "true").lower()
+            == "true"
+        )
+        consume_material_completed = (
+            Parameter.getValue("COMPLETED.consume_material", database, "true").lower()
+            == "true"
+        )
+        create_flag = "supply" in os.environ
+        cnt_mo = 0
+        cnt_po = 0
+        cnt_do = 0
+        cnt_dlvr = 0
 
-                starttime = time()
-                if with_fcst:
-                    cursor.execute(
-                        """
-                        SELECT
-                        operationplan.operation_id, operationplan.reference, operationplan.quantity,
-                        case when operationplan.plan ? 'setupend'
-                           then (operationplan.plan->>'setupend')::timestamp
-                           else operationplan.startdate
-                           end, operationplan.enddate, operationplan.status, operationplan.source,
-                        operationplan.type, operationplan.origin_id, operationplan.destination_id, operationplan.supplier_id,
-                        operationplan.item_id, operationplan.location_id, operationplan.batch, operationplan.quantity_completed,
-                        array(
-                            select resource_id
-                            from operationplanresource
-                            where operationplan_id = operationplan.reference
-                            order by resource_id
-                        ),
-                        case when operationplan.plan ? 'setupoverride'
-                          then (operationplan.plan->>'setupoverride')::integer
-                        end,
-                        coalesce(dmd.name, null),
-                        coalesce(forecast.name, null), operationplan.due
-                        %s
-                        FROM operationplan
-                        LEFT OUTER JOIN (select name from demand
-                        where demand.status is null or demand.status in ('open', 'quote')
-                        ) dmd
-                        on dmd.name = operationplan.demand_id
-                        LEFT OUTER JOIN (select name from forecast) forecast
-                        on forecast.name = operationplan.forecast
-                        WHERE operationplan.owner_id IS NULL
-                        and operationplan.quantity >= 0 and operationplan.status <> 'closed'
-                        %s%s and operationplan.type in ('PO', 'MO', 'DO', 'DLVR')
-                        and (operationplan.startdate is null or operationplan.startdate < '2030-12-31')
-                        and (operationplan.enddate is null or operationplan.enddate < '2030-12-31')
-                        ORDER BY operationplan.reference ASC
-                        """
-                        % (attrsql, filter_and, confirmed_filter)
+        queries = cls.getQueries(database=database, **kwargs)
+
+        starttime = time()
+        for i in cls.fetch(database, *queries[0]):
+            try:
+                if i[17]:
+                    dmd = frepple.demand(name=i[17])
+                elif with_fcst and i[18] and i[19]:
+                    dmd = frepple.demand_forecastbucket(
+                        forecast=frepple.demand_forecast(name=i[18]),
+                        start=i[19],
                     )
                 else:
-                    cursor.execute(
-                        """
-                        SELECT
-                        operationplan.operation_id, operationplan.reference, operationplan.quantity,
-                        case when operationplan.plan ? 'setupend'
-                           then (operationplan.plan->>'setupend')::timestamp
-                           else operationplan.startdate
-                           end, operationplan.enddate, operationplan.status, operationplan.source,
-                        operationplan.type, operationplan.origin_id, operationplan.destination_id, operationplan.supplier_id,
-                        operationplan.item_id, operationplan.location_id, operationplan.batch, operationplan.quantity_completed,
-                        array(
-                            select resource_id
-                            from operationplanresource
-                            where operationplan_id = operationplan.reference
-                            order by resource_id
-                        ),
-                        case when operationplan.plan ? 'setupoverride'
-                          then (operationplan.plan->>'setupoverride')::integer
-                        end,
-                        coalesce(dmd.name, null)
-                        %s
-                        FROM operationplan
-                        LEFT OUTER JOIN (select name from demand
-                        where demand.status is null or demand.status in ('open', 'quote')
-                        ) dmd
-                        on dmd.name = operationplan.demand_id
-                        WHERE operationplan.owner_id IS NULL
-                        and operationplan.quantity >= 0 and operationplan.status <> 'closed'
-                        %s%s and operationplan.type in ('PO', 'MO', 'DO', 'DLVR')
-                        and (operationplan.startdate is null or operationplan.startdate < '2030-12-31')
-                        and (operationplan.enddate is null or operationplan.enddate < '2030-12-31')
-                        ORDER BY operationplan.reference ASC
-                        """
-                        % (attrsql, filter_and, confirmed_filter)
+                    dmd = None
+                if i[7] == "MO":
+                    cnt_mo += 1
+                    opplan = frepple.operationplan(
+                        operation=frepple.operation(name=i[0]),
+                        reference=i[1],
+                        quantity=i[2],
+                        source=i[6],
+                        start=i[3],
+                        end=i[4],
+                        statusNoPropagation=i[5],
+                        create=create_flag,
+                        batch=i[13],
+                        quantity_completed=i[14],
+                        resources=i[15],
                     )
-                for i in cursor:
-                    try:
-                        if i[17]:
-                            dmd = frepple.demand(name=i[17])
-                        elif with_fcst and i[18] and i[19]:
-                            dmd = frepple.demand_forecastbucket(
-                                forecast=frepple.demand_forecast(name=i[18]),
-                                start=i[19],
-                            )
-                        else:
-                            dmd = None
-                        if i[7] == "MO":
-                            cnt_mo += 1
-                            opplan = frepple.operationplan(
-                                operation=frepple.operation(name=i[0]),
-                                reference=i[1],
-                                quantity=i[2],
-                                source=i[6],
-                                start=i[3],
-                                end=i[4],
-                                statusNoPropagation=i[5],
-                                create=create_flag,
-                                batch=i[13],
-                                quantity_completed=i[14],
-                                resources=i[15],
-                            )
-                            if opplan:
-                                if i[5] == "confirmed":
-                                    if not consume_material:
-                                        opplan.consume_material = False
-                                    if not consume_capacity:
-                                        opplan.consume_capacity = False
-                                elif i[5] == "completed":
-                                    if not consume_material_completed:
-                                        opplan.consume_material = False
-                                if i[16] is not None:
-                                    opplan.setupoverride = i[16]
-                        elif i[7] == "PO":
-                            cnt_po += 1
-                            opplan = frepple.operationplan(
-                                location=frepple.location(name=i[12]),
-                                ordertype=i[7],
-                                reference=i[1],
-                                item=frepple.item(name=i[11]) if i[11] else None,
-                                supplier=(
-                                    frepple.supplier(name=i[10]) if i[10] else None
-                                ),
-                                quantity=i[2],
-                                start=i[3],
-                                end=i[4],
-                                statusNoPropagation=i[5],
-                                source=i[6],
-                                create=create_flag,
-                                batch=i[13],
-                            )
-                            if opplan and i[5] == "confirmed":
-                                if not consume_capacity:
-                                    opplan.consume_capacity = False
-                        elif i[7] == "DO":
-                            cnt_do += 1
-                            opplan = frepple.operationplan(
-                                location=frepple.location(name=i[9]) if i[9] else None,
-                                reference=i[1],
-                                ordertype=i[7],
-                                item=frepple.item(name=i[11]) if i[11] else None,
-                                origin=frepple.location(name=i[8]) if i[8] else None,
-                                quantity=i[2],
-                                start=i[3],
-                                end=i[4],
-                                statusNoPropagation=i[5],
-                                source=i[6],
-                                create=create_flag,
-                                batch=i[13],
-                            )
-                            if opplan:
-                                if i[5] == "confirmed":
-                                    if not consume_capacity:
-                                        opplan.consume_capacity = False
-                                elif i[5] == "completed":
-                                    if not consume_material_completed:
-                                        opplan.consume_material = False
-                        elif i[7] == "DLVR":
-                            cnt_dlvr += 1
-                            opplan = frepple.operationplan(
-                                location=(
-                                    frepple.location(name=i[12]) if i[12] else None
-                                ),
-                                reference=i[1],
-                                ordertype=i[7],
-                                item=frepple.item(name=i[11]) if i[11] else None,
-                                origin=frepple.location(name=i[8]) if i[8] else None,
-                                demand=dmd,
-                                quantity=i[2],
-                                start=i[3],
-                                end=i[4],
-                                statusNoPropagation=i[5],
-                                source=i[6],
-                                create=create_flag,
-                                batch=i[13],
-                            )
-                            if opplan:
-                                if i[5] == "confirmed":
-                                    if not consume_capacity:
-                                        opplan.consume_capacity = False
-                                elif i[5] == "completed":
-                                    if not consume_material_completed:
-                                        opplan.consume_material = False
-                            opplan = None
-                        else:
-                            logger.warning(
-                                "Warning: unhandled operationplan type '%s'" % i[7]
-                            )
-                            continue
-
-                        if opplan:
-                            idx = 20 if with_fcst else 18
-                            for a in getAttributes(OperationPlan):
-                                setattr(opplan, a[0], i[idx])
-                                idx += 1
-
-                        if dmd and opplan:
-                            opplan.demand = dmd
-                    except Exception as e:
-                        logger.error("**** %s ****" % e)
-        with transaction.atomic(using=database):
-            with connections[database].chunked_cursor() as cursor:
-                if with_fcst:
-                    cursor.execute(
-                        """
-                        SELECT
-                        operationplan.operation_id, operationplan.reference, operationplan.quantity,
-                        case when operationplan.plan ? 'setupend'
-                           then (operationplan.plan->>'setupend')::timestamp
-                           else operationplan.startdate
-                           end, operationplan.enddate, operationplan.status,
-                        operationplan.owner_id, operationplan.source, operationplan.batch,
-                        array(
-                            select resource_id
-                            from operationplanresource
-                            where operationplan_id = operationplan.reference
-                            order by resource_id
-                        ),
-                        coalesce(dmd.name, null), coalesce(forecast.name, null), operationplan.due %s
-                        FROM operationplan
-                        INNER JOIN (select reference
-                        from operationplan %s
-                        ) opplan_parent
-                        on operationplan.owner_id = opplan_parent.reference
-                        LEFT OUTER JOIN (select name from demand
-                        where demand.status is null or demand.status in ('open', 'quote')
-                        ) dmd
-                        on dmd.name = operationplan.demand_id
-                        LEFT OUTER JOIN (select name from forecast) forecast
-                        on forecast.name = operationplan.forecast
-                        WHERE operationplan.quantity >= 0
-                        and (
-                          operationplan.status <> 'closed'
-                          or exists (
-                            select 1 from operationplan as parent_opplan
-                            where parent_opplan.reference = operationplan.owner_id
-                            and parent_opplan.status <> 'closed'
-                            )
-                        )
-                        %s and operationplan.type = 'MO'
-                        and (operationplan.startdate is null or operationplan.startdate < '2030-12-31')
-                        and (operationplan.enddate is null or operationplan.enddate < '2030-12-31')
-                        ORDER BY operationplan.reference ASC
-                        """
-                        % (attrsql, parent_filter, filter_and)
+                    if opplan:
+                        if i[5] == "confirmed":
+                            if not consume_material:
+                                opplan.consume_material = False
+                            if not consume_capacity:
+                                opplan.consume_capacity = False
+                        elif i[5] == "completed":
+                            if not consume_material_completed:
+                                opplan.consume_material = False
+                        if i[16] is not None:
+                            opplan.setupoverride = i[16]
+                elif i[7] == "PO":
+                    cnt_po += 1
+                    opplan = frepple.operationplan(
+                        location=frepple.location(name=i[12]),
+                        ordertype=i[7],
+                        reference=i[1],
+                        item=frepple.item(name=i[11]) if i[11] else None,
+                        supplier=(frepple.supplier(name=i[10]) if i[10] else None),
+                        quantity=i[2],
+                        start=i[3],
+                        end=i[4],
+                        statusNoPropagation=i[5],
+                        source=i[6],
+                        create=create_flag,
+                        batch=i[13],
+                    )
+                    if opplan and i[5] == "confirmed":
+                        if not consume_capacity:
+                            opplan.consume_capacity = False
+                elif i[7] == "DO":
+                    cnt_do += 1
+                    opplan = frepple.operationplan(
+                        location=frepple.location(name=i[9]) if i[9] else None,
+                        reference=i[1],
+                        ordertype=i[7],
+                        item=frepple.item(name=i[11]) if i[11] else None,
+                        origin=frepple.location(name=i[8]) if i[8] else None,
+                        quantity=i[2],
+                        start=i[3],
+                        end=i[4],
+                        statusNoPropagation=i[5],
+                        source=i[6],
+                        create=create_flag,
+                        batch=i[13],
+                    )
+                    if opplan:
+                        if i[5] == "confirmed":
+                            if not consume_capacity:
+                                opplan.consume_capacity = False
+                        elif i[5] == "completed":
+                            if not consume_material_completed:
+                                opplan.consume_material = False
+                elif i[7] == "DLVR":
+                    cnt_dlvr += 1
+                    opplan = frepple.operationplan(
+                        location=(frepple.location(name=i[12]) if i[12] else None),
+                        reference=i[1],
+                        ordertype=i[7],
+                        item=frepple.item(name=i[11]) if i[11] else None,
+                        origin=frepple.location(name=i[8]) if i[8] else None,
+                        demand=dmd,
+                        quantity=i[2],
+                        start=i[3],
+                        end=i[4],
+                        statusNoPropagation=i[5],
+                        source=i[6],
+                        create=create_flag,
+                        batch=i[13],
                     )
+                    if opplan:
+                        if i[5] == "confirmed":
+                            if not consume_capacity:
+                                opplan.consume_capacity = False
+                        elif i[5] == "completed":
+                            if not consume_material_completed:
+                                opplan.consume_material = False
+                    opplan = None
                 else:
-                    cursor.execute(
-                        """
-                        SELECT
-                        operationplan.operation_id, operationplan.reference, operationplan.quantity,
-                        case when operationplan.plan ? 'setupend'
-                           then (operationplan.plan->>'setupend')::timestamp
-                           else operationplan.startdate
-                           end, operationplan.enddate, operationplan.status,
-                        operationplan.owner_id, operationplan.source, operationplan.batch,
-                        array(
-                            select resource_id
-                            from operationplanresource
-                            where operationplan_id = operationplan.reference
-                            order by resource_id
-                        ),
-                        coalesce(dmd.name, null) %s
-                        FROM operationplan
-                        INNER JOIN (select reference
-                        from operationplan %s
-                        ) opplan_parent
-                        on operationplan.owner_id = opplan_parent.reference
-                        LEFT OUTER JOIN (select name from demand
-                        where demand.status is null or demand.status in ('open', 'quote')
-                        ) dmd
-                        on dmd.name = operationplan.demand_id
-                        WHERE operationplan.quantity >= 0
-                        and (
-                          operationplan.status <> 'closed'
-                          or exists (
-                            select 1 from operationplan as parent_opplan
-                            where parent_opplan.reference = operationplan.owner_id
-                            and parent_opplan.status <> 'closed'
+                    logger.warning("Warning: unhandled operationplan type '%s'" % i[7])
+                    continue
+
+                if opplan:
+                    idx = 20 if with_fcst else 18
+                    for a in getAttributes(OperationPlan):
+                        setattr(opplan, a[0], i[idx])
+                        idx += 1
+
+                if dmd and opplan:
+                    opplan.demand = dmd
+            except Exception as e:
+                logger.error("**** %s ****" % e)
+        for i in cls.fetch(database, *queries[1]):
+            try:
+                cnt_mo += 1
+                opplan = frepple.operationplan(
+                    operation=frepple.operation(name=i[0]),
+                    reference=i[1],
+                    quantity=i[2],
+                    source=i[7],
+                    start=i[3],
+                    end=i[4],
+                    statusNoPropagation=i[5],
+                    batch=i[8],
+                    resources=i[9],
+                )
+                if opplan:
+                    if i[5] == "confirmed":
+                        if not consume_material:
+                            opplan.consume_material = False
+                        if not consume_capacity:
+                            opplan.consume_capacity = False
+                    elif i[5] == "completed":
+                        if not consume_material_completed:
+                            opplan.consume_material = False
+                    if i[6]:
+                        try:
+                            opplan.owner = frepple.operationplan(reference=i[6])
+                        except Exception:
+                            logger.error(
+                                "Reference %s: Can't set owner field to %s"
+                                % (i[1], i[6])
                             )
+                    if i[10]:
+                        opplan.demand = frepple.demand(name=i[10])
+                    elif with_fcst and i[11] and i[12]:
+                        opplan.demand = frepple.forecastbucket(
+                            forecast=frepple.demand_forecast(name=i[11]),
+                            start=i[12],
                         )
-                        %s and operationplan.type = 'MO'
-                        and (operationplan.startdate is null or operationplan.startdate < '2030-12-31')
-                        and (operationplan.enddate is null or operationplan.enddate < '2030-12-31')
-                        ORDER BY operationplan.reference ASC
-                        """
-                        % (attrsql, parent_filter, filter_and)
-                    )
-                for i in cursor:
-                    try:
-                        cnt_mo += 1
-                        opplan = frepple.operationplan(
-                            operation=frepple.operation(name=i[0]),
-                            reference=i[1],
-                            quantity=i[2],
-                            source=i[7],
-                            start=i[3],
-                            end=i[4],
-                            statusNoPropagation=i[5],
-                            batch=i[8],
-                            resources=i[9],
-                        )
-                        if opplan:
-                            if i[5] == "confirmed":
-                                if not consume_material:
-                                    opplan.consume_material = False
-                                if not consume_capacity:
-                                    opplan.consume_capacity = False
-                            elif i[5] == "completed":
-                                if not consume_material_completed:
-                                    opplan.consume_material = False
-                            if i[6]:
-                                try:
-                                    opplan.owner = frepple.operationplan(reference=i[6])
-                                except Exception:
-                                    logger.error(
-                                        "Reference %s: Can't set owner field to %s"
-                                        % (i[1], i[6])
-                                    )
-                            if i[10]:
-                                opplan.demand = frepple.demand(name=i[10])
-                            elif with_fcst and i[11] and i[12]:
-                                opplan.demand = frepple.forecastbucket(
-                                    forecast=frepple.demand_forecast(name=i[11]),
-                                    start=i[12],
-                                )
-                            idx = 13 if with_fcst else 11
-                            for a in getAttributes(OperationPlan):
-                                setattr(opplan, a[0], i[idx])
-                                idx += 1
-                    except Exception as e:
-                        logger.error("**** %s ****" % e)
-                logger.info(
-                    "Loaded %d manufacturing orders, %d purchase orders, %d distribution orders and %s deliveries in %.2f seconds"
-                    % (cnt_mo, cnt_po, cnt_do, cnt_dlvr, time() - starttime)
-                )
+                    idx = 13 if with_fcst else 11
+                    for a in getAttributes(OperationPlan):
+                        setattr(opplan, a[0], i[idx])
+                        idx += 1
+            except Exception as e:
+                logger.error("**** %s ****" % e)
+        logger.info(
+            "Loaded %d manufacturing orders, %d purchase orders, %d distribution orders and %s deliveries in %.2f seconds"
+            % (cnt_mo, cnt_po, cnt_do, cnt_dlvr, time() - starttime)
+        )
 
         with connections[database].cursor() as cursor:
             # Assure the operationplan ids will be unique.
@@ -2480,55 +2900,60 @@ class loadOperationPlanMaterials(LoadTask):
     def getWeight(cls, **kwargs):
         return -1 if kwargs.get("skipLoad", False) else 1
 
+    @classmethod
+    def getQueries(cls, database=DEFAULT_DB_ALIAS, **kwargs):
+        return [
+            (
+                """
+                select
+                operationplan_id, opplanmat.item_id,
+                coalesce(opplanmat.status, 'confirmed'), opplanmat.quantity,
+                opplanmat.flowdate
+                from (select * from operationplanmaterial %s) as opplanmat
+                inner join operationplan
+                on operationplan.reference = opplanmat.operationplan_id
+                where operationplan.type = 'MO'
+                %s
+                order by operationplan_id
+                """
+                % (
+                    "where %s" % cls.filter if cls.filter else "",
+                    (
+                        "and operationplan.status in ('approved', 'confirmed', 'completed')"
+                        if "supply" in os.environ
+                        else ""
+                    ),
+                ),
+                None,
+            )
+        ]
+
     @classmethod
     def run(cls, database=DEFAULT_DB_ALIAS, **kwargs):
         import frepple
 
-        with transaction.atomic(using=database):
-            with connections[database].chunked_cursor() as cursor:
-                cnt = 0
-                starttime = time()
-                cursor.execute(
-                    """
-                    select
-                    operationplan_id, opplanmat.item_id,
-                    coalesce(opplanmat.status, 'confirmed'), opplanmat.quantity,
-                    opplanmat.flowdate
-                    from (select * from operationplanmaterial %s) as opplanmat
-                    inner join operationplan
-                    on operationplan.reference = opplanmat.operationplan_id
-                    where operationplan.type = 'MO'
-                    %s
-                    order by operationplan_id
-                    """
-                    % (
-                        "where %s" % cls.filter if cls.filter else "",
-                        (
-                            "and operationplan.status in ('approved', 'confirmed', 'completed')"
-                            if "supply" in os.environ
-                            else ""
-                        ),
-                    )
-                )
-                for i in cursor:
-                    cnt += 1
-                    try:
-                        frepple.flowplan(
-                            operationplan=frepple.operationplan(id=i[0]),
-                            item=frepple.item(name=i[1]),
-                            status=i[2],
-                            quantity=i[3],
-                        )
-                    except Exception as e:
-                        logger.error("**** %s ****" % e)
-                logger.info(
-                    "Loaded %d operationplanmaterials in %.2f seconds"
-                    % (cnt, time() - starttime)
+        cnt = 0
+        starttime = time()
+        sql, args = cls.getQueries(database=database, **kwargs)[0]
+        for i in cls.fetch(database, sql, args):
+            cnt += 1
+            try:
+                frepple.flowplan(
+                    operationplan=frepple.operationplan(id=i[0]),
+                    item=frepple.item(name=i[1]),
+                    status=i[2],
+                    quantity=i[3],
                 )
+            except Exception as e:
+                logger.error("**** %s ****" % e)
+        logger.info(
+            "Loaded %d operationplanmaterials in %.2f seconds"
+            % (cnt, time() - starttime)
+        )
 
-                # All predefined inventory detail records are now loaded.
-                # We now create any missing ones.
-                frepple.settings.suppressFlowplanCreation = False
+        # All predefined inventory detail records are now loaded.
+        # We now create any missing ones.
+        frepple.settings.suppressFlowplanCreation = False
 
 
 @PlanTaskRegistry.register
@@ -2549,4 +2974,96 @@ class PlanSize(CheckTask):
         """
         import frepple
 
+        # Release any prefetched data that wasn't consumed
+        LoadPrefetcher.stop()
+
         frepple.printsize()
+
+
+def BenchmarkReaders(database=DEFAULT_DB_ALIAS, tasks=None, repeat=1):
+    """
+    Code used for comparing the wall time and peak memory of the chunked
+    cursor reader and the COPY reader on the queries of loading tasks.
+
+    Only the retrieval of the rows is measured, without creating objects
+    in the planning engine. Each reader runs in a separate child process,
+    which allows measuring its peak memory (in MB, Linux only).
+
+    The decoded values of both readers are also compared. Each row is hashed
+    after converting decimals to float, and the sum of the hashes must be
+    identical for both readers.
+
+    To test, run the following command:
+       frepplectl shell -c "from freppledb.input.commands.load import BenchmarkReaders; BenchmarkReaders()"
+    """
+    import hashlib
+    import multiprocessing
+    from decimal import Decimal
+
+    def rowhash(row):
+        return int.from_bytes(
+            hashlib.md5(
+                repr(
+                    tuple(float(f) if isinstance(f, Decimal) else f for f in row)
+                ).encode("utf-8")
+            ).digest(),
+            "big",
+        )
+
+    def measure(copyreader, task, result):
+        try:
+            import resource
+        except ImportError:
+            resource = None
+        settings.LOAD_COPY_READER = copyreader
+        starttime = time()
+        cnt = 0
+        checksum = 0
+        for sql, args in task.getQueries(database=database):
+            for i in task.fetch(database, sql, args):
+                cnt += 1
+                # The sum of the hashes doesn't depend on the order of the rows
+                checksum = (checksum + rowhash(i)) % (1 << 128)
+        duration = time() - starttime
+        result.put(
+            (
+                cnt,
+                checksum,
+                duration,
+                (
+                    resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+                    if resource
+                    else 0
+                ),
+            )
+        )
+        connections.close_all()
+
+    ctx = multiprocessing.get_context("fork")
+    connections.close_all()
+    print(
+        "%-30s %-10s %10s %10s %10s %10s"
+        % ("task", "reader", "rows", "seconds", "peak MB", "values")
+    )
+    for task in tasks or (loadOperationMaterials, loadOperationPlans):
+        reference = None
+        for copyreader in (False, True):
+            for _ in range(repeat):
+                result = ctx.Queue()
+                proc = ctx.Process(target=measure, args=(copyreader, task, result))
+                proc.start()
+                cnt, checksum, duration, peak = result.get()
+                proc.join()
+                if reference is None:
+                    reference = checksum
+                print(
+                    "%-30s %-10s %10d %10.2f %10.1f %10s"
+                    % (
+                        task.__name__,
+                        "copy" if copyreader else "cursor",
+                        cnt,
+                        duration,
+                        peak,
+                        "ok" if checksum == reference else "DIFFERENT",
+                    )
+                )
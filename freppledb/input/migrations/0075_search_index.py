@@ -0,0 +1,84 @@
+#
+# Copyright (C) 2024 by frePPLe bv
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+from django.db import migrations, transaction
+
+# Columns searched by the global search box
+search_columns = [
+    ("calendar", "name"),
+    ("calendar", "description"),
+    ("location", "name"),
+    ("location", "description"),
+    ("customer", "name"),
+    ("customer", "description"),
+    ("supplier", "name"),
+    ("supplier", "description"),
+    ("item", "name"),
+    ("item", "description"),
+    ("operation", "name"),
+    ("operation", "description"),
+    ("setupmatrix", "name"),
+    ("skill", "name"),
+    ("resource", "name"),
+    ("resource", "description"),
+    ("demand", "name"),
+    ("demand", "description"),
+    ("operationplan", "reference"),
+]
+
+
+def create_indexes(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        try:
+            with transaction.atomic(using=schema_editor.connection.alias):
+                cursor.execute("create extension if not exists pg_trgm")
+        except Exception:
+            # The extension requires sufficient privileges on the database.
+            # The search then still works, but without these indexes.
+            print(
+                "\nWarning: Extension pg_trgm couldn't be created. Searches will be slower."
+            )
+            return
+        # The expression matches the SQL django generates for icontains lookups
+        for table, column in search_columns:
+            cursor.execute(
+                """
+                create index if not exists %s_%s_trgm
+                on %s using gin (upper(%s::text) gin_trgm_ops)
+                """
+                % (table, column, table, column)
+            )
+
+
+def drop_indexes(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        for table, column in search_columns:
+            cursor.execute("drop index if exists %s_%s_trgm" % (table, column))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("input", "0074_buffer_maximum"),
+    ]
+
+    operations = [migrations.RunPython(create_indexes, drop_indexes)]
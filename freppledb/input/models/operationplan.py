@@ -1076,8 +1076,7 @@ class ManufacturingOrder(OperationPlan):
                                 obj.save(using=database)
                                 # Add the new object in the cache of available keys
                                 for x in selfReferencing:
-                                    if x.cache is not None and obj.pk not in x.cache:
-                                        x.cache[obj.pk] = obj
+                                    x.add(obj)
                             if user:
                                 if it:
                                     Comment(
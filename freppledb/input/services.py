@@ -145,7 +145,7 @@ class OperationplanService(AsyncHttpConsumer):
             related_buffers = set()
             related_demands = set()
 
-            async with lock:
+            async with lock.write("operationplan"):
                 # Update the plan in memory
                 for rec in data:
                     try:
@@ -23,12 +23,14 @@
 
 from datetime import date
 from itertools import chain
+import logging
 import os
 import random
 from rest_framework.test import APIClient, APITestCase, APIRequestFactory
 import tempfile
 from time import sleep
 from unittest import skipUnless
+from unittest.mock import patch
 
 from django.conf import settings
 from django.contrib.auth.models import Permission
@@ -127,6 +129,29 @@ class DataLoadTest(TestCase):
         response = self.client.get("/data/input/calendardetail/Working%20Days/")
         checkResponse(self, response)
 
+    def test_search(self):
+        response = self.client.get("/search/?term=demand")
+        data = response.json()
+        self.assertIn({"value": None, "label": "Sales order - 14 matches"}, data)
+        self.assertEqual(
+            len([i for i in data if i.get("url") == "/detail/input/demand/"]), 10
+        )
+        with patch("freppledb.input.views.utils.SEARCH_MAX_COUNT", 10):
+            response = self.client.get("/search/?term=demand")
+            self.assertIn(
+                {"value": None, "label": "Sales order - 10+ matches"}, response.json()
+            )
+        response = self.client.get("/search/?term=fabr")
+        self.assertIn(
+            {
+                "url": "/detail/input/item/",
+                "removeTrailingSlash": False,
+                "value": "fabric",
+                "display": "fabric",
+            },
+            response.json(),
+        )
+
     def test_csv_upload(self):
         self.assertEqual(
             [(i.name, i.category or "") for i in Location.objects.all()],
@@ -157,6 +182,43 @@ class DataLoadTest(TestCase):
             ],  # Test result is different in Enterprise Edition
         )
 
+    def test_csv_upload_batch(self):
+        # A block with a duplicate key, an update and a validation error
+        user = User.objects.get(username="admin")
+        errors = [
+            e
+            for e in parseCSVdata(
+                Item,
+                [
+                    ["name", "category", "cost"],
+                    ["item A", "cat1", "1"],
+                    ["item B", "cat2", "not a number"],
+                    ["item A", "cat3", "2"],
+                    ["item C", "cat4", "3"],
+                ],
+                user=user,
+            )
+            if e[0] == logging.ERROR
+        ]
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0][1], 3)
+        self.assertEqual(errors[0][2], "cost")
+        self.assertEqual(
+            [
+                (i.name, i.category, i.cost)
+                for i in Item.objects.filter(
+                    name__in=("item A", "item B", "item C")
+                ).order_by("name")
+            ],
+            [("item A", "cat3", 2), ("item C", "cat4", 3)],
+        )
+        self.assertEqual(
+            Comment.objects.filter(
+                object_pk__in=("item A", "item C"), user=user
+            ).count(),
+            3,
+        )
+
     def test_forms(self):
         item = Item.objects.all()[0].name
         loc1 = Location.objects.all()[0].name
@@ -28,7 +28,7 @@ from django.conf import settings
 from django.contrib.admin.views.decorators import staff_member_required
 from django.core.exceptions import FieldDoesNotExist
 from django.db import connections
-from django.db.models import Q, F
+from django.db.models import Exists, F, OuterRef, Q, Value
 from django.db.models.expressions import RawSQL
 from django.db.models.fields import CharField
 from django.http import HttpResponse, Http404
@@ -70,114 +70,148 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+# The search counts the matches up to this limit
+SEARCH_MAX_COUNT = 1000
+
+
 @staff_member_required
 def search(request):
     term = request.GET.get("term").strip()
     result = []
 
-    # Loop over all models in the data_site
-    # We are interested in models satisfying these criteria:
-    #  - primary key is of type text
-    #  - user has change permissions
+    # Collect the searches to run as tuples:
+    #   label, queryset, url, removeTrailingSlash
+    # The querysets have the annotations searchkey and searchdescription.
+    # Note: The icontains lookups use the trigram indexes on the searched columns.
+    searches = []
     with_forecast = "freppledb.forecast" in settings.INSTALLED_APPS
     if with_forecast:
         from freppledb.forecast.models import Forecast
 
-        query = (
-            Forecast.objects.using(request.database)
-            .filter(
-                Q(item__name__icontains=term) | Q(item__description__icontains=term)
+        searches.append(
+            (
+                force_str(_("Forecast editor")),
+                Item.objects.using(request.database)
+                .filter(Q(name__icontains=term) | Q(description__icontains=term))
+                .filter(Exists(Forecast.objects.filter(item=OuterRef("pk"))))
+                .annotate(searchkey=F("name"), searchdescription=F("description")),
+                "/forecast/editor/",
+                False,
             )
-            .order_by("item__name")
-            .distinct("item__name")
-            .values_list("item__name", "item__description")
         )
-        count = len(query)
-        if count > 0:
-            result.append(
-                {
-                    "value": None,
-                    "label": (
-                        ngettext(
-                            "%(name)s - %(count)d match",
-                            "%(name)s - %(count)d matches",
-                            count,
-                        )
-                        % {"name": force_str(_("Forecast editor")), "count": count}
-                    ).capitalize(),
-                }
-            )
-            result.extend(
-                [
-                    {
-                        "url": "/forecast/editor/",
-                        "value": i[0],
-                        "display": "%s%s" % (i[0], " %s" % (i[1],) if i[1] else ""),
-                    }
-                    for i in query[:10]
-                ]
-            )
+
+    # Loop over all models in the data_site
+    # We are interested in models satisfying these criteria:
+    #  - primary key is of type text
+    #  - user has change permissions
     for cls, admn in data_site._registry.items():
         if request.user.has_perm(
             "%s.view_%s" % (cls._meta.app_label, cls._meta.object_name.lower())
         ) and isinstance(cls._meta.pk, CharField):
-            descriptionExists = True
             try:
                 cls._meta.get_field("description")
                 query = (
                     cls.objects.using(request.database)
                     .filter(Q(pk__icontains=term) | Q(description__icontains=term))
-                    .order_by("pk")
-                    .values_list("pk", "description")
+                    .annotate(searchdescription=F("description"))
                 )
             except FieldDoesNotExist:
-                descriptionExists = False
                 query = (
                     cls.objects.using(request.database)
                     .filter(pk__icontains=term)
-                    .order_by("pk")
-                    .values_list("pk")
-                )
-            count = len(query)
-            if count > 0:
-                result.append(
-                    {
-                        "value": None,
-                        "label": (
-                            ngettext(
-                                "%(name)s - %(count)d match",
-                                "%(name)s - %(count)d matches",
-                                count,
-                            )
-                            % {
-                                "name": force_str(cls._meta.verbose_name),
-                                "count": count,
-                            }
-                        ).capitalize(),
-                    }
+                    .annotate(searchdescription=Value(None, output_field=CharField()))
                 )
-                result.extend(
-                    [
-                        {
-                            "url": (
-                                "/data/%s/%s/?noautofilter&parentreference="
-                                if issubclass(cls, OperationPlan)
-                                else "/detail/%s/%s/"
-                            )
-                            % (cls._meta.app_label, cls._meta.object_name.lower()),
-                            "removeTrailingSlash": (
-                                True if issubclass(cls, OperationPlan) else False
-                            ),
-                            "value": i[0],
-                            "display": "%s%s"
-                            % (
-                                i[0],
-                                " %s" % (i[1],) if descriptionExists and i[1] else "",
-                            ),
-                        }
-                        for i in query[:10]
-                    ]
+            searches.append(
+                (
+                    force_str(cls._meta.verbose_name),
+                    query.annotate(searchkey=F("pk")),
+                    (
+                        "/data/%s/%s/?noautofilter&parentreference="
+                        if issubclass(cls, OperationPlan)
+                        else "/detail/%s/%s/"
+                    )
+                    % (cls._meta.app_label, cls._meta.object_name.lower()),
+                    True if issubclass(cls, OperationPlan) else False,
                 )
+            )
+
+    # Run all searches in a single SQL statement.
+    # For every search it returns a count, which stops counting after
+    # SEARCH_MAX_COUNT matches, and the first 10 matches.
+    sql = []
+    params = []
+    for idx, (label, query, url, removeTrailingSlash) in enumerate(searches):
+        query = query.values_list("searchkey", "searchdescription")
+        countsql, countparams = (
+            query.order_by()[: SEARCH_MAX_COUNT + 1]
+            .query.get_compiler(using=request.database)
+            .as_sql()
+        )
+        rowsql, rowparams = (
+            query.order_by("pk")[:10]
+            .query.get_compiler(using=request.database)
+            .as_sql()
+        )
+        sql.append(
+            "select %s, null::text, null::text, (select count(*) from (%s) c)"
+            % (idx, countsql)
+        )
+        sql.append(
+            "select %s, r.searchkey::text, r.searchdescription::text, null from (%s) r"
+            % (idx, rowsql)
+        )
+        params += countparams
+        params += rowparams
+    counts = {}
+    matches = {}
+    if sql:
+        with connections[request.database].cursor() as cursor:
+            cursor.execute(" union all ".join(sql), params)
+            for idx, key, description, count in cursor.fetchall():
+                if count is not None:
+                    counts[idx] = count
+                elif idx in matches:
+                    matches[idx].append((key, description))
+                else:
+                    matches[idx] = [(key, description)]
+
+    # Build the result
+    for idx, (label, query, url, removeTrailingSlash) in enumerate(searches):
+        count = counts.get(idx, 0)
+        if not count:
+            continue
+        result.append(
+            {
+                "value": None,
+                "label": (
+                    (
+                        _("%(name)s - %(count)d+ matches")
+                        % {"name": label, "count": SEARCH_MAX_COUNT}
+                    )
+                    if count > SEARCH_MAX_COUNT
+                    else (
+                        ngettext(
+                            "%(name)s - %(count)d match",
+                            "%(name)s - %(count)d matches",
+                            count,
+                        )
+                        % {"name": label, "count": count}
+                    )
+                ).capitalize(),
+            }
+        )
+        result.extend(
+            [
+                {
+                    "url": url,
+                    "removeTrailingSlash": removeTrailingSlash,
+                    "value": i[0],
+                    "display": "%s%s" % (i[0], " %s" % (i[1],) if i[1] else ""),
+                }
+                for i in sorted(matches.get(idx, []))
+            ]
+        )
+
     # Construct reply
     return HttpResponse(
         content_type="application/json; charset=%s" % settings.DEFAULT_CHARSET,
@@ -21,11 +21,15 @@
 # WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 #
 
-import os
+from array import array
 from datetime import timedelta
-
 import logging
+import multiprocessing
+import os
+import signal
+import threading
 
+from django.conf import settings
 from django.db import DEFAULT_DB_ALIAS
 from django.utils.translation import gettext_lazy as _
 
@@ -38,6 +42,66 @@ from freppledb.common.report import getCurrentDate
 logger = logging.getLogger(__name__)
 
 
+class SeriesTimeout(Exception):
+    pass
+
+
+def _raiseTimeout(signum, frame):
+    raise SeriesTimeout("timeout")
+
+
+_test_pd = None
+_seasonality = None
+_timeout = None
+
+
+def _initWorker(test, seasonality, timeout):
+    global _test_pd, _seasonality, _timeout
+    import pandas as pd
+
+    _test_pd = pd.DataFrame({"date": test, "quantity": [None] * len(test)})
+    _seasonality = seasonality
+    _timeout = timeout
+
+
+def _fitSeries(series):
+    """
+    Fits a model on the history of a single forecast, and returns the predictions
+    for the test dates.
+    This function runs in the worker processes, without access to the
+    planning engine.
+    """
+    name, dates, quantities = series
+    use_alarm = (
+        _timeout
+        and hasattr(signal, "SIGALRM")
+        and threading.current_thread() is threading.main_thread()
+    )
+    previous_handler = None
+    try:
+        from orbit.models import DLT
+        import pandas as pd
+
+        if use_alarm:
+            previous_handler = signal.signal(signal.SIGALRM, _raiseTimeout)
+            signal.alarm(_timeout)
+        orbit_model = DLT(
+            response_col="quantity",
+            date_col="date",
+            seasonality=_seasonality,
+        )
+        orbit_model.fit(pd.DataFrame({"date": dates, "quantity": quantities}))
+        predicted_df = orbit_model.predict(df=_test_pd, decompose=True)
+        return (name, predicted_df["prediction"].tolist(), None)
+    except Exception as e:
+        return (name, None, str(e))
+    finally:
+        if use_alarm:
+            signal.alarm(0)
+            if previous_handler is not None:
+                signal.signal(signal.SIGALRM, previous_handler)
+
+
 @PlanTaskRegistry.register
 class ExportForecast(PlanTask):
     description = "Generate machine learning forecast data"
@@ -57,8 +121,7 @@ class ExportForecast(PlanTask):
         import frepple
 
         try:
-            from orbit.models import ETS, DLT, KTR, LGT
-            import pandas as pd
+            from orbit.models import ETS, KTR, LGT
         except Exception:
             raise ImportError(
                 "Please install the orbit-ml python package to use the frepple ML forecasting module"
@@ -69,22 +132,23 @@ class ExportForecast(PlanTask):
         horizon_future = int(
             Parameter.getValue("forecast.Horizon_future", database, 365)
         )
-        test = {
-            "date": [
-                i.start
-                for i in frepple.calendar(name=calendar).buckets
-                if i.end >= currentdate
-                and i.start <= currentdate + timedelta(days=horizon_future)
-            ],
-        }
-        test["quantity"] = [None] * len(test["date"])
-        test_pd = pd.DataFrame(test)
-
+        test = [
+            i.start
+            for i in frepple.calendar(name=calendar).buckets
+            if i.end >= currentdate
+            and i.start <= currentdate + timedelta(days=horizon_future)
+        ]
+        dateindex = {d: idx for idx, d in enumerate(test)}
+        seasonality = 52 if calendar == "week" else 12
         minimal_training_size = 52 if calendar == "week" else 12
 
+        # Extract the training data of all forecasts
+        forecasts = {}
+        series = []
         for i in frepple.demands():
             if isinstance(i, frepple.demand_forecast) and i.methods == "automatic":
-                train = {"date": [], "quantity": []}
+                dates = []
+                quantities = array("d")
                 found = False
 
                 for b in i.buckets:
@@ -93,35 +157,46 @@ class ExportForecast(PlanTask):
                     if b.orderstotal + b.ordersadjustment > 0 or found:
                         if not found:
                             found = True
-                        train["date"].append(b.start)
-                        train["quantity"].append(b.orderstotal + b.ordersadjustment)
+                        dates.append(b.start)
+                        quantities.append(b.orderstotal + b.ordersadjustment)
                     if not found:
                         continue
 
-                if len(train["date"]) < minimal_training_size:
+                if len(dates) < minimal_training_size:
                     # too small to forecast, will be forecasted with statistical methods
                     continue
-
-                try:
-                    orbit_model = DLT(
-                        response_col="quantity",
-                        date_col="date",
-                        seasonality=(52 if calendar == "week" else 12),
-                    )
-
-                    train_pd = pd.DataFrame(train)
-                    orbit_model.fit(train_pd)
-                    predicted_df = orbit_model.predict(df=test_pd, decompose=True)
-                    index = 0
-                    for j in i.members:
-                        if j.start in test["date"]:
-                            j.forecastbaseline = max(
-                                0, predicted_df.iloc[index]["prediction"]
-                            )
-                            index += 1
-                except Exception as e:
-                    # silently move on and use the statistical forecast
-                    print(
-                        "skipping machine learning forecast calculation for %s: %s"
-                        % (i.name, e)
-                    )
+                forecasts[i.name] = i
+                series.append((i.name, dates, quantities))
+
+        # Fit the models in a pool of worker processes
+        workers = min(settings.MLFORECAST_WORKERS, len(series))
+        if workers > 1:
+            pool = multiprocessing.get_context(
+                "fork" if hasattr(os, "fork") else None
+            ).Pool(
+                processes=workers,
+                initializer=_initWorker,
+                initargs=(test, seasonality, settings.MLFORECAST_TIMEOUT),
+            )
+            try:
+                results = list(pool.imap_unordered(_fitSeries, series, chunksize=4))
+            finally:
+                pool.terminate()
+        else:
+            _initWorker(test, seasonality, settings.MLFORECAST_TIMEOUT)
+            results = [_fitSeries(i) for i in series]
+
+        # Store the results in the forecast
+        for name, predictions, error in results:
+            i = forecasts[name]
+            if error is not None:
+                # silently move on and use the statistical forecast
+                print(
+                    "skipping machine learning forecast calculation for %s: %s"
+                    % (name, error)
+                )
+                continue
+            for j in i.members:
+                idx = dateindex.get(j.start)
+                if idx is not None:
+                    j.forecastbaseline = max(0, predictions[idx])
@@ -20,8 +20,9 @@
 # OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
 # WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 #
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import base64
+import codecs
 import gzip
 
 from html.parser import HTMLParser
@@ -30,6 +31,7 @@ import json
 import logging
 from urllib.request import urlopen, HTTPError, Request
 
+from django.apps import apps
 from django.db import DEFAULT_DB_ALIAS, connections
 from django.conf import settings
 from django.contrib.auth.models import Group, Permission
@@ -51,6 +53,43 @@ from freppledb.input.commands import (
 logger = logging.getLogger(__name__)
 
 
+class OdooDataStream:
+    """
+    File-like object passed to the XML parser of the planning engine.
+
+    The data is decompressed on the fly and handed to the parser in chunks.
+    Invalid UTF-8 characters are dropped. The progress is logged every 50MB.
+    """
+
+    progress_interval = 50 * 1024 * 1024
+
+    def __init__(self, stream, compressed=False):
+        self.stream = gzip.GzipFile(fileobj=stream) if compressed else stream
+        self.decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+        self.size = 0
+        self.reported = 0
+        self.pending = b""
+
+    def read(self, size=-1):
+        # An empty result signals the end of the data to the parser
+        result = self.pending
+        while not result:
+            data = self.stream.read(size)
+            self.size += len(data)
+            if self.size - self.reported >= self.progress_interval:
+                self.reported = self.size
+                logger.info("Read %d MB of odoo data" % (self.size // 1024 // 1024))
+            result = self.decoder.decode(data, final=not data).encode("utf-8")
+            if not data:
+                break
+        # Characters split over 2 chunks can make the result a bit longer
+        if size >= 0:
+            self.pending = result[size:]
+            return result[:size]
+        self.pending = b""
+        return result
+
+
 @PlanTaskRegistry.register
 class OdooReadData(PlanTask):
     """
@@ -67,16 +106,73 @@ class OdooReadData(PlanTask):
       can be transferred during automated scheduled runs at a quiet moment.
     Which data elements belong to each category is determined in the Odoo
     addon module and can vary between implementations.
+
+    When the parameter odoo.deltasync is set, the runs after a complete
+    synchronization only ask odoo for the records changed since the previous
+    synchronization. See the class OdooReadDeltaData.
+    This requires an addon that reports the following properties of the plan:
+    - synctime:
+      Time in odoo, in UTC, when the addon started reading the data.
+    - removed:
+      Only in the response to a delta request. A JSON dictionary with the
+      keys of the records deleted or closed since the previous
+      synchronization, for each model of the input app.
+      Eg {"demand": ["SO001 - 1"], "purchaseorder": ["PO001 - 1"]}
     """
 
     description = "Load Odoo data"
     sequence = 70
 
+    # Start of the current synchronization, in UTC
+    syncstart = None
+
+    # Time in odoo when the addon started reading the data, in UTC
+    synctime = None
+
+    # Odoo transactions still running when the addon starts reading can
+    # commit records with an earlier write date
+    syncmargin = timedelta(minutes=5)
+
+    @classmethod
+    def getLastSync(cls, database, mode):
+        """
+        Returns the timestamp of the last successful synchronization when the
+        next run can be limited to the changed records, and None when a complete
+        synchronization is required.
+        The timestamp is only available when the addon reported the odoo time of
+        the synchronization.
+        """
+        try:
+            hours = float(Parameter.getValue("odoo.deltasync", database, "0"))
+            lastsync = json.loads(
+                Parameter.getValue("odoo.lastsync_%s" % mode, database, "{}")
+            )
+            fullsync = datetime.strptime(
+                lastsync["fullsync"], "%Y-%m-%d %H:%M:%S"
+            ).replace(tzinfo=timezone.utc)
+            if datetime.now(timezone.utc) - fullsync < timedelta(hours=hours):
+                return lastsync["sync"]
+        except Exception:
+            pass
+        return None
+
     @classmethod
     def getWeight(cls, database=DEFAULT_DB_ALIAS, **kwargs):
         for i in range(5):
             if ("odoo_read_%s" % i) in os.environ:
                 cls.mode = i
+                since = cls.getLastSync(database, i)
+                if since:
+                    # Delta synchronization: we load the data of the previous
+                    # synchronization from the database, and read the changes
+                    # on top of it after all data is loaded.
+                    PlanTaskRegistry.addArguments(
+                        exportstatic=True,
+                        source="odoo_%s" % i,
+                        incremental=True,
+                        odoo_since=since,
+                    )
+                    return -1
                 if (
                     Parameter.getValue(
                         "odoo.allowSharedOwnership", database=database, default="false"
@@ -123,6 +219,7 @@ class OdooReadData(PlanTask):
         odoo_company = Parameter.getValue("odoo.company", database, None)
         singlecompany = Parameter.getValue("odoo.singlecompany", database, "false")
         odoo_delta = Parameter.getValue("odoo.delta", database, "999")
+        odoo_since = kwargs.get("odoo_since", None)
         ok = True
 
         # Set the environment variable FREPPLE_ODOO_DEBUGFILE if you want frePPLe
@@ -168,6 +265,9 @@ class OdooReadData(PlanTask):
         # but take the odoo data as input.
         frepple.settings.suppressFlowplanCreation = True
 
+        # Records changed in odoo while we are reading are picked up by the next run
+        OdooReadData.syncstart = datetime.now(timezone.utc)
+
         if not debugFile:
             args = {
                 "language": odoo_language,
@@ -184,6 +284,9 @@ class OdooReadData(PlanTask):
             }
             if odoo_db:
                 args["database"] = odoo_db
+            if odoo_since:
+                args["since"] = odoo_since
+                logger.info("Reading odoo data changed since %s UTC" % odoo_since)
             url = "%sfrepple/xml?%s" % (odoo_url, urlencode(args))
             response = None
             try:
@@ -198,22 +301,12 @@ class OdooReadData(PlanTask):
 
                 # Download and parse XML data
                 with urlopen(request) as response:
-                    if response.info().get("Content-Encoding") == "gzip":
-                        frepple.readXMLdata(
-                            gzip.decompress(response.read()).decode(
-                                encoding="utf-8", errors="ignore"
-                            ),
-                            False,
-                            False,
-                            loglevel,
-                        )
-                    else:
-                        frepple.readXMLdata(
-                            response.read().decode(encoding="utf-8", errors="ignore"),
-                            False,
-                            False,
-                            loglevel,
-                        )
+                    stream = OdooDataStream(
+                        response,
+                        compressed=response.info().get("Content-Encoding") == "gzip",
+                    )
+                    frepple.readXMLstream(stream, False, False, loglevel)
+                    logger.info("Read %d bytes of odoo data" % stream.size)
 
             except HTTPError as e:
                 print("Error connecting to odoo at %s" % url)
@@ -239,13 +332,33 @@ class OdooReadData(PlanTask):
 
         else:
             # Parse XML data file
-            with open(debugFile, encoding="utf-8") as f:
-                frepple.readXMLdata(f.read(), False, False, loglevel)
+            with open(debugFile, "rb") as f:
+                frepple.readXMLstream(OdooDataStream(f), False, False, loglevel)
 
         # All predefined inventory detail records are now loaded.
         # We now create any missing ones.
         frepple.settings.suppressFlowplanCreation = False
 
+        # The changes of the next delta synchronization are read from the odoo
+        # time of this one. An addon that doesn't report it can't report the
+        # deleted records either, and the next run is a complete synchronization.
+        if hasattr(frepple.settings, "synctime"):
+            OdooReadData.synctime = (
+                datetime.strptime(frepple.settings.synctime, "%Y-%m-%d %H:%M:%S")
+                - cls.syncmargin
+            )
+        else:
+            OdooReadData.synctime = None
+        if odoo_since:
+            cls.removeRecords(
+                database,
+                (
+                    json.loads(frepple.settings.removed)
+                    if hasattr(frepple.settings, "removed")
+                    else {}
+                ),
+            )
+
         # Freeze the date of the extract (in memory and in database)
         frepple.settings.current = datetime.now()
         with connections[database].cursor() as cursor:
@@ -258,6 +371,7 @@ class OdooReadData(PlanTask):
                 """,
                 (frepple.settings.current.strftime("%Y-%m-%d %H:%M:%S"),),
             )
+        Parameter.clearCache(database)
 
         # Synchronize users
         if hasattr(frepple.settings, "users"):
@@ -357,6 +471,116 @@ class OdooReadData(PlanTask):
                 if r.owner is None and r != rootCustomer:
                     r.owner = rootCustomer
 
+    @classmethod
+    def removeRecords(cls, database, removed):
+        """
+        Removes the records deleted or closed in odoo since the previous
+        synchronization, from the memory and from the database.
+        The argument is a dictionary with a list of keys for each model.
+        """
+        import frepple
+
+        source = "odoo_%s" % cls.mode
+        for model, keys in removed.items():
+            try:
+                m = apps.get_model("input", model)
+            except LookupError:
+                logger.warning("Can't remove odoo records of unknown model %s" % model)
+                continue
+            pk = m._meta.pk.name
+            if pk not in ("name", "reference"):
+                logger.warning("Can't remove odoo records of model %s" % model)
+                continue
+            # Only records owned by this odoo connection are removed
+            keys = list(
+                m.objects.using(database)
+                .filter(**{"%s__in" % pk: keys, "source": source})
+                .values_list(pk, flat=True)
+            )
+            if not keys:
+                continue
+            for k in keys:
+                try:
+                    if pk == "reference":
+                        frepple.operationplan(reference=k, action="R")
+                    else:
+                        getattr(frepple, model)(name=k, action="R")
+                except Exception:
+                    # Not in memory
+                    pass
+            m.objects.using(database).filter(**{"%s__in" % pk: keys}).delete()
+            logger.info(
+                "Removed %d %s records deleted or closed in odoo" % (len(keys), model)
+            )
+
+
+@PlanTaskRegistry.register
+class OdooReadDeltaData(OdooReadData):
+    """
+    Reads the records changed in odoo since the last successful synchronization.
+
+    This task runs after the data of the previous synchronization has been
+    loaded from the database, and applies the changes on top of it.
+    Since the odoo data is only partially read, the clean-up of the records
+    that are no longer present in odoo is skipped. The records that the addon
+    reports as deleted or closed are removed instead. The complete
+    synchronization that is done every odoo.deltasync hours takes care of
+    anything else.
+    """
+
+    description = "Load changed Odoo data"
+    sequence = 119
+
+    @classmethod
+    def getWeight(cls, database=DEFAULT_DB_ALIAS, **kwargs):
+        return 1 if kwargs.get("odoo_since", None) else -1
+
+
+@PlanTaskRegistry.register
+class OdooRecordSync(PlanTask):
+    """
+    Stores the timestamps of a successful synchronization with odoo.
+    The start of the last complete synchronization is in frePPLe time, the
+    start of the last synchronization in odoo time.
+    """
+
+    description = "Record odoo synchronization"
+    sequence = 309
+
+    @classmethod
+    def getWeight(cls, database=DEFAULT_DB_ALIAS, **kwargs):
+        return (
+            0.1
+            if kwargs.get("exportstatic", False)
+            and (kwargs.get("source", None) or "").startswith("odoo_")
+            else -1
+        )
+
+    @classmethod
+    def run(cls, database=DEFAULT_DB_ALIAS, **kwargs):
+        if not OdooReadData.syncstart:
+            return
+        fullsync = OdooReadData.syncstart.strftime("%Y-%m-%d %H:%M:%S")
+        if kwargs.get("odoo_since", None):
+            try:
+                fullsync = json.loads(
+                    Parameter.getValue(
+                        "odoo.lastsync_%s" % OdooReadData.mode, database, "{}"
+                    )
+                )["fullsync"]
+            except Exception:
+                pass
+        lastsync = {"fullsync": fullsync}
+        if OdooReadData.synctime:
+            lastsync["sync"] = OdooReadData.synctime.strftime("%Y-%m-%d %H:%M:%S")
+        Parameter.objects.using(database).update_or_create(
+            name="odoo.lastsync_%s" % OdooReadData.mode,
+            defaults={
+                "value": json.dumps(lastsync),
+                "description": "This parameter is automatically populated. It stores the timestamps of the last odoo synchronization",
+            },
+        )
+
 
 @PlanTaskRegistry.register
 class OdooDeltaChangeSource(PlanTask):
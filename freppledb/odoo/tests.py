@@ -21,23 +21,149 @@
 # WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 #
 
+import gzip
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import io
 import json
 import os
+from threading import Thread
 from unittest import skipUnless
+from urllib.parse import parse_qs, urlparse
 import xmlrpc.client
 
 from django.conf import settings
 from django.core import management
 from django.db.models import F
-from django.test import TransactionTestCase
+from django.test import SimpleTestCase, TransactionTestCase
 from django.contrib.auth.models import Group
 
-from freppledb.common.models import User
+from freppledb.common.models import Parameter, User
 from freppledb.input.models import Item, PurchaseOrder, ManufacturingOrder
+from .commands import OdooDataStream
 from .management.commands.odoo_container import Command as odoo_container_command
 from .utils import getOdooVersion
 
 
+@skipUnless("freppledb.odoo" in settings.INSTALLED_APPS, "App not activated")
+class OdooDataStreamTest(SimpleTestCase):
+    def test_stream(self):
+        data = ("<plan>%s</plan>" % ("\u00e9\u20ac abc " * 10000)).encode("utf-8")
+        # Insert an invalid UTF-8 byte, which is to be skipped
+        compressed = gzip.compress(data[:101] + b"\xff" + data[101:])
+        for size in (1, 3, 1000):
+            stream = OdooDataStream(io.BytesIO(compressed), compressed=True)
+            result = []
+            while True:
+                chunk = stream.read(size)
+                self.assertLessEqual(len(chunk), size)
+                if not chunk:
+                    break
+                result.append(chunk)
+            self.assertEqual(b"".join(result), data)
+            self.assertEqual(stream.size, len(data) + 1)
+
+
+@skipUnless("freppledb.odoo" in settings.INSTALLED_APPS, "App not activated")
+class OdooDeltaSyncTest(TransactionTestCase):
+    """
+    Runs the connector against a local stub server that mimics the odoo addon.
+    """
+
+    full_data = """<?xml version="1.0" encoding="UTF-8" ?>
+        <plan xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">
+        <stringproperty name="synctime" value="2024-01-01 10:00:00"/>
+        <items>
+        <item name="item A" description="full" source="odoo_1"/>
+        <item name="item B" description="full" source="odoo_1"/>
+        <item name="item C" description="full" source="odoo_1"/>
+        </items></plan>"""
+
+    delta_data = """<?xml version="1.0" encoding="UTF-8" ?>
+        <plan xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">
+        <stringproperty name="synctime" value="2024-01-01 11:00:00"/>
+        <stringproperty name="removed" value="{&quot;item&quot;: [&quot;item C&quot;]}"/>
+        <items>
+        <item name="item B" description="delta" source="odoo_1"/>
+        </items></plan>"""
+
+    def setUp(self):
+        os.environ["FREPPLE_TEST"] = "YES"
+        self.requests = []
+        test = self
+
+        class OdooStub(BaseHTTPRequestHandler):
+            def do_GET(self):
+                args = parse_qs(urlparse(self.path).query)
+                test.requests.append(args)
+                data = (test.delta_data if "since" in args else test.full_data).encode(
+                    "utf-8"
+                )
+                self.send_response(200)
+                self.send_header("Content-Type", "application/xml")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("localhost", 0), OdooStub)
+        Thread(target=self.server.serve_forever, daemon=True).start()
+        for name, value in (
+            ("odoo.url", "http://localhost:%s/" % self.server.server_port),
+            ("odoo.user", "admin"),
+            ("odoo.password", "admin"),
+            ("odoo.company", "stub company"),
+            ("odoo.deltasync", "24"),
+        ):
+            Parameter.objects.update_or_create(name=name, defaults={"value": value})
+        super().setUp()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        del os.environ["FREPPLE_TEST"]
+        super().tearDown()
+
+    def test_delta_sync(self):
+        # A first run does a complete synchronization
+        management.call_command("odoo_import")
+        self.assertEqual(len(self.requests), 1)
+        self.assertNotIn("since", self.requests[0])
+        self.assertEqual(Item.objects.get(name="item B").description, "full")
+        lastsync = json.loads(Parameter.getValue("odoo.lastsync_1"))
+        # The odoo time of the synchronization, with a safety margin
+        self.assertEqual(lastsync["sync"], "2024-01-01 09:55:00")
+
+        # The next run only asks for the changes, and applies them on top
+        management.call_command("odoo_import")
+        self.assertEqual(len(self.requests), 2)
+        self.assertEqual(self.requests[1]["since"], [lastsync["sync"]])
+        self.assertEqual(Item.objects.get(name="item A").description, "full")
+        self.assertEqual(Item.objects.get(name="item B").description, "delta")
+        self.assertFalse(Item.objects.filter(name="item C").exists())
+        newsync = json.loads(Parameter.getValue("odoo.lastsync_1"))
+        self.assertEqual(newsync["fullsync"], lastsync["fullsync"])
+        self.assertEqual(newsync["sync"], "2024-01-01 10:55:00")
+
+        # Without the parameter every run is a complete synchronization
+        Parameter.objects.filter(name="odoo.deltasync").update(value="0")
+        management.call_command("odoo_import")
+        self.assertNotIn("since", self.requests[2])
+        self.assertEqual(Item.objects.get(name="item B").description, "full")
+
+    def test_addon_without_synctime(self):
+        # An addon that doesn't report its time can't report deletions either
+        self.full_data = self.full_data.replace(
+            '<stringproperty name="synctime" value="2024-01-01 10:00:00"/>', ""
+        )
+        management.call_command("odoo_import")
+        self.assertNotIn("sync", json.loads(Parameter.getValue("odoo.lastsync_1")))
+        management.call_command("odoo_import")
+        self.assertEqual(len(self.requests), 2)
+        self.assertNotIn("since", self.requests[1])
+
+
 @skipUnless("freppledb.odoo" in settings.INSTALLED_APPS, "App not activated")
 class OdooTest(TransactionTestCase):
     def setUp(self):
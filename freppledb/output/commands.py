@@ -26,6 +26,9 @@ import json
 import logging
 import os
 from psycopg2.extras import execute_batch
+from threading import Thread
+from time import time, thread_time
+from types import SimpleNamespace
 
 from django.conf import settings
 from django.db import connections, DEFAULT_DB_ALIAS, transaction
@@ -34,8 +37,10 @@ from freppledb.common.commands import (
     PlanTaskRegistry,
     PlanTask,
     clean_value,
+    copy_line,
     CopyFromGenerator,
 )
+from freppledb.common.models import User
 from freppledb.input.models import OperationPlan
 from freppledb.boot import getAttributes
 
@@ -55,6 +60,12 @@ class TruncatePlan(PlanTask):
         else:
             return -1
 
+    @staticmethod
+    def getClusterKeys(entities, cluster):
+        for i in entities:
+            if i.cluster in cluster:
+                yield copy_line((i.name[:300],))
+
     @classmethod
     def run(
         cls,
@@ -74,12 +85,14 @@ class TruncatePlan(PlanTask):
             # Complete export for the complete model
             if "fcst" in os.environ:
                 cursor.execute(
-                    "truncate table out_problem, out_resourceplan, out_constraint"
+                    "truncate table out_problem, out_resourceplan, out_resourceplanbucket, out_constraint"
                 )
             else:
                 # TODO not very clean to make this difference here
                 cursor.execute("delete from out_problem where name != 'outlier'")
-                cursor.execute("truncate table out_resourceplan, out_constraint")
+                cursor.execute(
+                    "truncate table out_resourceplan, out_resourceplanbucket, out_constraint"
+                )
             cursor.execute(
                 """
                 update operationplan
@@ -130,6 +143,13 @@ class TruncatePlan(PlanTask):
                     """,
                     (resnames,),
                 )
+                cursor.execute(
+                    """
+                    delete from out_resourceplanbucket
+                    where resource = any(%s)
+                    """,
+                    (resnames,),
+                )
             if buffers:
                 t = [
                     (b.item.name, b.location.name, b.batch) for b in buffers if b.batch
@@ -168,13 +188,13 @@ class TruncatePlan(PlanTask):
             cursor.execute(
                 "create temporary table cluster_keys (name character varying(300), constraint cluster_key_pkey primary key (name))"
             )
-            for i in frepple.items():
-                if i.cluster in cluster:
-                    cursor.execute(
-                        "insert into cluster_keys (name) values (%s)", (i.name,)
-                    )
-
-            cursor.execute("create index on cluster_keys (name)")
+            cursor.copy_from(
+                CopyFromGenerator(cls.getClusterKeys(frepple.items(), cluster)),
+                "cluster_keys",
+                size=settings.COPY_BUFFER_SIZE,
+                sep="\v",
+            )
+            cursor.execute("analyze cluster_keys")
 
             cursor.execute(
                 """
@@ -238,37 +258,53 @@ class TruncatePlan(PlanTask):
                 """
             )
 
-            # TODO next subqueries are not efficient - the exists condition triggers a sequential scan
             if "freppledb.forecast" in settings.INSTALLED_APPS:
+                # The constraints of a forecast are exported with the forecast name
+                # in a separate, indexed field.
+                # The problems of a forecast bucket have an owner "<forecast> - <date>".
+                # Stripping the date allows a hash join with the forecasts of the
+                # cluster, rather than a like-condition evaluated for each pair.
                 cursor.execute(
                     """
-                    delete from out_constraint
-                    where exists (
-                    select 1 from forecast
+                    create temporary table cluster_forecasts (
+                      name character varying(300),
+                      constraint cluster_forecasts_pkey primary key (name)
+                      )
+                    """
+                )
+                cursor.execute(
+                    """
+                    insert into cluster_forecasts (name)
+                    select forecast.name
+                    from forecast
                     inner join cluster_keys
-                        on cluster_keys.name = forecast.item_id
-                        and out_constraint.demand like forecast.name || ' - %'
-                    )
+                      on cluster_keys.name = forecast.item_id
+                    """
+                )
+                cursor.execute(
+                    """
+                    delete from out_constraint
+                    using cluster_forecasts
+                    where out_constraint.forecast = cluster_forecasts.name
                     """
                 )
                 cursor.execute(
                     """
                     delete from out_problem
-                    where entity = 'forecast'
-                    and exists (
-                    select 1 from forecast
-                    inner join cluster_keys
-                        on cluster_keys.name = forecast.item_id
-                        and out_problem.owner like forecast.name || ' - %'
-                    )
+                    using cluster_forecasts
+                    where out_problem.entity = 'forecast'
+                    and substring(out_problem.owner from '^(.*) - ') = cluster_forecasts.name
                     """
                 )
+                cursor.execute("drop table cluster_forecasts")
             cursor.execute("truncate table cluster_keys")
-            for i in frepple.resources():
-                if i.cluster in cluster:
-                    cursor.execute(
-                        "insert into cluster_keys (name) values (%s)", (i.name,)
-                    )
+            cursor.copy_from(
+                CopyFromGenerator(cls.getClusterKeys(frepple.resources(), cluster)),
+                "cluster_keys",
+                size=settings.COPY_BUFFER_SIZE,
+                sep="\v",
+            )
+            cursor.execute("analyze cluster_keys")
             cursor.execute(
                 """
                 delete from out_problem
@@ -286,16 +322,20 @@ class TruncatePlan(PlanTask):
             cursor.execute(
                 "delete from out_resourceplan using cluster_keys where resource = cluster_keys.name"
             )
+            cursor.execute(
+                "delete from out_resourceplanbucket using cluster_keys where resource = cluster_keys.name"
+            )
             cursor.execute(
                 "delete from out_problem using cluster_keys where entity = 'capacity' and owner = cluster_keys.name"
             )
             cursor.execute("truncate table cluster_keys")
-            for i in frepple.operations():
-                if i.cluster in cluster:
-                    cursor.execute(
-                        "insert into cluster_keys (name) select substring(%s from 1 for 300)",
-                        (i.name,),
-                    )
+            cursor.copy_from(
+                CopyFromGenerator(cls.getClusterKeys(frepple.operations(), cluster)),
+                "cluster_keys",
+                size=settings.COPY_BUFFER_SIZE,
+                sep="\v",
+            )
+            cursor.execute("analyze cluster_keys")
             cursor.execute(
                 """
                 delete from out_problem
@@ -405,7 +445,7 @@ class ExportProblems(PlanTask):
                     "enddate",
                     "weight",
                 ),
-                size=1024,
+                size=settings.COPY_BUFFER_SIZE,
                 sep="\v",
             )
 
@@ -479,7 +519,7 @@ class ExportConstraints(PlanTask):
                     "enddate",
                     "weight",
                 ),
-                size=1024,
+                size=settings.COPY_BUFFER_SIZE,
                 sep="\v",
             )
 
@@ -570,39 +610,38 @@ class ExportOperationPlans(PlanTask):
                 pln["location"] = buffer.location.name
         if opplan.rule:
             pln["setuprule"] = [opplan.rule.setupmatrix.name, opplan.rule.priority]
-        # We need to double any backslash to assure that the string remains
-        # valid when passing it through postgresql (which eats them away)
-        return json.dumps(pln).replace("\\", "\\\\")
+        return json.dumps(pln)
 
     @classmethod
     def getData(
-        cls, with_fcst, timestamp, cluster=-1, opplans=None, accepted_status=[]
+        cls,
+        with_fcst,
+        timestamp,
+        cluster=-1,
+        opplans=None,
+        accepted_status=[],
+        shard=None,
     ):
         import frepple
 
-        linetemplate = "%s\v%s\v%s\v%s\v%s\v%s\v%s\v%s\v%s\v%s\v%s\v%s\v%s\v%s\v%s\v%s\v%s\v%s\v%s\v%s\v%s\v%s\v%s\v%s"
-        if with_fcst:
-            linetemplate += "\v%s"
-        for unused in cls.attrs:
-            linetemplate += "\v%s"
-        linetemplate += "\n"
-
         if cluster == -2:
             for j in opplans:
                 if j.status in accepted_status:
                     data = cls.getDataOpplan(j.operation, j, with_fcst, timestamp)
                     if data:
-                        yield linetemplate % tuple(data)
+                        yield copy_line(data)
         else:
-            for i in frepple.operations():
+            for idx, i in enumerate(frepple.operations()):
                 if cluster != -1 and i.cluster not in cluster:
                     continue
+                if shard and idx % shard[1] != shard[0]:
+                    continue
 
                 for j in i.operationplans:
                     if j.status in accepted_status:
                         data = cls.getDataOpplan(i, j, with_fcst, timestamp)
                         if data:
-                            yield linetemplate % tuple(data)
+                            yield copy_line(data)
 
     @classmethod
     def getDataOpplan(cls, i, j, with_fcst, timestamp):
@@ -641,17 +680,17 @@ class ExportOperationPlans(PlanTask):
         if isinstance(i, frepple.operation_inventory) or (
             j.demand or (j.owner and j.owner.demand)
         ):
-            color = "\\N"
+            color = None
         else:
             color = j.getColor()[0]
             if color == 999999:
-                color = "\\N"
+                color = None
 
         data = None
         if isinstance(i, frepple.operation_inventory):
             # Export inventory
             data = [
-                clean_value(i.name),
+                i.name,
                 "STCK",
                 status,
                 round(j.quantity, 8),
@@ -660,34 +699,34 @@ class ExportOperationPlans(PlanTask):
                 round(j.criticality, 8),
                 delay,
                 cls.getPegging(j),
-                clean_value(j.source),
+                j.source,
                 timestamp,
-                "\\N",
+                None,
                 (
-                    clean_value(j.owner.reference)
+                    j.owner.reference
                     if j.owner and not j.owner.operation.hidden
-                    else "\\N"
+                    else None
                 ),
-                clean_value(j.operation.buffer.item.name),
-                clean_value(j.operation.buffer.location.name),
-                "\\N",
-                clean_value(j.operation.buffer.location.name),
-                "\\N",
-                clean_value(j.demand.name) if demand else "\\N",
+                j.operation.buffer.item.name,
+                j.operation.buffer.location.name,
+                None,
+                j.operation.buffer.location.name,
+                None,
+                j.demand.name if demand else None,
                 (
                     j.demand.due
                     if j.demand
-                    else j.owner.demand.due if j.owner and j.owner.demand else "\\N"
+                    else j.owner.demand.due if j.owner and j.owner.demand else None
                 ),
-                "\\N",  # color is empty for stock
-                clean_value(j.reference),
-                clean_value(j.batch),
-                "\\N",
+                None,  # color is empty for stock
+                j.reference,
+                j.batch,
+                None,
             ]
         elif isinstance(i, frepple.operation_itemdistribution):
             # Export DO
             data = [
-                clean_value(i.name),
+                i.name,
                 "DO",
                 status,
                 round(j.quantity, 8),
@@ -696,46 +735,42 @@ class ExportOperationPlans(PlanTask):
                 round(j.criticality, 8),
                 delay,
                 cls.getPegging(j),
-                clean_value(j.source),
+                j.source,
                 timestamp,
-                "\\N",
+                None,
                 (
-                    clean_value(j.owner.reference)
+                    j.owner.reference
                     if j.owner and not j.owner.operation.hidden
-                    else "\\N"
+                    else None
                 ),
                 (
-                    clean_value(j.operation.destination.item.name)
+                    j.operation.destination.item.name
                     if j.operation.destination
                     else j.operation.origin.item.name
                 ),
                 (
-                    clean_value(j.operation.destination.location.name)
+                    j.operation.destination.location.name
                     if j.operation.destination
-                    else "\\N"
-                ),
-                (
-                    clean_value(j.operation.origin.location.name)
-                    if j.operation.origin
-                    else "\\N"
+                    else None
                 ),
-                "\\N",
-                "\\N",
-                clean_value(j.demand.name) if demand else "\\N",
+                (j.operation.origin.location.name if j.operation.origin else None),
+                None,
+                None,
+                j.demand.name if demand else None,
                 (
                     j.demand.due
                     if j.demand
-                    else j.owner.demand.due if j.owner and j.owner.demand else "\\N"
+                    else j.owner.demand.due if j.owner and j.owner.demand else None
                 ),
                 color,  # color
-                clean_value(j.reference),
-                clean_value(j.batch),
-                "\\N",
+                j.reference,
+                j.batch,
+                None,
             ]
         elif isinstance(i, frepple.operation_itemsupplier):
             # Export PO
             data = [
-                clean_value(i.name),
+                i.name,
                 "PO",
                 status,
                 round(j.quantity, 8),
@@ -744,34 +779,34 @@ class ExportOperationPlans(PlanTask):
                 round(j.criticality, 8),
                 delay,
                 cls.getPegging(j),
-                clean_value(j.source),
+                j.source,
                 timestamp,
-                "\\N",
+                None,
                 (
-                    clean_value(j.owner.reference)
+                    j.owner.reference
                     if j.owner and not j.owner.operation.hidden
-                    else "\\N"
+                    else None
                 ),
-                clean_value(j.operation.buffer.item.name),
-                "\\N",
-                "\\N",
-                clean_value(j.operation.buffer.location.name),
-                clean_value(j.operation.itemsupplier.supplier.name),
-                clean_value(j.demand.name) if demand else "\\N",
+                j.operation.buffer.item.name,
+                None,
+                None,
+                j.operation.buffer.location.name,
+                j.operation.itemsupplier.supplier.name,
+                j.demand.name if demand else None,
                 (
                     j.demand.due
                     if j.demand
-                    else j.owner.demand.due if j.owner and j.owner.demand else "\\N"
+                    else j.owner.demand.due if j.owner and j.owner.demand else None
                 ),
                 color,  # color
-                clean_value(j.reference),
-                clean_value(j.batch),
-                "\\N",
+                j.reference,
+                j.batch,
+                None,
             ]
         elif not i.hidden:
             # Export MO
             data = [
-                clean_value(i.name),
+                i.name,
                 "MO",
                 status,
                 round(j.quantity, 8),
@@ -780,50 +815,50 @@ class ExportOperationPlans(PlanTask):
                 round(j.criticality, 8),
                 delay,
                 cls.getPegging(j),
-                clean_value(j.source),
+                j.source,
                 timestamp,
-                clean_value(i.name),
+                i.name,
                 (
-                    clean_value(j.owner.reference)
+                    j.owner.reference
                     if j.owner and not j.owner.operation.hidden
-                    else "\\N"
+                    else None
                 ),
                 (
-                    clean_value(i.item.name)
+                    i.item.name
                     if i.item
                     else (
-                        clean_value(i.owner.item.name)
+                        i.owner.item.name
                         if i.owner and i.owner.item
                         else (
-                            clean_value(j.demand.item.name)
+                            j.demand.item.name
                             if j.demand and j.demand.item
                             else (
-                                clean_value(j.owner.demand.item.name)
+                                j.owner.demand.item.name
                                 if j.owner and j.owner.demand and j.owner.demand.item
-                                else "\\N"
+                                else None
                             )
                         )
                     )
                 ),
-                "\\N",
-                "\\N",
-                clean_value(i.location.name) if i.location else "\\N",
-                "\\N",
-                clean_value(j.demand.name) if demand and j.demand else "\\N",
+                None,
+                None,
+                i.location.name if i.location else None,
+                None,
+                j.demand.name if demand and j.demand else None,
                 (
                     j.demand.due
                     if j.demand
-                    else j.owner.demand.due if j.owner and j.owner.demand else "\\N"
+                    else j.owner.demand.due if j.owner and j.owner.demand else None
                 ),
                 color,  # color
-                clean_value(j.reference),
-                clean_value(j.batch),
-                round(j.quantity_completed, 8) if j.quantity_completed else "\\N",
+                j.reference,
+                j.batch,
+                round(j.quantity_completed, 8) if j.quantity_completed else None,
             ]
         elif j.demand or (j.owner and j.owner.demand):
             # Export shipments (with automatically created delivery operations)
             data = [
-                clean_value(i.name),
+                i.name,
                 "DLVR",
                 status,
                 round(j.quantity, 8),
@@ -832,45 +867,45 @@ class ExportOperationPlans(PlanTask):
                 round(j.criticality, 8),
                 delay,
                 cls.getPegging(j),
-                clean_value(j.source),
+                j.source,
                 timestamp,
-                "\\N",
+                None,
                 (
-                    clean_value(j.owner.reference)
+                    j.owner.reference
                     if j.owner and not j.owner.operation.hidden
-                    else "\\N"
+                    else None
                 ),
-                clean_value(
+                (
                     j.owner.demand.item.name
                     if j.owner and j.owner.demand
                     else j.demand.item.name
                 ),
-                "\\N",
-                "\\N",
-                clean_value(
+                None,
+                None,
+                (
                     j.owner.demand.location.name
                     if j.owner and j.owner.demand
                     else j.demand.location.name
                 ),
-                "\\N",
-                clean_value(j.demand.name) if demand else "\\N",
+                None,
+                j.demand.name if demand else None,
                 (
                     j.demand.due
                     if j.demand
-                    else j.owner.demand.due if j.owner and j.owner.demand else "\\N"
+                    else j.owner.demand.due if j.owner and j.owner.demand else None
                 ),
-                "\\N",  # color is empty for deliver operation
-                clean_value(j.reference),
-                clean_value(j.batch),
-                "\\N",
+                None,  # color is empty for deliver operation
+                j.reference,
+                j.batch,
+                None,
             ]
         if data:
             if with_fcst:
-                data.append(clean_value(forecast.owner.name) if forecast else "\\N")
+                data.append(forecast.owner.name if forecast else None)
             for attr in cls.attrs:
                 v = getattr(j, attr[0], None)
                 if v is None:
-                    data.append("\\N")
+                    data.append(None)
                 elif attr[2] == "boolean":
                     data.append(True if v else False)
                 elif attr[2] == "duration":
@@ -880,7 +915,7 @@ class ExportOperationPlans(PlanTask):
                 elif attr[2] == "number":
                     data.append(round(v, 6))
                 elif attr[2] == "string":
-                    data.append(clean_value(v))
+                    data.append(v)
                 elif attr[2] == "time":
                     data.append(v)
                 elif attr[2] == "date":
@@ -891,6 +926,107 @@ class ExportOperationPlans(PlanTask):
                     raise Exception("Unknown attribute type %s" % attr[2])
         return data
 
+    @staticmethod
+    def getColumns(with_fcst, attrs):
+        return (
+            [
+                "name",
+                "type",
+                "status",
+                "quantity",
+                "startdate",
+                "enddate",
+                "criticality",
+                "delay",
+                "plan",
+                "source",
+                "lastmodified",
+                "operation_id",
+                "owner_id",
+                "item_id",
+                "destination_id",
+                "origin_id",
+                "location_id",
+                "supplier_id",
+                "demand_id",
+                "due",
+                "color",
+                "reference",
+                "batch",
+                "quantity_completed",
+            ]
+            + (
+                [
+                    "forecast",
+                ]
+                if with_fcst
+                else []
+            )
+            + [a[0] for a in attrs]
+        )
+
+    class _ExportShard(Thread):
+        """
+        Exports a shard of the operationplans over a separate database connection.
+
+        All operationplans of the shard are copied into the staging table.
+        Nothing is written to the operationplan table here: the owner of an
+        operationplan can be in another shard, and the deferred foreign key
+        would then fail depending on which shard commits first.
+        The thread and CPU time of the shard are logged: the planning engine
+        holds the GIL while the python code walks the model, and only the
+        communication with the database runs truly in parallel.
+        """
+
+        def __init__(self, task, database, shard, with_fcst, timestamp, tmp_table):
+            super().__init__(name="export operationplans %s" % shard[0])
+            self.task = task
+            self.database = database
+            self.shard = shard
+            self.with_fcst = with_fcst
+            self.timestamp = timestamp
+            self.tmp_table = tmp_table
+            self.exception = None
+
+        def run(self):
+            try:
+                starttime = time()
+                startcpu = thread_time()
+                with connections[self.database].cursor() as cursor:
+                    cursor.copy_from(
+                        CopyFromGenerator(
+                            self.task.getData(
+                                self.with_fcst,
+                                self.timestamp,
+                                accepted_status=[
+                                    "proposed",
+                                    "confirmed",
+                                    "approved",
+                                    "completed",
+                                    "closed",
+                                ],
+                                shard=self.shard,
+                            )
+                        ),
+                        table=self.tmp_table,
+                        size=settings.COPY_BUFFER_SIZE,
+                        sep="\v",
+                        columns=self.task.getColumns(self.with_fcst, self.task.attrs),
+                    )
+                logger.info(
+                    "Exported operationplan shard %s of %s in %.2f seconds, using %.2f CPU seconds"
+                    % (
+                        self.shard[0] + 1,
+                        self.shard[1],
+                        time() - starttime,
+                        thread_time() - startcpu,
+                    )
+                )
+            except Exception as e:
+                self.exception = e
+            finally:
+                connections[self.database].close()
+
     @classmethod
     def run(cls, cluster=-1, opplans=None, database=DEFAULT_DB_ALIAS, **kwargs):
         if cluster == -2 and not opplans:
@@ -898,10 +1034,25 @@ class ExportOperationPlans(PlanTask):
         with_fcst = "freppledb.forecast" in settings.INSTALLED_APPS
         cls.attrs = [x for x in getAttributes(OperationPlan) if x[0] != "forecast"]
 
+        # A complete export is split in shards exported in parallel over
+        # multiple connections. The shards are staged in an unlogged table
+        # since a temporary table isn't visible to the other connections.
+        # The staged proposed and confirmed operationplans are then merged
+        # with a single statement.
+        workers = settings.EXPORT_OPERATIONPLAN_WORKERS if cluster == -1 else 1
+
         # Export operationplans to a temporary table
         cursor = connections[database].cursor()
-        sql = """
-            create temporary table tmp_operationplan (
+        if workers > 1:
+            # The name is unique per process, so concurrent exports on the
+            # same scenario don't share it.
+            tmp_table = "tmp_operationplan_export_%s" % os.getpid()
+            cursor.execute("drop table if exists %s" % tmp_table)
+            sql = "create unlogged table %s (" % tmp_table
+        else:
+            tmp_table = "tmp_operationplan"
+            sql = "create temporary table %s (" % tmp_table
+        sql += """
                 name character varying(1000),
                 type character varying(5) NOT NULL,
                 status character varying(20),
@@ -951,132 +1102,128 @@ class ExportOperationPlans(PlanTask):
         sql += ")"
         cursor.execute(sql)
 
-        cursor.copy_from(
-            CopyFromGenerator(
-                cls.getData(
-                    with_fcst,
-                    cls.parent.timestamp,
-                    cluster=cluster,
-                    opplans=opplans,
-                    accepted_status=(
-                        ["confirmed", "approved", "completed", "closed"]
-                        if cluster != -2
-                        else [
-                            "proposed",
-                            "confirmed",
-                            "approved",
-                            "completed",
-                            "closed",
-                        ]
+        try:
+            if workers > 1:
+                shards = [
+                    cls._ExportShard(
+                        cls,
+                        database,
+                        (n, workers),
+                        with_fcst,
+                        cls.parent.timestamp,
+                        tmp_table,
+                    )
+                    for n in range(workers)
+                ]
+                for t in shards:
+                    t.start()
+                for t in shards:
+                    t.join()
+                for t in shards:
+                    if t.exception:
+                        logger.error("Exception caught on thread %s" % t.name)
+                        raise t.exception
+            else:
+                cursor.copy_from(
+                    CopyFromGenerator(
+                        cls.getData(
+                            with_fcst,
+                            cls.parent.timestamp,
+                            cluster=cluster,
+                            opplans=opplans,
+                            accepted_status=(
+                                ["confirmed", "approved", "completed", "closed"]
+                                if cluster != -2
+                                else [
+                                    "proposed",
+                                    "confirmed",
+                                    "approved",
+                                    "completed",
+                                    "closed",
+                                ]
+                            ),
+                        )
                     ),
+                    table="tmp_operationplan",
+                    size=settings.COPY_BUFFER_SIZE,
+                    sep="\v",
                 )
-            ),
-            table="tmp_operationplan",
-            size=1024,
-            sep="\v",
-        )
 
-        if with_fcst:
-            forecastfield0 = " ,forecast=excluded.forecast"
-            forecastfield1 = " ,forecast"
-        else:
-            forecastfield0 = ""
-            forecastfield1 = ""
-
-        # Merge temp table into the actual table
-        sql = """
-            insert into operationplan (reference, name, type, status, quantity, startdate, enddate,
-            criticality, delay, plan, source, lastmodified, operation_id, owner_id, item_id,
-            destination_id, origin_id, location_id, supplier_id, demand_id, due%s, color, batch, quantity_completed %s)
-
-            select reference, name, type, status, quantity, startdate, enddate,
-            criticality, delay * interval '1 second', plan, source, lastmodified, operation_id, owner_id, item_id,
-            destination_id, origin_id, location_id, supplier_id, demand_id, due%s, color, batch, quantity_completed %s
-            from tmp_operationplan
-
-            on conflict (reference) do update
-
-            set name=excluded.name, type=excluded.type, status=excluded.status,
-                quantity=excluded.quantity, startdate=excluded.startdate, enddate=excluded.enddate,
-                criticality=excluded.criticality, delay=excluded.delay,
-                plan=excluded.plan, source=excluded.source,
-                lastmodified=excluded.lastmodified, operation_id=excluded.operation_id, owner_id=excluded.owner_id,
-                item_id=excluded.item_id, destination_id=excluded.destination_id, origin_id=excluded.origin_id,
-                location_id=excluded.location_id, supplier_id=excluded.supplier_id, demand_id=excluded.demand_id,
-                due=excluded.due%s, color=excluded.color, batch=excluded.batch, quantity_completed=excluded.quantity_completed%s
-            """ % (
-            forecastfield1,
-            "".join(",%s " % a[0] for a in cls.attrs),
-            forecastfield1,
-            "".join(",%s " % a[0] for a in cls.attrs),
-            forecastfield0,
-            "".join([", %s = excluded.%s" % (a[0], a[0]) for a in cls.attrs]),
-        )
+            if with_fcst:
+                forecastfield0 = " ,forecast=excluded.forecast"
+                forecastfield1 = " ,forecast"
+            else:
+                forecastfield0 = ""
+                forecastfield1 = ""
+
+            # Merge temp table into the actual table
+            sql = """
+                insert into operationplan (reference, name, type, status, quantity, startdate, enddate,
+                criticality, delay, plan, source, lastmodified, operation_id, owner_id, item_id,
+                destination_id, origin_id, location_id, supplier_id, demand_id, due%s, color, batch, quantity_completed %s)
+
+                select reference, name, type, status, quantity, startdate, enddate,
+                criticality, delay * interval '1 second', plan, source, lastmodified, operation_id, owner_id, item_id,
+                destination_id, origin_id, location_id, supplier_id, demand_id, due%s, color, batch, quantity_completed %s
+                from %s
+
+                on conflict (reference) do update
+
+                set name=excluded.name, type=excluded.type, status=excluded.status,
+                    quantity=excluded.quantity, startdate=excluded.startdate, enddate=excluded.enddate,
+                    criticality=excluded.criticality, delay=excluded.delay,
+                    plan=excluded.plan, source=excluded.source,
+                    lastmodified=excluded.lastmodified, operation_id=excluded.operation_id, owner_id=excluded.owner_id,
+                    item_id=excluded.item_id, destination_id=excluded.destination_id, origin_id=excluded.origin_id,
+                    location_id=excluded.location_id, supplier_id=excluded.supplier_id, demand_id=excluded.demand_id,
+                    due=excluded.due%s, color=excluded.color, batch=excluded.batch, quantity_completed=excluded.quantity_completed%s
+                """ % (
+                forecastfield1,
+                "".join(",%s " % a[0] for a in cls.attrs),
+                forecastfield1,
+                "".join(",%s " % a[0] for a in cls.attrs),
+                tmp_table,
+                forecastfield0,
+                "".join([", %s = excluded.%s" % (a[0], a[0]) for a in cls.attrs]),
+            )
 
-        cursor.execute(sql)
+            cursor.execute(sql)
 
-        # Make sure any deleted confirmed MO from Plan Editor gets deleted in the database
-        # Only MO can currently be deleted through Plan Editor
-        if cluster != -2:
-            cursor.execute(
-                """
-                delete from operationplan
-                where status in ('confirmed','approved','completed','closed')
-                and type = 'MO'
-                and not exists (select 1 from tmp_operationplan where reference = operationplan.reference)
-                """
-            )
+            # Make sure any deleted confirmed MO from Plan Editor gets deleted in the database
+            # Only MO can currently be deleted through Plan Editor
+            if cluster != -2:
+                cursor.execute(
+                    """
+                    delete from operationplan
+                    where status in ('confirmed','approved','completed','closed')
+                    and type = 'MO'
+                    and not exists (select 1 from %s where reference = operationplan.reference)
+                    """
+                    % tmp_table
+                )
 
-        # Directly injecting proposed records in operationplan table
-        if cluster != -2:
-            cursor.copy_from(
-                CopyFromGenerator(
-                    cls.getData(
-                        with_fcst,
-                        cls.parent.timestamp,
-                        cluster=cluster,
-                        opplans=opplans,
-                        accepted_status=["proposed"],
-                    )
-                ),
-                table="operationplan",
-                size=1024,
-                sep="\v",
-                columns=[
-                    "name",
-                    "type",
-                    "status",
-                    "quantity",
-                    "startdate",
-                    "enddate",
-                    "criticality",
-                    "delay",
-                    "plan",
-                    "source",
-                    "lastmodified",
-                    "operation_id",
-                    "owner_id",
-                    "item_id",
-                    "destination_id",
-                    "origin_id",
-                    "location_id",
-                    "supplier_id",
-                    "demand_id",
-                    "due",
-                    "color",
-                    "reference",
-                    "batch",
-                    "quantity_completed",
-                ]
-                + (
-                    [
-                        "forecast",
-                    ]
-                    if with_fcst
-                    else []
+            # Directly injecting proposed records in operationplan table
+            # The staging table of a parallel export already had them merged.
+            if cluster != -2 and workers == 1:
+                cursor.copy_from(
+                    CopyFromGenerator(
+                        cls.getData(
+                            with_fcst,
+                            cls.parent.timestamp,
+                            cluster=cluster,
+                            opplans=opplans,
+                            accepted_status=["proposed"],
+                        )
+                    ),
+                    table="operationplan",
+                    size=settings.COPY_BUFFER_SIZE,
+                    sep="\v",
+                    columns=cls.getColumns(with_fcst, cls.attrs),
                 )
-                + [a[0] for a in cls.attrs],
-            )
+        finally:
+            if workers > 1:
+                # The unlogged staging table isn't dropped automatically
+                cursor.execute("drop table if exists %s" % tmp_table)
 
         # update demand table specific fields
         cursor.execute(
@@ -1174,17 +1321,19 @@ class ExportOperationPlanMaterials(PlanTask):
                         )
                     )
                 else:
-                    yield "%s\v%s\v%s\v%s\v%s\v%s\v%s\v%s\v%s\v%s\n" % (
-                        clean_value(j.operationplan.reference),
-                        clean_value(j.buffer.item.name),
-                        clean_value(j.buffer.location.name),
-                        round(j.quantity, 8),
-                        str(j.date),
-                        round(j.onhand, 8),
-                        round(j.minimum, 8),
-                        round(j.period_of_cover, 8),
-                        j.status,
-                        timestamp,
+                    yield copy_line(
+                        (
+                            j.operationplan.reference,
+                            j.buffer.item.name,
+                            j.buffer.location.name,
+                            round(j.quantity, 8),
+                            j.date,
+                            round(j.onhand, 8),
+                            round(j.minimum, 8),
+                            round(j.period_of_cover, 8),
+                            j.status,
+                            timestamp,
+                        )
                     )
 
     @classmethod
@@ -1221,7 +1370,7 @@ class ExportOperationPlanMaterials(PlanTask):
                 "status",
                 "lastmodified",
             ),
-            size=1024,
+            size=settings.COPY_BUFFER_SIZE,
             sep="\v",
         )
 
@@ -1358,6 +1507,100 @@ class ComputePeriodOfCover(PlanTask):
             cursor.execute("drop table cluster_item_tmp;")
 
 
+@PlanTaskRegistry.register
+class ExportInventoryPlan(PlanTask):
+    """
+    Precomputes the inventory report for the bucket sizes and horizons
+    of the users.
+    The task runs after all other export tasks and the update of the
+    last_currentdate parameter.
+    """
+
+    description = ("Export plan", "Aggregate inventory plan")
+    sequence = 451
+    export = True
+
+    @classmethod
+    def getWeight(cls, cluster=-1, **kwargs):
+        if "supply" in os.environ and cluster == -1:
+            return 1
+        else:
+            return -1
+
+    @classmethod
+    def run(cls, database=DEFAULT_DB_ALIAS, **kwargs):
+        import frepple
+        from freppledb.common.report import getHorizon
+        from freppledb.output.views.buffer import OverviewReport
+
+        currentdate = frepple.settings.current
+        startdate = currentdate.replace(hour=0, minute=0, second=0, microsecond=0)
+
+        # Collect the bucket sizes and horizon ends of the users
+        buckets = {}
+        for u in (
+            User.objects.using(database)
+            .filter(is_active=True)
+            .exclude(horizonbuckets__isnull=True)
+        ):
+            try:
+                enddate = getHorizon(
+                    SimpleNamespace(GET={}, user=u, database=database),
+                    future_only=True,
+                )[2]
+            except Exception:
+                continue
+            if enddate > buckets.get(u.horizonbuckets, startdate):
+                buckets[u.horizonbuckets] = enddate
+
+        basesql, baseparams = (
+            OverviewReport.getBufferQuery()
+            .using(database)
+            .query.get_compiler(database)
+            .as_sql(with_col_aliases=False)
+        )
+        with connections[database].cursor() as cursor:
+            cursor.execute("truncate table out_inventoryplan")
+            for bucket, enddate in buckets.items():
+                starttime = time()
+                cursor.execute(
+                    """
+                    insert into out_inventoryplan
+                      (bucket, item, location, batch, name, startdate, enddate,
+                      history, is_ip_buffer, open_orders, net_forecast, reasons,
+                      startoh, safetystock, ongoing, periodofcover)
+                    select
+                      %%s, item_id, location_id, opplan_batch, bucket, startdate, enddate,
+                      history, is_ip_buffer, open_orders, net_forecast, reasons,
+                      startoh, safetystock, ongoing, periodofcover
+                    from (%s) inventoryplan
+                    """
+                    % OverviewReport.getPlanSQL(basesql),
+                    (bucket, startdate, enddate, currentdate, bucket) + baseparams,
+                )
+                logger.info(
+                    "Exported %s inventory buckets of size %s in %.2f seconds"
+                    % (cursor.rowcount, bucket, time() - starttime)
+                )
+            cursor.execute("analyze out_inventoryplan")
+
+            # Store the buckets and dates the report needs to decide whether
+            # it can use the table
+            cursor.execute("truncate table out_inventoryplanexport")
+            execute_batch(
+                cursor,
+                """
+                insert into out_inventoryplanexport
+                  (bucket, startdate, enddate, currentdate, outdated)
+                values (%s, %s, %s, %s, false)
+                """,
+                [
+                    (bucket, startdate, enddate, currentdate)
+                    for bucket, enddate in buckets.items()
+                ],
+            )
+
+
 @PlanTaskRegistry.register
 class ExportOperationPlanResources(PlanTask):
     description = ("Export plan", "Exporting operationplan resources")
@@ -1392,13 +1635,15 @@ class ExportOperationPlanResources(PlanTask):
                         )
                     )
                 else:
-                    yield "%s\v%s\v%s\v%s\v%s\v%s\n" % (
-                        clean_value(j.operationplan.reference),
-                        clean_value(j.resource.name),
-                        round(-j.quantity, 8),
-                        clean_value(j.setup),
-                        j.status,
-                        timestamp,
+                    yield copy_line(
+                        (
+                            j.operationplan.reference,
+                            j.resource.name,
+                            round(-j.quantity, 8),
+                            j.setup,
+                            j.status,
+                            timestamp,
+                        )
                     )
 
     @classmethod
@@ -1431,7 +1676,7 @@ class ExportOperationPlanResources(PlanTask):
                     "status",
                     "lastmodified",
                 ),
-                size=1024,
+                size=settings.COPY_BUFFER_SIZE,
                 sep="\v",
             )
 
@@ -1465,22 +1710,13 @@ class ExportResourcePlans(PlanTask):
         # The end date is computed as 5 weeks after the end of the latest loadplan in
         # the entire plan.
         # If no loadplans exist at all we use the current date +- 1 month.
-        # TODO not very efficient in an incremental export
+        # The engine only needs to look at the first and last loadplan of each resource.
         cursor = connections[database].cursor()
-        startdate = datetime.max
-        enddate = datetime.min
-        for i in frepple.resources():
-            if cluster not in (-1, -2) and i.cluster not in cluster:
-                continue
-            for j in i.loadplans:
-                if j.startdate < startdate:
-                    startdate = j.startdate
-                if j.enddate > enddate:
-                    enddate = j.enddate
-        if startdate == datetime.max:
-            startdate = frepple.settings.current
-        if enddate == datetime.min:
-            enddate = frepple.settings.current
+        horizon = frepple.resourcehorizon(cluster if cluster not in (-1, -2) else None)
+        if horizon:
+            startdate, enddate = horizon
+        else:
+            startdate = enddate = frepple.settings.current
         startdate = (startdate - timedelta(days=30)).date()
         enddate = (enddate + timedelta(days=30)).date()
         if enddate > date(2030, 12, 30):  # This is the max frePPLe can represent.
@@ -1497,20 +1733,25 @@ class ExportResourcePlans(PlanTask):
         )
         buckets = [rec[0] for rec in cursor.fetchall()]
 
+        exported = []
+
         def getData(resources):
             # Loop over all reporting buckets of all resources
             for i in resources or frepple.resources():
                 if cluster not in (-1, -2) and cluster != i.cluster:
                     continue
+                exported.append(i.name)
                 for j in i.plan(buckets):
-                    yield "%s\v%s\v%s\v%s\v%s\v%s\v%s\n" % (
-                        clean_value(i.name),
-                        str(j["start"]),
-                        round(j["available"], 8),
-                        round(j["unavailable"], 8),
-                        round(j["setup"], 8),
-                        round(j["load"], 8),
-                        round(j["free"], 8),
+                    yield copy_line(
+                        (
+                            i.name,
+                            j["start"],
+                            round(j["available"], 8),
+                            round(j["unavailable"], 8),
+                            round(j["setup"], 8),
+                            round(j["load"], 8),
+                            round(j["free"], 8),
+                        )
                     )
 
         cursor.copy_from(
@@ -1525,10 +1766,51 @@ class ExportResourcePlans(PlanTask):
                 "load",
                 "free",
             ),
-            size=1024,
+            size=settings.COPY_BUFFER_SIZE,
             sep="\v",
         )
 
+        # Roll up the plan to all coarser bucket levels.
+        # Reports in weekly or monthly buckets can then read a single record per
+        # resource and bucket.
+        if cluster == -1 and not resources:
+            cursor.execute("truncate table out_resourceplanbucket")
+            filter_sql = ""
+        elif exported:
+            cursor.execute(
+                "delete from out_resourceplanbucket where resource = any(%s)",
+                (exported,),
+            )
+            filter_sql = "and out_resourceplan.resource = any(%s)"
+        else:
+            return
+        cursor.execute(
+            """
+            insert into out_resourceplanbucket
+              (bucket, resource, startdate, enddate,
+               available, unavailable, setup, load, free)
+            select
+              common_bucketdetail.bucket_id, out_resourceplan.resource,
+              common_bucketdetail.startdate, common_bucketdetail.enddate,
+              sum(out_resourceplan.available), sum(out_resourceplan.unavailable),
+              sum(out_resourceplan.setup), sum(out_resourceplan.load),
+              sum(out_resourceplan.free)
+            from out_resourceplan
+            inner join common_bucketdetail
+              on common_bucketdetail.startdate <= out_resourceplan.startdate
+              and common_bucketdetail.enddate > out_resourceplan.startdate
+            inner join common_bucket
+              on common_bucket.name = common_bucketdetail.bucket_id
+            where common_bucket.level < (select max(level) from common_bucket)
+            %s
+            group by
+              common_bucketdetail.bucket_id, out_resourceplan.resource,
+              common_bucketdetail.startdate, common_bucketdetail.enddate
+            """
+            % filter_sql,
+            (exported,) if filter_sql else None,
+        )
+
 
 @PlanTaskRegistry.register
 class ExportPegging(PlanTask):
@@ -1566,16 +1848,82 @@ class ExportPegging(PlanTask):
                 )
             yield (json.dumps({"pegging": peg}), i.name)
 
+    # Materializes the pegging tree of the demands in the out_pegging table.
+    # The pegged quantity range of each operationplan is propagated upstream
+    # from the first level pegging stored in the demand plan.
+    peggingsql = """
+        insert into out_pegging
+          (demand, rownum, level, opplan, path, pegged_x, pegged_y)
+        with recursive cte as
+        (
+        select demand.name as demand,
+        1 as level,
+        (coalesce(operationplan.item_id,'')||'/'||operationplan.reference)::varchar as path,
+        operationplan.reference::text as reference,
+        0::numeric as pegged_x,
+        operationplan.quantity::numeric as pegged_y,
+        operationplan.owner_id
+        from demand
+        inner join lateral
+          (select t->>'opplan' as reference from jsonb_array_elements(demand.plan->'pegging') t) t on true
+        inner join operationplan on operationplan.reference = t.reference
+        where demand.plan ? 'pegging' %s
+        union all
+        select cte.demand,
+        case when upstream_opplan.owner_id = cte.owner_id then cte.level else cte.level+1 end,
+        cte.path||'/'||coalesce(upstream_opplan.item_id,'')||'/'||upstream_opplan.reference,
+        t1.upstream_reference::text,
+        greatest(t1.x, t1.x + (t1.y-t1.x)/(t2.y-t2.x)*(cte.pegged_x-t2.x)) as pegged_x,
+        least(t1.y, t1.x + (t1.y-t1.x)/(t2.y-t2.x)*(cte.pegged_x-t2.x) + (cte.pegged_y-cte.pegged_x)*(t1.y-t1.x)/(t2.y-t2.x)) as pegged_y,
+        upstream_opplan.owner_id
+        from operationplan
+        inner join cte on cte.reference = operationplan.reference and cte.level < 25
+        inner join lateral
+        (select t->>0 upstream_reference,
+        (t->>1)::numeric + (t->>2)::numeric as y,
+        (t->>2)::numeric as x from jsonb_array_elements(operationplan.plan->'upstream_opplans') t) t1 on true
+        inner join operationplan upstream_opplan on upstream_opplan.reference = t1.upstream_reference
+        inner join lateral
+        (select t->>0 downstream_reference,
+        (t->>1)::numeric+(t->>2)::numeric as y,
+        (t->>2)::numeric as x from jsonb_array_elements(upstream_opplan.plan->'downstream_opplans') t) t2
+          on t2.downstream_reference = operationplan.reference and numrange(t2.x,t2.y) && numrange(cte.pegged_x,cte.pegged_y)
+        )
+        select
+          demand,
+          row_number() over (partition by demand order by path, level desc),
+          level, reference, path, pegged_x, pegged_y
+        from cte
+        where level < 25
+        """
+
     @classmethod
     def run(cls, cluster=-1, demands=None, database=DEFAULT_DB_ALIAS, **kwargs):
+        names = []
+
+        def getPlans():
+            for plan, name in cls.getDemandPlan(cluster=cluster, demands=demands):
+                names.append(name)
+                yield (plan, name)
+
         with transaction.atomic(using=database, savepoint=False):
             with connections[database].cursor() as cursor:
                 execute_batch(
                     cursor,
                     "update demand set plan=%s where name=%s",
-                    cls.getDemandPlan(cluster=cluster, demands=demands),
+                    getPlans(),
                     page_size=200,
                 )
+                if cluster == -1:
+                    cursor.execute("truncate table out_pegging")
+                    cursor.execute(cls.peggingsql % ("",))
+                elif names:
+                    cursor.execute(
+                        "delete from out_pegging where demand = any(%s)", (names,)
+                    )
+                    cursor.execute(
+                        cls.peggingsql % ("and demand.name = any(%s)",), (names,)
+                    )
 
 
 @PlanTaskRegistry.register
@@ -0,0 +1,123 @@
+#
+# Copyright (C) 2024 by frePPLe bv
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+from django.conf import settings
+from django.db import migrations, models, connections
+
+
+def grant_read_access(apps, schema_editor):
+    db = schema_editor.connection.alias
+    role = settings.DATABASES[db].get("SQL_ROLE", "report_role")
+    if role:
+        with connections[db].cursor() as cursor:
+            cursor.execute("select count(*) from pg_roles where rolname = %s", (role,))
+            if not cursor.fetchone()[0]:
+                cursor.execute(
+                    "create role %s with nologin noinherit role current_user" % (role,)
+                )
+            cursor.execute("grant select on table out_inventoryplan to %s" % (role,))
+
+
+class Migration(migrations.Migration):
+    dependencies = [("output", "0011_exports")]
+
+    operations = [
+        migrations.CreateModel(
+            name="InventoryPlan",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("bucket", models.CharField(max_length=300, verbose_name="bucket")),
+                ("item", models.CharField(max_length=300, verbose_name="item")),
+                ("location", models.CharField(max_length=300, verbose_name="location")),
+                ("batch", models.CharField(max_length=300, verbose_name="batch")),
+                ("name", models.CharField(max_length=300, verbose_name="name")),
+                ("startdate", models.DateTimeField(verbose_name="start date")),
+                ("enddate", models.DateTimeField(verbose_name="end date")),
+                ("history", models.BooleanField(default=False, verbose_name="history")),
+                (
+                    "is_ip_buffer",
+                    models.BooleanField(
+                        default=False, verbose_name="inventory planning"
+                    ),
+                ),
+                (
+                    "open_orders",
+                    models.DecimalField(
+                        decimal_places=8,
+                        max_digits=20,
+                        null=True,
+                        verbose_name="open orders",
+                    ),
+                ),
+                (
+                    "net_forecast",
+                    models.DecimalField(
+                        decimal_places=8,
+                        max_digits=20,
+                        null=True,
+                        verbose_name="net forecast",
+                    ),
+                ),
+                ("reasons", models.JSONField(null=True, verbose_name="reasons")),
+                (
+                    "startoh",
+                    models.JSONField(null=True, verbose_name="start inventory"),
+                ),
+                (
+                    "safetystock",
+                    models.DecimalField(
+                        decimal_places=8,
+                        max_digits=20,
+                        null=True,
+                        verbose_name="safety stock",
+                    ),
+                ),
+                ("ongoing", models.JSONField(null=True, verbose_name="ongoing")),
+                (
+                    "periodofcover",
+                    models.IntegerField(null=True, verbose_name="period of cover"),
+                ),
+            ],
+            options={
+                "verbose_name": "inventory plan",
+                "verbose_name_plural": "inventory plans",
+                "db_table": "out_inventoryplan",
+                "ordering": ["bucket", "item", "location", "batch", "startdate"],
+                "default_permissions": [],
+                "unique_together": {
+                    ("bucket", "item", "location", "batch", "startdate")
+                },
+            },
+        ),
+        migrations.RunPython(
+            code=grant_read_access, reverse_code=migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,136 @@
+#
+# Copyright (C) 2024 by frePPLe bv
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+from django.conf import settings
+from django.db import migrations, models, connections
+
+
+def grant_read_access(apps, schema_editor):
+    db = schema_editor.connection.alias
+    role = settings.DATABASES[db].get("SQL_ROLE", "report_role")
+    if role:
+        with connections[db].cursor() as cursor:
+            cursor.execute("select count(*) from pg_roles where rolname = %s", (role,))
+            if not cursor.fetchone()[0]:
+                cursor.execute(
+                    "create role %s with nologin noinherit role current_user" % (role,)
+                )
+            cursor.execute(
+                "grant select on table out_resourceplanbucket to %s" % (role,)
+            )
+
+
+class Migration(migrations.Migration):
+    dependencies = [("output", "0012_inventoryplan")]
+
+    operations = [
+        migrations.CreateModel(
+            name="ResourceBucketSummary",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("bucket", models.CharField(max_length=300, verbose_name="bucket")),
+                ("resource", models.CharField(max_length=300, verbose_name="resource")),
+                ("startdate", models.DateTimeField(verbose_name="start date")),
+                ("enddate", models.DateTimeField(verbose_name="end date")),
+                (
+                    "available",
+                    models.DecimalField(
+                        decimal_places=8,
+                        max_digits=20,
+                        null=True,
+                        verbose_name="available",
+                    ),
+                ),
+                (
+                    "unavailable",
+                    models.DecimalField(
+                        decimal_places=8,
+                        max_digits=20,
+                        null=True,
+                        verbose_name="unavailable",
+                    ),
+                ),
+                (
+                    "setup",
+                    models.DecimalField(
+                        decimal_places=8, max_digits=20, null=True, verbose_name="setup"
+                    ),
+                ),
+                (
+                    "load",
+                    models.DecimalField(
+                        decimal_places=8, max_digits=20, null=True, verbose_name="load"
+                    ),
+                ),
+                (
+                    "free",
+                    models.DecimalField(
+                        decimal_places=8, max_digits=20, null=True, verbose_name="free"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "resource bucket summary",
+                "verbose_name_plural": "resource bucket summaries",
+                "db_table": "out_resourceplanbucket",
+                "ordering": ["bucket", "resource", "startdate"],
+                "default_permissions": [],
+                "unique_together": {("bucket", "resource", "startdate")},
+            },
+        ),
+        migrations.RunSQL(
+            """
+            insert into out_resourceplanbucket
+              (bucket, resource, startdate, enddate,
+               available, unavailable, setup, load, free)
+            select
+              common_bucketdetail.bucket_id, out_resourceplan.resource,
+              common_bucketdetail.startdate, common_bucketdetail.enddate,
+              sum(out_resourceplan.available), sum(out_resourceplan.unavailable),
+              sum(out_resourceplan.setup), sum(out_resourceplan.load),
+              sum(out_resourceplan.free)
+            from out_resourceplan
+            inner join common_bucketdetail
+              on common_bucketdetail.startdate <= out_resourceplan.startdate
+              and common_bucketdetail.enddate > out_resourceplan.startdate
+            inner join common_bucket
+              on common_bucket.name = common_bucketdetail.bucket_id
+            where common_bucket.level < (select max(level) from common_bucket)
+            group by
+              common_bucketdetail.bucket_id, out_resourceplan.resource,
+              common_bucketdetail.startdate, common_bucketdetail.enddate
+            """,
+            migrations.RunSQL.noop,
+        ),
+        migrations.RunPython(
+            code=grant_read_access, reverse_code=migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,144 @@
+#
+# Copyright (C) 2024 by frePPLe bv
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+from django.conf import settings
+from django.db import migrations, models, connections
+
+
+def grant_read_access(apps, schema_editor):
+    db = schema_editor.connection.alias
+    role = settings.DATABASES[db].get("SQL_ROLE", "report_role")
+    if role:
+        with connections[db].cursor() as cursor:
+            cursor.execute("select count(*) from pg_roles where rolname = %s", (role,))
+            if not cursor.fetchone()[0]:
+                cursor.execute(
+                    "create role %s with nologin noinherit role current_user" % (role,)
+                )
+            cursor.execute("grant select on table out_pegging to %s" % (role,))
+
+
+class Migration(migrations.Migration):
+    dependencies = [("output", "0013_resourceplanbucket")]
+
+    operations = [
+        migrations.CreateModel(
+            name="DemandPegging",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "demand",
+                    models.CharField(
+                        db_index=True, max_length=300, verbose_name="demand"
+                    ),
+                ),
+                ("rownum", models.IntegerField(verbose_name="row number")),
+                ("level", models.IntegerField(verbose_name="level")),
+                (
+                    "opplan",
+                    models.CharField(
+                        db_index=True, max_length=300, verbose_name="operationplan"
+                    ),
+                ),
+                ("path", models.TextField(verbose_name="path")),
+                (
+                    "pegged_x",
+                    models.DecimalField(
+                        decimal_places=8, max_digits=20, verbose_name="pegged from"
+                    ),
+                ),
+                (
+                    "pegged_y",
+                    models.DecimalField(
+                        decimal_places=8, max_digits=20, verbose_name="pegged to"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "demand pegging",
+                "verbose_name_plural": "demand peggings",
+                "db_table": "out_pegging",
+                "ordering": ["demand", "rownum"],
+                "default_permissions": [],
+            },
+        ),
+        migrations.RunSQL(
+            """
+            insert into out_pegging
+              (demand, rownum, level, opplan, path, pegged_x, pegged_y)
+            with recursive cte as
+            (
+            select demand.name as demand,
+            1 as level,
+            (coalesce(operationplan.item_id,'')||'/'||operationplan.reference)::varchar as path,
+            operationplan.reference::text as reference,
+            0::numeric as pegged_x,
+            operationplan.quantity::numeric as pegged_y,
+            operationplan.owner_id
+            from demand
+            inner join lateral
+              (select t->>'opplan' as reference from jsonb_array_elements(demand.plan->'pegging') t) t on true
+            inner join operationplan on operationplan.reference = t.reference
+            where demand.plan ? 'pegging'
+            union all
+            select cte.demand,
+            case when upstream_opplan.owner_id = cte.owner_id then cte.level else cte.level+1 end,
+            cte.path||'/'||coalesce(upstream_opplan.item_id,'')||'/'||upstream_opplan.reference,
+            t1.upstream_reference::text,
+            greatest(t1.x, t1.x + (t1.y-t1.x)/(t2.y-t2.x)*(cte.pegged_x-t2.x)) as pegged_x,
+            least(t1.y, t1.x + (t1.y-t1.x)/(t2.y-t2.x)*(cte.pegged_x-t2.x) + (cte.pegged_y-cte.pegged_x)*(t1.y-t1.x)/(t2.y-t2.x)) as pegged_y,
+            upstream_opplan.owner_id
+            from operationplan
+            inner join cte on cte.reference = operationplan.reference and cte.level < 25
+            inner join lateral
+            (select t->>0 upstream_reference,
+            (t->>1)::numeric + (t->>2)::numeric as y,
+            (t->>2)::numeric as x from jsonb_array_elements(operationplan.plan->'upstream_opplans') t) t1 on true
+            inner join operationplan upstream_opplan on upstream_opplan.reference = t1.upstream_reference
+            inner join lateral
+            (select t->>0 downstream_reference,
+            (t->>1)::numeric+(t->>2)::numeric as y,
+            (t->>2)::numeric as x from jsonb_array_elements(upstream_opplan.plan->'downstream_opplans') t) t2
+              on t2.downstream_reference = operationplan.reference and numrange(t2.x,t2.y) && numrange(cte.pegged_x,cte.pegged_y)
+            )
+            select
+              demand,
+              row_number() over (partition by demand order by path, level desc),
+              level, reference, path, pegged_x, pegged_y
+            from cte
+            where level < 25
+            """,
+            migrations.RunSQL.noop,
+        ),
+        migrations.RunPython(
+            code=grant_read_access, reverse_code=migrations.RunPython.noop
+        ),
+    ]
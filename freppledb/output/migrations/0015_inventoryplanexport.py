@@ -0,0 +1,114 @@
+#
+# Copyright (C) 2024 by frePPLe bv
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+from django.conf import settings
+from django.db import migrations, models, connections
+
+
+def grant_read_access(apps, schema_editor):
+    db = schema_editor.connection.alias
+    role = settings.DATABASES[db].get("SQL_ROLE", "report_role")
+    if role:
+        with connections[db].cursor() as cursor:
+            cursor.execute("select count(*) from pg_roles where rolname = %s", (role,))
+            if not cursor.fetchone()[0]:
+                cursor.execute(
+                    "create role %s with nologin noinherit role current_user" % (role,)
+                )
+            cursor.execute(
+                "grant select on table out_inventoryplanexport to %s" % (role,)
+            )
+
+
+class Migration(migrations.Migration):
+    dependencies = [("output", "0014_pegging"), ("input", "0075_search_index")]
+
+    operations = [
+        migrations.CreateModel(
+            name="InventoryPlanExport",
+            fields=[
+                (
+                    "bucket",
+                    models.CharField(
+                        max_length=300,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="bucket",
+                    ),
+                ),
+                ("startdate", models.DateTimeField(verbose_name="start date")),
+                ("enddate", models.DateTimeField(verbose_name="end date")),
+                ("currentdate", models.DateTimeField(verbose_name="current date")),
+                (
+                    "outdated",
+                    models.BooleanField(default=False, verbose_name="outdated"),
+                ),
+            ],
+            options={
+                "verbose_name": "inventory plan export",
+                "verbose_name_plural": "inventory plan exports",
+                "db_table": "out_inventoryplanexport",
+                "ordering": ["bucket"],
+                "default_permissions": [],
+            },
+        ),
+        # The previous version of the export kept its metadata in a parameter
+        migrations.RunSQL(
+            "delete from common_parameter where name = 'inventoryplan.export'",
+            migrations.RunSQL.noop,
+        ),
+        migrations.RunSQL(
+            sql="""
+            create or replace function out_inventoryplan_outdated() returns trigger as $$
+            begin
+              update out_inventoryplanexport set outdated = true where not outdated;
+              return null;
+            end;
+            $$ language plpgsql;
+
+            -- Statement level triggers: a bulk update or a copy of the plan
+            -- fires them only once. Only the first change after an export
+            -- updates the rows.
+            create trigger out_inventoryplan_operationplan
+            after insert or update or delete or truncate on operationplan
+            for each statement execute procedure out_inventoryplan_outdated();
+
+            create trigger out_inventoryplan_operationplanmaterial
+            after insert or update or delete or truncate on operationplanmaterial
+            for each statement execute procedure out_inventoryplan_outdated();
+
+            create trigger out_inventoryplan_buffer
+            after insert or update or delete or truncate on buffer
+            for each statement execute procedure out_inventoryplan_outdated();
+            """,
+            reverse_sql="""
+            drop trigger if exists out_inventoryplan_buffer on buffer;
+            drop trigger if exists out_inventoryplan_operationplanmaterial on operationplanmaterial;
+            drop trigger if exists out_inventoryplan_operationplan on operationplan;
+            drop function if exists out_inventoryplan_outdated();
+            """,
+        ),
+        migrations.RunPython(
+            code=grant_read_access, reverse_code=migrations.RunPython.noop
+        ),
+    ]
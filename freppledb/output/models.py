@@ -92,3 +92,113 @@ class ResourceSummary(models.Model):
         )
         verbose_name_plural = "resource summaries"
         default_permissions = []
+
+
+class ResourceBucketSummary(models.Model):
+    bucket = models.CharField(_("bucket"), max_length=300)
+    resource = models.CharField(_("resource"), max_length=300)
+    startdate = models.DateTimeField(_("start date"))
+    enddate = models.DateTimeField(_("end date"))
+    available = models.DecimalField(
+        _("available"), max_digits=20, decimal_places=8, null=True
+    )
+    unavailable = models.DecimalField(
+        _("unavailable"), max_digits=20, decimal_places=8, null=True
+    )
+    setup = models.DecimalField(_("setup"), max_digits=20, decimal_places=8, null=True)
+    load = models.DecimalField(_("load"), max_digits=20, decimal_places=8, null=True)
+    free = models.DecimalField(_("free"), max_digits=20, decimal_places=8, null=True)
+
+    class Meta:
+        db_table = "out_resourceplanbucket"
+        ordering = ["bucket", "resource", "startdate"]
+        unique_together = (("bucket", "resource", "startdate"),)
+        verbose_name = "resource bucket summary"  # No need to translate these since only used internally
+        verbose_name_plural = "resource bucket summaries"
+        default_permissions = []
+
+
+class DemandPegging(models.Model):
+    """
+    Materialized pegging tree of the demands.
+
+    The rows are derived from the pegging in the demand plan and the
+    upstream/downstream links of the operationplans. They are refreshed
+    with every export of the demand pegging.
+    """
+
+    demand = models.CharField(_("demand"), max_length=300, db_index=True)
+    rownum = models.IntegerField(_("row number"))
+    level = models.IntegerField(_("level"))
+    opplan = models.CharField(_("operationplan"), max_length=300, db_index=True)
+    path = models.TextField(_("path"))
+    pegged_x = models.DecimalField(_("pegged from"), max_digits=20, decimal_places=8)
+    pegged_y = models.DecimalField(_("pegged to"), max_digits=20, decimal_places=8)
+
+    class Meta:
+        db_table = "out_pegging"
+        ordering = ["demand", "rownum"]
+        verbose_name = (
+            "demand pegging"  # No need to translate these since only used internally
+        )
+        verbose_name_plural = "demand peggings"
+        default_permissions = []
+
+
+class InventoryPlan(models.Model):
+    bucket = models.CharField(_("bucket"), max_length=300)
+    item = models.CharField(_("item"), max_length=300)
+    location = models.CharField(_("location"), max_length=300)
+    batch = models.CharField(_("batch"), max_length=300)
+    name = models.CharField(_("name"), max_length=300)
+    startdate = models.DateTimeField(_("start date"))
+    enddate = models.DateTimeField(_("end date"))
+    history = models.BooleanField(_("history"), default=False)
+    is_ip_buffer = models.BooleanField(_("inventory planning"), default=False)
+    open_orders = models.DecimalField(
+        _("open orders"), max_digits=20, decimal_places=8, null=True
+    )
+    net_forecast = models.DecimalField(
+        _("net forecast"), max_digits=20, decimal_places=8, null=True
+    )
+    reasons = models.JSONField(_("reasons"), null=True)
+    startoh = models.JSONField(_("start inventory"), null=True)
+    safetystock = models.DecimalField(
+        _("safety stock"), max_digits=20, decimal_places=8, null=True
+    )
+    ongoing = models.JSONField(_("ongoing"), null=True)
+    periodofcover = models.IntegerField(_("period of cover"), null=True)
+
+    class Meta:
+        db_table = "out_inventoryplan"
+        ordering = ["bucket", "item", "location", "batch", "startdate"]
+        unique_together = (("bucket", "item", "location", "batch", "startdate"),)
+        verbose_name = (
+            "inventory plan"  # No need to translate these since only used internally
+        )
+        verbose_name_plural = "inventory plans"
+        default_permissions = []
+
+
+class InventoryPlanExport(models.Model):
+    """
+    Describes the contents of the out_inventoryplan table: one row per
+    bucket size.
+
+    Triggers on the operationplan, operationplanmaterial and buffer tables
+    mark the rows as outdated. Edits to other data are only reflected in the
+    table after the next plan run.
+    """
+
+    bucket = models.CharField(_("bucket"), max_length=300, primary_key=True)
+    startdate = models.DateTimeField(_("start date"))
+    enddate = models.DateTimeField(_("end date"))
+    currentdate = models.DateTimeField(_("current date"))
+    outdated = models.BooleanField(_("outdated"), default=False)
+
+    class Meta:
+        db_table = "out_inventoryplanexport"
+        ordering = ["bucket"]
+        verbose_name = "inventory plan export"  # No need to translate these since only used internally
+        verbose_name_plural = "inventory plan exports"
+        default_permissions = []
@@ -24,6 +24,7 @@
 from django.test import TestCase
 
 from freppledb.common.tests import checkResponse
+from freppledb.output.models import DemandPegging
 
 
 class OutputTest(TestCase):
@@ -170,6 +171,7 @@ class OutputTest(TestCase):
 
     # Pegging
     def test_output_pegging(self):
+        self.assertTrue(DemandPegging.objects.filter(demand="Demand 01").exists())
         response = self.client.get("/demandpegging/Demand%2001/?format=json")
         self.assertContains(response, '"records":1,')
         checkResponse(self, response)
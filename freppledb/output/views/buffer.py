@@ -33,6 +33,7 @@ from django.utils.translation import gettext_lazy as _
 
 from freppledb.boot import getAttributeFields
 from freppledb.input.models import Buffer, Item, Location, OperationPlanMaterial
+from freppledb.common.models import BucketDetail
 from freppledb.common.report import (
     GridPivot,
     GridFieldText,
@@ -41,6 +42,7 @@ from freppledb.common.report import (
     GridFieldLastModified,
     GridFieldCurrency,
 )
+from freppledb.output.models import InventoryPlanExport
 
 
 class OverviewReport(GridPivot):
@@ -80,7 +82,15 @@ class OverviewReport(GridPivot):
                     location = i_b_l[2]
                     batch = i_b_l[1]
 
-        request.basequeryset = OperationPlanMaterial.objects.values(
+        request.basequeryset = reportclass.getBufferQuery(item, location, batch)
+        return request.basequeryset
+
+    @staticmethod
+    def getBufferQuery(item=None, location=None, batch=None):
+        """
+        Returns a queryset with the distinct buffers in the plan.
+        """
+        qs = OperationPlanMaterial.objects.values(
             "item", "location", "item__type"
         ).filter(
             ((Q(item__type="make to stock") | Q(item__type__isnull=True)))
@@ -88,17 +98,15 @@ class OverviewReport(GridPivot):
         )
 
         if item:
-            request.basequeryset = request.basequeryset.filter(item=item)
+            qs = qs.filter(item=item)
 
         if location:
-            request.basequeryset = request.basequeryset.filter(location=location)
+            qs = qs.filter(location=location)
 
         if batch:
-            request.basequeryset = request.basequeryset.filter(
-                operationplan__batch=batch
-            )
+            qs = qs.filter(operationplan__batch=batch)
 
-        request.basequeryset = request.basequeryset.annotate(
+        qs = qs.annotate(
             buffer=RawSQL(
                 "operationplanmaterial.item_id || "
                 "(case when item.type is distinct from 'make to order' then '' else ' @ ' || operationplan.batch end) "
@@ -110,8 +118,7 @@ class OverviewReport(GridPivot):
                 (),
             ),
         ).distinct()
-
-        return request.basequeryset
+        return qs
 
     model = OperationPlanMaterial
     default_sort = (1, "asc", 2, "asc")
@@ -596,139 +603,13 @@ class OverviewReport(GridPivot):
         else:
             return {"withforecast": "freppledb.forecast" in settings.INSTALLED_APPS}
 
-    @classmethod
-    def query(reportclass, request, basequery, sortsql="1 asc"):
-        basesql, baseparams = basequery.query.get_compiler(basequery.db).as_sql(
-            with_col_aliases=False
-        )
-
-        # Execute a query to get the backlog at the start of the horizon
-        startbacklogdict = {}
-
-        # code assumes no max lateness is set to calculate the backlog
-        # forecast knows nothing about batch so all is counted as backlog
-
-        backlog_fcst = """
-            union all
-          select opm.item_id, opm.location_id, '' as batch, 0::numeric qty_orders, coalesce(sum((forecastplan.value->>'forecastnet')::numeric),0) qty_forecast
-          from forecastplan
-          left outer join common_parameter cp on cp.name = 'forecast.DueWithinBucket'
-          inner join (%s) opm on forecastplan.item_id = opm.item_id
-          and forecastplan.location_id = opm.location_id
-          where forecastplan.customer_id = (select name from customer where lvl=0)
-          and case when coalesce(cp.value, 'start') = 'start' then forecastplan.startdate
-                   when coalesce(cp.value, 'start') = 'end' then forecastplan.enddate - interval '1 second'
-                   when coalesce(cp.value, 'start') = 'middle' then forecastplan.startdate + age(forecastplan.enddate, forecastplan.startdate)/2 end < %%s
-          group by opm.item_id, opm.location_id
-        """ % (
-            basesql,
-        )
-
-        deliveries_no_fcst = """
-            select opm.item_id,
-            opm.location_id,
-            case when item.type is distinct from 'make to order' then ''
-            else operationplan.batch
-            end as batch,
-            sum(case when operationplan.demand_id is not null then opm.quantity end) qty_orders,
-            0 qty_forecast
-            from (%s) opm2
-            inner join operationplanmaterial opm on opm.item_id = opm2.item_id and opm.location_id = opm2.location_id
-            inner join item on item.name = opm.item_id
-            inner join operationplan on operationplan.reference = opm.operationplan_id
-                and operationplan.demand_id is not null
-                and operationplan.enddate < %%s
-                and (item.type is distinct from 'make to order' or operationplan.batch is not distinct from opm2.opplan_batch)
-            group by opm.item_id, opm.location_id, case when item.type is distinct from 'make to order' then ''
-            else operationplan.batch
-            end
-        """ % (
-            basesql,
-        )
-
-        deliveries_fcst = """
-            select opm.item_id, opm.location_id,
-            case when item.type is distinct from 'make to order' then ''
-            else operationplan.batch
-            end as batch,
-            sum(case when operationplan.demand_id is not null then opm.quantity end) qty_orders,
-            sum(case when operationplan.forecast is not null then opm.quantity end) qty_forecast
-          from (%s) opm2
-          inner join operationplanmaterial opm on opm.item_id = opm2.item_id and opm.location_id = opm2.location_id
-          inner join item on item.name = opm.item_id
-          inner join operationplan on operationplan.reference = opm.operationplan_id
-          and (operationplan.demand_id is not null or operationplan.forecast is not null)
-          and operationplan.enddate < %%s
-          and (item.type is distinct from 'make to order' or operationplan.batch is not distinct from opm2.opplan_batch)
-          group by opm.item_id, opm.location_id,
-            case when item.type is distinct from 'make to order' then ''
-            else operationplan.batch
-            end
-        """ % (
-            basesql,
-        )
-
-        query = """
-          select item_id, location_id, batch, sum(qty_orders), sum(qty_forecast) from
-          (
-          select opm.item_id, opm.location_id,
-          case when item.type is distinct from 'make to order' then ''
-          else demand.batch
-          end as batch,
-          sum(demand.quantity) qty_orders, 0::numeric qty_forecast
-          from (%s) opm
-          inner join demand on demand.item_id = opm.item_id
-          inner join item on item.name = demand.item_id
-          and demand.location_id = opm.location_id
-          and demand.status in ('open','quote') and demand.due < %%s
-          and (item.type is distinct from 'make to order' or demand.batch = opm.opplan_batch)
-          group by opm.item_id, opm.location_id, case when item.type is distinct from 'make to order' then ''
-          else demand.batch
-          end
-          %s
-          union all
-          -- deliveries
-          %s
-          ) t
-          group by item_id, location_id, batch
-        """ % (
-            basesql,
-            backlog_fcst if "freppledb.forecast" in settings.INSTALLED_APPS else "",
-            deliveries_fcst
-            if "freppledb.forecast" in settings.INSTALLED_APPS
-            else deliveries_no_fcst,
-        )
-
-        with transaction.atomic(using=request.database):
-            with connections[request.database].chunked_cursor() as cursor_chunked:
-                current_date = datetime.strptime(
-                    request.current_date, "%Y-%m-%d %H:%M:%S"
-                )
-                cursor_chunked.execute(
-                    query,
-                    baseparams
-                    + (max(request.report_startdate, current_date),)
-                    + baseparams
-                    + (max(request.report_startdate, current_date),)
-                    + (
-                        baseparams
-                        if "freppledb.forecast" in settings.INSTALLED_APPS
-                        else ()
-                    )
-                    + (
-                        (max(request.report_startdate, current_date),)
-                        if "freppledb.forecast" in settings.INSTALLED_APPS
-                        else ()
-                    ),
-                )
-
-                for row in cursor_chunked:
-                    if row[0]:
-                        startbacklogdict[(row[0], row[1], row[2])] = (
-                            max(float(row[3] or 0), 0),
-                            max(float(row[4] or 0), 0),
-                        )
-        # Execute the actual query
+    @staticmethod
+    def getPlanSQL(basesql, attr_sql=""):
+        """
+        Returns the SQL query computing the inventory profile of the buffers
+        in the basesql query. Its arguments are the report start date, end date,
+        current date and bucket name, followed by the arguments of the basesql.
+        """
         reasons_forecast = """
                 union all
                 select distinct out_constraint.name, out_constraint.owner
@@ -751,7 +632,7 @@ class OverviewReport(GridPivot):
                    and d.enddate - interval '1 ms')
         """
 
-        query = """
+        return """
         with arguments as (
                 select %%s::timestamp report_startdate,
                 %%s::timestamp report_enddate,
@@ -770,7 +651,7 @@ class OverviewReport(GridPivot):
            item.volume,
            item.weight,
            item.uom,
-           item.periodofcover,
+           item.periodofcover item_periodofcover,
            item.owner_id,
            item.source,
            item.lastmodified,
@@ -1068,15 +949,266 @@ class OverviewReport(GridPivot):
            d.history,
            arguments.report_startdate,
            arguments.report_currentdate
-           order by %s, d.startdate
         """ % (
-            reportclass.attr_sql,
+            attr_sql,
             net_forecast if "freppledb.forecast" in settings.INSTALLED_APPS else "0",
             reasons_forecast if "freppledb.forecast" in settings.INSTALLED_APPS else "",
             basesql,
+        )
+
+    @staticmethod
+    def useInventoryPlan(request):
+        """
+        Verifies whether the out_inventoryplan table exported with the plan
+        has the buckets and dates this report request needs.
+        The table is outdated after changes to the operationplans and buffers.
+        Changes to other data are only reflected after the next plan run.
+        """
+        try:
+            export = (
+                InventoryPlanExport.objects.using(request.database)
+                .filter(bucket=request.report_bucket, outdated=False)
+                .first()
+            )
+            if (
+                not export
+                or str(export.currentdate) != request.current_date
+                or request.report_enddate > export.enddate
+            ):
+                return False
+            if request.report_startdate == export.startdate:
+                return True
+            # A later start date is fine if it doesn't truncate a bucket
+            return (
+                request.report_startdate > export.startdate
+                and BucketDetail.objects.using(request.database)
+                .filter(
+                    bucket=request.report_bucket,
+                    startdate=request.report_startdate,
+                )
+                .exists()
+            )
+        except Exception:
+            return False
+
+    @staticmethod
+    def getInventoryPlanSQL(basesql, attr_sql, sortsql):
+        """
+        Returns a SQL query with the same output as the getPlanSQL method,
+        but reading the precomputed values from the out_inventoryplan table.
+        """
+        return """
+        with arguments as (
+                select %%s::timestamp report_startdate,
+                %%s::timestamp report_enddate,
+                %%s::timestamp report_currentdate,
+                %%s report_bucket
+           )
+           select
+           opplanmat.buffer,
+           item.name item_id,
+           location.name location_id,
+           item.description,
+           item.type,
+           item.category,
+           item.subcategory,
+           item.cost,
+           item.volume,
+           item.weight,
+           item.uom,
+           item.periodofcover,
+           item.owner_id,
+           item.source,
+           item.lastmodified,
+           location.description,
+           location.category,
+           location.subcategory,
+           location.available_id,
+           location.owner_id,
+           location.source,
+           location.lastmodified,
+           opplanmat.opplan_batch,
+           out_inventoryplan.is_ip_buffer,
+           %s
+           out_inventoryplan.open_orders,
+           out_inventoryplan.net_forecast,
+           'not implemented' expiring,
+           out_inventoryplan.reasons,
+           out_inventoryplan.startoh,
+           out_inventoryplan.name,
+           out_inventoryplan.startdate,
+           out_inventoryplan.enddate,
+           out_inventoryplan.history,
+           out_inventoryplan.safetystock,
+           out_inventoryplan.ongoing,
+           out_inventoryplan.periodofcover
+           from
+           (%s) opplanmat
+           cross join arguments
+           inner join item on item.name = opplanmat.item_id
+           inner join location on location.name = opplanmat.location_id
+           inner join out_inventoryplan
+             on out_inventoryplan.bucket = arguments.report_bucket
+             and out_inventoryplan.item = opplanmat.item_id
+             and out_inventoryplan.location = opplanmat.location_id
+             and out_inventoryplan.batch = opplanmat.opplan_batch
+             and out_inventoryplan.enddate > arguments.report_startdate
+             and out_inventoryplan.startdate < arguments.report_enddate
+           order by %s, out_inventoryplan.startdate
+        """ % (
+            attr_sql,
+            basesql,
             sortsql,
         )
 
+    @classmethod
+    def query(reportclass, request, basequery, sortsql="1 asc"):
+        basesql, baseparams = basequery.query.get_compiler(basequery.db).as_sql(
+            with_col_aliases=False
+        )
+
+        # Execute a query to get the backlog at the start of the horizon
+        startbacklogdict = {}
+
+        # code assumes no max lateness is set to calculate the backlog
+        # forecast knows nothing about batch so all is counted as backlog
+
+        backlog_fcst = """
+            union all
+          select opm.item_id, opm.location_id, '' as batch, 0::numeric qty_orders, coalesce(sum((forecastplan.value->>'forecastnet')::numeric),0) qty_forecast
+          from forecastplan
+          left outer join common_parameter cp on cp.name = 'forecast.DueWithinBucket'
+          inner join (%s) opm on forecastplan.item_id = opm.item_id
+          and forecastplan.location_id = opm.location_id
+          where forecastplan.customer_id = (select name from customer where lvl=0)
+          and case when coalesce(cp.value, 'start') = 'start' then forecastplan.startdate
+                   when coalesce(cp.value, 'start') = 'end' then forecastplan.enddate - interval '1 second'
+                   when coalesce(cp.value, 'start') = 'middle' then forecastplan.startdate + age(forecastplan.enddate, forecastplan.startdate)/2 end < %%s
+          group by opm.item_id, opm.location_id
+        """ % (
+            basesql,
+        )
+
+        deliveries_no_fcst = """
+            select opm.item_id,
+            opm.location_id,
+            case when item.type is distinct from 'make to order' then ''
+            else operationplan.batch
+            end as batch,
+            sum(case when operationplan.demand_id is not null then opm.quantity end) qty_orders,
+            0 qty_forecast
+            from (%s) opm2
+            inner join operationplanmaterial opm on opm.item_id = opm2.item_id and opm.location_id = opm2.location_id
+            inner join item on item.name = opm.item_id
+            inner join operationplan on operationplan.reference = opm.operationplan_id
+                and operationplan.demand_id is not null
+                and operationplan.enddate < %%s
+                and (item.type is distinct from 'make to order' or operationplan.batch is not distinct from opm2.opplan_batch)
+            group by opm.item_id, opm.location_id, case when item.type is distinct from 'make to order' then ''
+            else operationplan.batch
+            end
+        """ % (
+            basesql,
+        )
+
+        deliveries_fcst = """
+            select opm.item_id, opm.location_id,
+            case when item.type is distinct from 'make to order' then ''
+            else operationplan.batch
+            end as batch,
+            sum(case when operationplan.demand_id is not null then opm.quantity end) qty_orders,
+            sum(case when operationplan.forecast is not null then opm.quantity end) qty_forecast
+          from (%s) opm2
+          inner join operationplanmaterial opm on opm.item_id = opm2.item_id and opm.location_id = opm2.location_id
+          inner join item on item.name = opm.item_id
+          inner join operationplan on operationplan.reference = opm.operationplan_id
+          and (operationplan.demand_id is not null or operationplan.forecast is not null)
+          and operationplan.enddate < %%s
+          and (item.type is distinct from 'make to order' or operationplan.batch is not distinct from opm2.opplan_batch)
+          group by opm.item_id, opm.location_id,
+            case when item.type is distinct from 'make to order' then ''
+            else operationplan.batch
+            end
+        """ % (
+            basesql,
+        )
+
+        query = """
+          select item_id, location_id, batch, sum(qty_orders), sum(qty_forecast) from
+          (
+          select opm.item_id, opm.location_id,
+          case when item.type is distinct from 'make to order' then ''
+          else demand.batch
+          end as batch,
+          sum(demand.quantity) qty_orders, 0::numeric qty_forecast
+          from (%s) opm
+          inner join demand on demand.item_id = opm.item_id
+          inner join item on item.name = demand.item_id
+          and demand.location_id = opm.location_id
+          and demand.status in ('open','quote') and demand.due < %%s
+          and (item.type is distinct from 'make to order' or demand.batch = opm.opplan_batch)
+          group by opm.item_id, opm.location_id, case when item.type is distinct from 'make to order' then ''
+          else demand.batch
+          end
+          %s
+          union all
+          -- deliveries
+          %s
+          ) t
+          group by item_id, location_id, batch
+        """ % (
+            basesql,
+            backlog_fcst if "freppledb.forecast" in settings.INSTALLED_APPS else "",
+            (
+                deliveries_fcst
+                if "freppledb.forecast" in settings.INSTALLED_APPS
+                else deliveries_no_fcst
+            ),
+        )
+
+        with transaction.atomic(using=request.database):
+            with connections[request.database].chunked_cursor() as cursor_chunked:
+                current_date = datetime.strptime(
+                    request.current_date, "%Y-%m-%d %H:%M:%S"
+                )
+                cursor_chunked.execute(
+                    query,
+                    baseparams
+                    + (max(request.report_startdate, current_date),)
+                    + baseparams
+                    + (max(request.report_startdate, current_date),)
+                    + (
+                        baseparams
+                        if "freppledb.forecast" in settings.INSTALLED_APPS
+                        else ()
+                    )
+                    + (
+                        (max(request.report_startdate, current_date),)
+                        if "freppledb.forecast" in settings.INSTALLED_APPS
+                        else ()
+                    ),
+                )
+
+                for row in cursor_chunked:
+                    if row[0]:
+                        startbacklogdict[(row[0], row[1], row[2])] = (
+                            max(float(row[3] or 0), 0),
+                            max(float(row[4] or 0), 0),
+                        )
+        # Execute the actual query
+        if reportclass.useInventoryPlan(request):
+            query = reportclass.getInventoryPlanSQL(
+                basesql, reportclass.attr_sql, sortsql
+            )
+        else:
+            query = """
+              %s
+              order by %s, d.startdate
+              """ % (
+                reportclass.getPlanSQL(basesql, reportclass.attr_sql),
+                sortsql,
+            )
+
         # Build the python result
         with transaction.atomic(using=request.database):
             with connections[request.database].chunked_cursor() as cursor_chunked:
@@ -149,41 +149,8 @@ class ReportByDemand(GridReport):
         cursor.execute(
             """
             with cte as (
-                with recursive cte as
-                    (
-                        select 1 as level,
-                        (coalesce(operationplan.item_id,'')||'/'||operationplan.reference)::varchar as path,
-                        operationplan.reference::text as reference,
-                        0::numeric as pegged_x,
-                        operationplan.quantity::numeric as pegged_y
-                        from operationplan
-                        inner join demand on demand.name = %s
-                            inner join lateral
-                            (select t->>'opplan' as reference,
-                            (t->>'quantity')::numeric as quantity from jsonb_array_elements(demand.plan->'pegging') t) t on true
-                            where operationplan.reference = t.reference
-                        union all
-                        select cte.level+1,
-                        cte.path||'/'||coalesce(upstream_opplan.item_id,'')||'/'||upstream_opplan.reference,
-                        t1.upstream_reference::text,
-                        greatest(t1.x, t1.x + (t1.y-t1.x)/(t2.y-t2.x)*(cte.pegged_x-t2.x)) as pegged_x,
-                        least(t1.y, t1.x + (t1.y-t1.x)/(t2.y-t2.x)*(cte.pegged_x-t2.x) + (cte.pegged_y-cte.pegged_x)*(t1.y-t1.x)/(t2.y-t2.x)) as pegged_y
-                        from operationplan
-                        inner join cte on cte.reference = operationplan.reference
-                        inner join lateral
-                        (select t->>0 upstream_reference,
-                        (t->>1)::numeric + (t->>2)::numeric as y,
-                        (t->>2)::numeric as x from jsonb_array_elements(operationplan.plan->'upstream_opplans') t) t1 on true
-                        inner join operationplan upstream_opplan on upstream_opplan.reference = t1.upstream_reference
-                        inner join lateral
-                        (select t->>0 downstream_reference,
-                        (t->>1)::numeric+(t->>2)::numeric as y,
-                        (t->>2)::numeric as x from jsonb_array_elements(upstream_opplan.plan->'downstream_opplans') t) t2
-                            on t2.downstream_reference = operationplan.reference and numrange(t2.x,t2.y) && numrange(cte.pegged_x,cte.pegged_y)
-                    )
-                select reference from cte
-                where level < 25
-                order by path,level desc
+                select opplan as reference from out_pegging
+                where demand = %s
                 )
                     select
                     (select due from demand where name = %s),
@@ -292,43 +259,10 @@ class ReportByDemand(GridReport):
         # Collect demand due date, all operationplans and loaded resources
         query = """
           with cte as (
-                with recursive cte as
-                (
-                select 1 as level,
-                (coalesce(operationplan.item_id,'')||'/'||operationplan.reference)::varchar as path,
-                operationplan.reference::text,
-                0::numeric as pegged_x,
-                operationplan.quantity::numeric as pegged_y,
-                operationplan.owner_id
-                from operationplan
-                inner join demand on demand.name = %s
-                    inner join lateral
-                    (select t->>'opplan' as reference,
-                    (t->>'quantity')::numeric as quantity from jsonb_array_elements(demand.plan->'pegging') t) t on true
-                    where operationplan.reference = t.reference
-                union all
-                select case when upstream_opplan.owner_id = cte.owner_id then cte.level else cte.level+1 end,
-                cte.path||'/'||coalesce(upstream_opplan.item_id,'')||'/'||upstream_opplan.reference,
-                t1.upstream_reference::text,
-                greatest(t1.x, t1.x + (t1.y-t1.x)/(t2.y-t2.x)*(cte.pegged_x-t2.x)) as pegged_x,
-                least(t1.y, t1.x + (t1.y-t1.x)/(t2.y-t2.x)*(cte.pegged_x-t2.x) + (cte.pegged_y-cte.pegged_x)*(t1.y-t1.x)/(t2.y-t2.x)) as pegged_y,
-                upstream_opplan.owner_id
-                from operationplan
-                inner join cte on cte.reference = operationplan.reference
-                inner join lateral
-                (select t->>0 upstream_reference,
-                (t->>1)::numeric + (t->>2)::numeric as y,
-                (t->>2)::numeric as x from jsonb_array_elements(operationplan.plan->'upstream_opplans') t) t1 on true
-                inner join operationplan upstream_opplan on upstream_opplan.reference = t1.upstream_reference
-                inner join lateral
-                (select t->>0 downstream_reference,
-                (t->>1)::numeric+(t->>2)::numeric as y,
-                (t->>2)::numeric as x from jsonb_array_elements(upstream_opplan.plan->'downstream_opplans') t) t2
-                    on t2.downstream_reference = operationplan.reference and numrange(t2.x,t2.y) && numrange(cte.pegged_x,cte.pegged_y)
-                )
-                select level, reference, (pegged_y-pegged_x) as quantity, path from cte
-                where level < 25
-                order by path,level desc
+                select level, opplan as reference, (pegged_y-pegged_x) as quantity, path
+                from out_pegging
+                where demand = %s
+                order by rownum
           ),
            pegging_0 as (
             select
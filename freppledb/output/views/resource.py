@@ -244,18 +244,66 @@ class OverviewReport(GridPivot):
             queryset = Resource.objects.filter(name=args[0])
         else:
             queryset = Resource.objects.all()
+        plansql, planparams = reportclass.getResourcePlanSQL(
+            request.report_bucket, request.report_startdate, request.report_enddate
+        )
         return queryset.annotate(
             avgutil=RawSQL(
                 """
           select ( coalesce(sum(out_resourceplan.load),0) + coalesce(sum(out_resourceplan.setup),0) )
              * 100.0 / coalesce(greatest(sum(out_resourceplan.available), 0.0001),1) as avg_util
+          from (%s) out_resourceplan
+          where out_resourceplan.resource = resource.name
+          """
+                % plansql,
+                planparams,
+            )
+        )
+
+    @staticmethod
+    def getResourcePlanSQL(bucket, startdate, enddate):
+        """
+        Returns a query and its parameters for the resource plan between the start
+        and end date.
+        Buckets that fall completely within the horizon are read from the rollups
+        in out_resourceplanbucket. Only the edges of the horizon and the finest
+        bucket level are read from out_resourceplan.
+        """
+        return (
+            """
+          select resource, startdate, available, unavailable, setup, load, free
+          from out_resourceplanbucket
+          where bucket = %s and startdate >= %s and enddate <= %s
+          union all
+          select resource, startdate, available, unavailable, setup, load, free
           from out_resourceplan
-          where out_resourceplan.startdate >= %s
-          and out_resourceplan.startdate < %s
-          and out_resourceplan.resource = resource.name
-          """,
-                (request.report_startdate, request.report_enddate),
+          where startdate >= %s and startdate < %s
+          and not (
+            exists (select 1 from out_resourceplanbucket where bucket = %s)
+            and startdate >= coalesce((
+              select min(startdate) from common_bucketdetail
+              where bucket_id = %s and startdate >= %s and enddate <= %s
+              ), 'infinity')
+            and startdate < (
+              select max(enddate) from common_bucketdetail
+              where bucket_id = %s and startdate >= %s and enddate <= %s
+              )
             )
+          """,
+            (
+                bucket,
+                startdate,
+                enddate,
+                startdate,
+                enddate,
+                bucket,
+                bucket,
+                startdate,
+                enddate,
+                bucket,
+                startdate,
+                enddate,
+            ),
         )
 
     @classmethod
@@ -295,10 +343,14 @@ class OverviewReport(GridPivot):
         res.owner_id,
         %s
         d.bucket as col1, d.startdate as col2,
-        coalesce(sum(out_resourceplan.available),0) / (case when res.type = 'buckets' then 1 else %f end) as available,
-        coalesce(sum(out_resourceplan.unavailable),0) / (case when res.type = 'buckets' then 1 else %f end) as unavailable,
-        coalesce(sum(out_resourceplan.load),0) / (case when res.type = 'buckets' then 1 else %f end) as loading,
-        coalesce(sum(out_resourceplan.setup),0) / (case when res.type = 'buckets' then 1 else %f end) as setup
+        (coalesce(sum(rb.available),0) + coalesce(sum(out_resourceplan.available),0))
+          / (case when res.type = 'buckets' then 1 else %f end) as available,
+        (coalesce(sum(rb.unavailable),0) + coalesce(sum(out_resourceplan.unavailable),0))
+          / (case when res.type = 'buckets' then 1 else %f end) as unavailable,
+        (coalesce(sum(rb.load),0) + coalesce(sum(out_resourceplan.load),0))
+          / (case when res.type = 'buckets' then 1 else %f end) as loading,
+        (coalesce(sum(rb.setup),0) + coalesce(sum(out_resourceplan.setup),0))
+          / (case when res.type = 'buckets' then 1 else %f end) as setup
       from (%s) res
       left outer join location
         on res.location_id = location.name
@@ -308,9 +360,17 @@ class OverviewReport(GridPivot):
                    from common_bucketdetail
                    where bucket_id = '%s' and enddate > '%s' and startdate < '%s'
                    ) d
-      -- Utilization info
+      -- Utilization info of complete buckets, precomputed during the plan export
+      left join out_resourceplanbucket rb
+      on rb.bucket = '%s'
+      and rb.resource = res.name
+      and rb.startdate = d.startdate
+      and d.startdate >= '%s'
+      and d.enddate <= '%s'
+      -- Utilization info of the other buckets
       left join out_resourceplan
-      on res.name = out_resourceplan.resource
+      on rb.resource is null
+      and res.name = out_resourceplan.resource
       and d.startdate <= out_resourceplan.startdate
       and d.enddate > out_resourceplan.startdate
       and out_resourceplan.startdate >= '%s'
@@ -333,6 +393,9 @@ class OverviewReport(GridPivot):
             request.report_bucket,
             request.report_startdate,
             request.report_enddate,
+            request.report_bucket,
+            request.report_startdate,
+            request.report_enddate,
             request.report_startdate,
             request.report_enddate,
             reportclass.attr_sql,
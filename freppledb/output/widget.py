@@ -42,6 +42,7 @@ from freppledb.input.models import (
     DistributionOrder,
     OperationPlanResource,
 )
+from freppledb.output.views.resource import OverviewReport as ResourceReport
 
 
 class LateOrdersWidget(Widget):
@@ -1724,20 +1725,23 @@ class ResourceLoadWidget(Widget):
         ]
         cursor = connections[request.database].cursor()
         GridReport.getBuckets(request)
+        plansql, planparams = ResourceReport.getResourcePlanSQL(
+            request.report_bucket, request.report_startdate, request.report_enddate
+        )
         query = """select
                   resource,
                   ( coalesce(sum(out_resourceplan.load),0) + coalesce(sum(out_resourceplan.setup),0) )
                    * 100.0 / coalesce(sum(out_resourceplan.available)+0.000001,1) as avg_util,
                   coalesce(sum(out_resourceplan.load),0) + coalesce(sum(out_resourceplan.setup),0),
                   coalesce(sum(out_resourceplan.free),0)
-                from out_resourceplan
-                where out_resourceplan.startdate >= %s
-                  and out_resourceplan.startdate < %s
+                from (%s) out_resourceplan
                 group by resource
                 order by 2 desc
-                limit %s
-              """
-        cursor.execute(query, (request.report_startdate, request.report_enddate, limit))
+                limit %%s
+              """ % (
+            plansql,
+        )
+        cursor.execute(query, planparams + (limit,))
         for res in cursor.fetchall():
             result.append(
                 '<tr><td><a href="%s/resource/%s/?noautofilter">%s</a></td><td class="util">%.2f</td></tr>'
@@ -597,6 +597,60 @@ GOOGLE_ANALYTICS = None
 CACHE_MAXIMUM = 1000000
 CACHE_THREADS = 1
 
+# Number of extra database connections used to retrieve the input data
+# while the planning engine is loading the model.
+# The default value of 0 loads all data sequentially over a single connection.
+LOAD_PREFETCH_CONNECTIONS = 0
+
+# Read the input data with a "COPY ... TO STDOUT" statement rather than with
+# a cursor. Numbers are then passed to the planning engine as float values.
+LOAD_COPY_READER = False
+
+# Size in bytes of the chunks of data sent to the database when exporting
+# the plan with a COPY command.
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# Number of parallel jobs used to dump and restore the database when copying
+# a scenario. The default value of 1 copies the data with a single
+# "pg_dump | pg_restore" pipe.
+SCENARIO_COPY_JOBS = 1
+
+# Number of data rows validated and saved together when uploading a CSV file
+# or a spreadsheet. A value of 1 saves every row individually.
+UPLOAD_BATCH_SIZE = 5000
+
+# Number of tasks the worker process of a database runs at the same time.
+# Tasks are exclusive by default: they never run at the same time as any other
+# task, independent of this setting.
+WORKER_SLOTS = 1
+
+# Maximum number of records of a referenced table that are cached when
+# validating the foreign keys in uploaded data. This is a number of records,
+# not a size in bytes. Bigger tables are read in blocks of uploaded rows, and
+# keep at most this number of records in the cache.
+UPLOAD_CACHE_OBJECTS = 30000
+
+# Number of worker processes fitting the machine learning forecast models,
+# and the maximum time in seconds to fit the model of a single forecast.
+MLFORECAST_WORKERS = 1
+MLFORECAST_TIMEOUT = 600
+
+# Number of parallel database connections used to export the operationplans.
+# Each connection exports a shard of the operations.
+# The default value of 1 exports all operationplans over a single connection.
+EXPORT_OPERATIONPLAN_WORKERS = 1
+
+# Number of batches of 1000 forecast updates that are posted to the web service
+# at the same time while uploading a forecast file, and the number of seconds
+# to wait for the web service to process a batch.
+FORECAST_UPLOAD_QUEUE = 4
+FORECAST_UPLOAD_TIMEOUT = 600
+
+# Number of seconds the record count and page boundaries of a report are cached.
+# The cache is also invalidated when the plan or the data is edited.
+# A value of 0 disables the cache.
+GRID_CACHE_TIMEOUT = 600
+
 # Adress and port number for the runwebserver command, the Windows system tray
 # executable and the Windows service
 ADDRESS = "0.0.0.0"
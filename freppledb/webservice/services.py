@@ -21,8 +21,11 @@
 # WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 #
 
+import json
+
 from channels.generic.http import AsyncHttpConsumer
 from .commands import WebService
+from .utils import lock
 
 
 class StopService(AsyncHttpConsumer):
@@ -62,3 +65,17 @@ class PingService(AsyncHttpConsumer):
             b"OK",
             headers=self.scope["response_headers"],
         )
+
+
+class LockService(AsyncHttpConsumer):
+    """
+    Reports the state of the plan lock and the wait and hold times per endpoint.
+    """
+
+    async def handle(self, body):
+        self.scope["response_headers"].append((b"Content-Type", b"application/json"))
+        await self.send_response(
+            200,
+            json.dumps(lock.getStatistics()).encode(),
+            headers=self.scope["response_headers"],
+        )
@@ -34,4 +34,5 @@ if mode == "ASGI":
         re_path(r"^stop/$", services.StopService.as_asgi()),
         re_path(r"^stop/force/$", services.StopService.as_asgi()),  # No difference
         re_path(r"^ping/$", services.PingService.as_asgi()),
+        re_path(r"^locks/$", services.LockService.as_asgi()),
     ]
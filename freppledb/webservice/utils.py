@@ -22,9 +22,11 @@
 #
 
 import asyncio
+from contextlib import asynccontextmanager
 import os
 import portend
 import sys
+from time import perf_counter
 
 from django.conf import settings
 from django.db import DEFAULT_DB_ALIAS
@@ -33,11 +35,111 @@ from freppledb.common.auth import getWebserviceAuthorization
 from freppledb.common.commands import PlanTaskRegistry
 from freppledb.common.models import Parameter
 
-# Only a single service can be making updates at the same time
-try:
-    lock = asyncio.Lock()
-except Exception:
-    lock = None
+
+class PlanLock:
+    """
+    Reader/writer lock protecting the plan in memory.
+
+    Read-only requests share the lock and run concurrently.
+    An update gets exclusive access to the complete model: the engine isn't
+    safe for concurrent updates, even on different clusters. A solver running
+    in another thread releases the GIL while it changes global state such as
+    the forecast cache, the problem lists and the cluster numbering.
+    Waiting updates get priority over new read-only requests.
+
+    The wait time and hold time of the lock are recorded per endpoint.
+    """
+
+    def __init__(self):
+        self.condition = asyncio.Condition()
+        self.readers = 0
+        self.writer = False
+        self.waiting_writers = 0
+        self.stats = {}
+
+    def _canRead(self):
+        return not self.writer and not self.waiting_writers
+
+    def _canWrite(self):
+        return not self.writer and not self.readers
+
+    def _record(self, endpoint, wait, hold):
+        stat = self.stats.get(endpoint, None)
+        if not stat:
+            stat = {
+                "count": 0,
+                "wait": 0.0,
+                "max_wait": 0.0,
+                "hold": 0.0,
+                "max_hold": 0.0,
+            }
+            self.stats[endpoint] = stat
+        stat["count"] += 1
+        stat["wait"] += wait
+        stat["hold"] += hold
+        if wait > stat["max_wait"]:
+            stat["max_wait"] = wait
+        if hold > stat["max_hold"]:
+            stat["max_hold"] = hold
+
+    @asynccontextmanager
+    async def read(self, endpoint):
+        start = perf_counter()
+        async with self.condition:
+            await self.condition.wait_for(self._canRead)
+            self.readers += 1
+        acquired = perf_counter()
+        try:
+            yield
+        finally:
+            async with self.condition:
+                self.readers -= 1
+                self.condition.notify_all()
+            self._record(endpoint, acquired - start, perf_counter() - acquired)
+
+    @asynccontextmanager
+    async def write(self, endpoint):
+        start = perf_counter()
+        async with self.condition:
+            self.waiting_writers += 1
+            try:
+                await self.condition.wait_for(self._canWrite)
+            finally:
+                self.waiting_writers -= 1
+            self.writer = True
+        acquired = perf_counter()
+        try:
+            yield
+        finally:
+            async with self.condition:
+                self.writer = False
+                self.condition.notify_all()
+            self._record(endpoint, acquired - start, perf_counter() - acquired)
+
+    def getStatistics(self):
+        """
+        Returns the lock state and the average and maximum wait and hold times
+        in milliseconds for each endpoint.
+        """
+        return {
+            "readers": self.readers,
+            "writer": self.writer,
+            "waiting_writers": self.waiting_writers,
+            "endpoints": {
+                endpoint: {
+                    "count": stat["count"],
+                    "avg_wait": round(stat["wait"] * 1000 / stat["count"], 3),
+                    "max_wait": round(stat["max_wait"] * 1000, 3),
+                    "avg_hold": round(stat["hold"] * 1000 / stat["count"], 3),
+                    "max_hold": round(stat["max_hold"] * 1000, 3),
+                }
+                for endpoint, stat in self.stats.items()
+            },
+        }
+
+
+# Read-only services share the plan, updates lock the complete plan
+lock = PlanLock()
 
 # Solvers reusable for all services
 mrp_solver = None
@@ -45,6 +147,61 @@ clean_solver = None
 fcst_solver = None
 
 
+class HierarchyCache:
+    """
+    Caches the root and a lookup by name of the items, locations and customers
+    in the plan. The cache is cleared when a new model is loaded.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.roots = {}
+        self.objects = {}
+
+    def _build(self, entity):
+        import frepple
+
+        objects = {}
+        root = None
+        for i in getattr(frepple, "%ss" % entity)():
+            objects[i.name] = i
+            if not root:
+                root = i
+                while root.owner:
+                    root = root.owner
+        self.objects[entity] = objects
+        self.roots[entity] = root
+
+    def getRoot(self, entity):
+        """
+        Returns the top of the hierarchy of an item, location or customer.
+        """
+        if entity not in self.roots:
+            self._build(entity)
+        return self.roots[entity]
+
+    def get(self, entity, name):
+        """
+        Returns an item, location or customer by its name.
+        Objects created after the cache was built are looked up in the engine.
+        """
+        import frepple
+
+        if entity not in self.objects:
+            self._build(entity)
+        obj = self.objects[entity].get(name, None)
+        if not obj:
+            obj = getattr(frepple, entity)(name=name, action="C")
+            if obj:
+                self.objects[entity][name] = obj
+        return obj
+
+
+hierarchy = HierarchyCache()
+
+
 def useWebService(database=DEFAULT_DB_ALIAS):
     if "FREPPLE_TEST" in os.environ:
         # Tests run without the webservice by default
@@ -128,6 +285,9 @@ def createSolvers(loglevel=2, database=DEFAULT_DB_ALIAS):
 
     global clean_solver, mrp_solver, fcst_solver
 
+    # A new model is loaded
+    hierarchy.clear()
+
     try:
         from freppledb.execute.management.commands.runplan import parseConstraints
 
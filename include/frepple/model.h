@@ -6834,6 +6834,10 @@ class Resource : public HasHierarchy<Resource>,
 
   /* Python method that returns an iterator over the resource plan. */
   static PyObject* plan(PyObject*, PyObject*);
+
+  /* Python method that returns the earliest start date and latest end date
+   * of all loadplans, optionally limited to a list of clusters. */
+  static PyObject* getHorizonPython(PyObject*, PyObject*);
 };
 
 inline void OperationPlan::setSetupEvent(Resource* r, Date d,
@@ -10248,6 +10252,21 @@ PyObject* readXMLfile(PyObject*, PyObject*);
  */
 PyObject* readXMLdata(PyObject*, PyObject*);
 
+/* This Python function is used for processing XML input data from a
+ * Python file-like object, such as an open file or a HTTP response.
+ * The data is read and processed in chunks.
+ *
+ * The function takes up to five arguments:
+ *   - Python object with a read method returning bytes
+ *   - Optional validate flag, defining whether or not the input data needs to
+ * be validated against the XML schema definition.
+ *   - Optional validate_only flag, which allows us to validate the data but
+ *     skip any processing.
+ *   - Optional loglevel flag, which writes out a verbose trace of the parsing.
+ *   - Optional user exit function.
+ */
+PyObject* readXMLstream(PyObject*, PyObject*);
+
 /* This Python function writes the dynamic part of the plan to an text
  * file.
  *
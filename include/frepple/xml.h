@@ -43,6 +43,7 @@
 #include <xercesc/sax2/DefaultHandler.hpp>
 #include <xercesc/sax2/SAX2XMLReader.hpp>
 #include <xercesc/sax2/XMLReaderFactory.hpp>
+#include <xercesc/util/BinInputStream.hpp>
 #include <xercesc/util/PlatformUtils.hpp>
 #include <xercesc/util/TransService.hpp>
 #include <xercesc/util/XMLException.hpp>
@@ -257,6 +258,84 @@ class XMLInputString : public XMLInput {
   const string data;
 };
 
+/* This class reads XML data from a Python file-like object.
+ *
+ * The data is read in chunks by calling the read() method of the object.
+ * The complete document is never in memory at the same time.
+ */
+class XMLInputStream : public XMLInput {
+ public:
+  /* Constructor. The argument is a Python object with a read method that
+   * returns bytes. */
+  XMLInputStream(PyObject* o) : stream(o){};
+
+  /* Parse the data from the stream. */
+  void parse(Object* pRoot, bool v = false) {
+    PythonInputSource a(stream);
+    XMLInput::parse(a, pRoot, v);
+    if (a.failed)
+      throw RuntimeException("Error reading XML data from the input stream");
+  }
+
+ private:
+  /* A Xerces input stream calling the read method of the Python object.
+   * The parser runs without holding the Python interpreter lock, so we
+   * need to reclaim it for every call.
+   */
+  class PythonBinInputStream : public xercesc::BinInputStream {
+   public:
+    PythonBinInputStream(PyObject* o, bool& f) : stream(o), failed(f) {}
+
+    XMLFilePos curPos() const { return pos; }
+
+    XMLSize_t readBytes(XMLByte* const toFill, const XMLSize_t maxToRead) {
+      if (failed) return 0;
+      XMLSize_t cnt = 0;
+      PyGILState_STATE state = PyGILState_Ensure();
+      PyObject* result = PyObject_CallMethod(
+          stream, "read", "n", static_cast<Py_ssize_t>(maxToRead));
+      char* buffer;
+      Py_ssize_t len;
+      if (result && !PyBytes_AsStringAndSize(result, &buffer, &len) &&
+          static_cast<XMLSize_t>(len) <= maxToRead) {
+        memcpy(toFill, buffer, len);
+        cnt = static_cast<XMLSize_t>(len);
+      } else {
+        if (PyErr_Occurred()) PyErr_Print();
+        failed = true;
+      }
+      Py_XDECREF(result);
+      PyGILState_Release(state);
+      pos += cnt;
+      return cnt;
+    }
+
+    const XMLCh* getContentType() const { return nullptr; }
+
+   private:
+    PyObject* stream;
+    bool& failed;
+    XMLFilePos pos = 0;
+  };
+
+  class PythonInputSource : public xercesc::InputSource {
+   public:
+    PythonInputSource(PyObject* o) : stream(o) {}
+
+    xercesc::BinInputStream* makeStream() const {
+      return new PythonBinInputStream(stream, failed);
+    }
+
+    mutable bool failed = false;
+
+   private:
+    PyObject* stream;
+  };
+
+  /* Python object providing the data. */
+  PyObject* stream;
+};
+
 /* This class reads XML data from a file system.
  *
  * The filename argument can be the name of a file or a directory.
@@ -116,6 +116,47 @@ PyObject *readXMLdata(PyObject *self, PyObject *args) {
                              // portable across compilers
 }
 
+//
+// READ XML INPUT STREAM
+//
+
+PyObject *readXMLstream(PyObject *self, PyObject *args) {
+  // Pick up arguments
+  PyObject *stream;
+  int validate(1), validate_only(0), loglevel(0);
+  PyObject *userexit = nullptr;
+  int ok = PyArg_ParseTuple(args, "O|iiiO:readXMLstream", &stream, &validate,
+                            &validate_only, &loglevel, &userexit);
+  if (!ok) return nullptr;
+  if (!PyObject_HasAttrString(stream, "read")) {
+    PyErr_SetString(PythonDataException,
+                    "readXMLstream() requires an object with a read method");
+    return nullptr;
+  }
+
+  // Free Python interpreter for other threads
+  Py_BEGIN_ALLOW_THREADS;
+
+  // Execute and catch exceptions
+  try {
+    XMLInputStream p(stream);
+    if (userexit) p.setUserExit(userexit);
+    if (loglevel) p.setLogLevel(1);
+    if (validate_only != 0)
+      p.parse(nullptr, true);
+    else
+      p.parse(&Plan::instance(), validate != 0);
+  } catch (...) {
+    Py_BLOCK_THREADS;
+    PythonType::evalException();
+    return nullptr;
+  }
+
+  // Reclaim Python interpreter
+  Py_END_ALLOW_THREADS;
+  return Py_BuildValue("");
+}
+
 //
 // SAVE MODEL TO XML
 //
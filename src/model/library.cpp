@@ -129,6 +129,9 @@ void LibraryModel::initialize() {
       "Processes a XML string passed as argument.");
   PythonInterpreter::registerGlobalMethod("readXMLfile", readXMLfile,
                                           METH_VARARGS, "Read an XML file.");
+  PythonInterpreter::registerGlobalMethod(
+      "readXMLstream", readXMLstream, METH_VARARGS,
+      "Processes XML data read from a Python file-like object.");
   PythonInterpreter::registerGlobalMethod("saveXMLfile", saveXMLfile,
                                           METH_VARARGS,
                                           "Save the model to a XML file.");
@@ -159,6 +162,9 @@ void LibraryModel::initialize() {
   PythonInterpreter::registerGlobalMethod(
       "resources", Resource::createIterator, METH_NOARGS,
       "Returns an iterator over the resources.");
+  PythonInterpreter::registerGlobalMethod(
+      "resourcehorizon", Resource::getHorizonPython, METH_VARARGS,
+      "Returns the first and last date of all resource loadplans.");
   PythonInterpreter::registerGlobalMethod(
       "operations", Operation::createIterator, METH_NOARGS,
       "Returns an iterator over the operations.");
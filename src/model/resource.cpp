@@ -373,6 +373,64 @@ extern "C" PyObject* Resource::plan(PyObject* self, PyObject* args) {
   return new Resource::PlanIterator(resource, iter);
 }
 
+extern "C" PyObject* Resource::getHorizonPython(PyObject* self,
+                                                 PyObject* args) {
+  // Parse the Python arguments
+  PyObject* pyclusters = nullptr;
+  int ok = PyArg_ParseTuple(args, "|O:resourcehorizon", &pyclusters);
+  if (!ok) return nullptr;
+
+  try {
+    // Collect the clusters to filter on
+    set<int> clusters;
+    if (pyclusters && pyclusters != Py_None) {
+      PyObject* iter = PyObject_GetIter(pyclusters);
+      if (!iter) {
+        PyErr_Format(PyExc_AttributeError,
+                     "Argument to resourcehorizon() must support iteration");
+        return nullptr;
+      }
+      while (PyObject* item = PyIter_Next(iter)) {
+        clusters.insert(PythonData(item).getInt());
+        Py_DECREF(item);
+      }
+      Py_DECREF(iter);
+    }
+
+    // The loadplan timeline is sorted by date. We only need to look at the
+    // first and last loadplan of each resource.
+    Date startdate = Date::infiniteFuture;
+    Date enddate = Date::infinitePast;
+    for (auto& res : Resource::all()) {
+      if (!clusters.empty() &&
+          clusters.find(res.getCluster()) == clusters.end())
+        continue;
+      auto& ldplans = res.getLoadPlans();
+      for (auto i = ldplans.begin(); i != ldplans.end(); ++i)
+        if (i->getEventType() == 1) {
+          auto tmp = static_cast<LoadPlan*>(&*i)->getStartDate();
+          if (tmp < startdate) startdate = tmp;
+          break;
+        }
+      for (auto i = ldplans.rbegin(); i != ldplans.end(); --i)
+        if (i->getEventType() == 1) {
+          auto tmp = static_cast<LoadPlan*>(&*i)->getEndDate();
+          if (tmp > enddate) enddate = tmp;
+          break;
+        }
+    }
+
+    // Return None when there are no loadplans at all
+    if (startdate == Date::infiniteFuture) return Py_BuildValue("");
+    return Py_BuildValue("(O,O)",
+                         static_cast<PyObject*>(PythonData(startdate)),
+                         static_cast<PyObject*>(PythonData(enddate)));
+  } catch (...) {
+    PythonType::evalException();
+    return nullptr;
+  }
+}
+
 int Resource::PlanIterator::initialize() {
   // Initialize the type
   PythonType& x = PythonExtension<Resource::PlanIterator>::getPythonType();